@@ -3,6 +3,13 @@ from typing import Dict, Any, Optional, Literal, List
 import json # Added for logging and example
 import time # Added for example
 import asyncio # Added for async decide_trade
+import heapq
+from collections import deque
+import hashlib
+import math
+import dataclasses
+import numpy as np
+from cachetools import TTLCache
 
 from app.config import get_config
 # Placeholder for other necessary imports, e.g., data providers, engines
@@ -14,10 +21,133 @@ from app.config import get_config
 # from app.strategy_framework import BaseStrategy
 from app.ai_agent_package.gemini_client import GeminiClient # Import GeminiClient
 from app.models.ai_inputs import AggregatedInputs, SignalSourceInput # Import AggregatedInputs, SignalSourceInput
+from app.utils import metrics_kernels
 from pydantic import BaseModel, ValidationError, confloat, constr # Added BaseModel, ValidationError, confloat, constr
 
+try:
+    import orjson
+    HAS_ORJSON = True
+    _ORJSON_LOG_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
+# Raw candles kept in the prompt next to the OHLCV summary
+PROMPT_RAW_CANDLES = 5
+
+
+def _log_default(obj: Any) -> Any:
+    """
+    Fallback serializer for debug logs: raw objects (SecurityRisk and other dataclasses,
+    Pydantic models) can be passed as-is and are only converted if the log is emitted.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(exclude_none=True)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+def _dumps_indented(data: Any) -> str:
+    """Indented JSON for debug logs and the Gemini prompt (orjson when available, stdlib json otherwise)."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, default=_log_default, option=_ORJSON_LOG_OPTS).decode()
+    return json.dumps(data, default=_log_default, indent=2)
+
+def _candle_value(candle: Dict[str, Any], short_key: str, long_key: str) -> Optional[float]:
+    """Candles come either with short keys (t/o/h/l/c/v, DexBot) or long ones (close, high...)."""
+    value = candle.get(short_key, candle.get(long_key))
+    return float(value) if value is not None else None
+
+
+def _finite(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+def summarize_ohlcv(ohlcv_list: List[Dict[str, Any]], raw_candles: int = PROMPT_RAW_CANDLES) -> Dict[str, Any]:
+    """
+    Compact OHLCV summary for the prompt: last close, SMA 20/50, RSI 14, ATR 14 and the
+    realized volatility of the last 24 log returns, plus the `raw_candles` most recent
+    candles. Indicators without enough history are None.
+    """
+    if not ohlcv_list:
+        return {'candles': 0}
+    close = np.array([_candle_value(c, 'c', 'close') for c in ohlcv_list], dtype=float)
+    high = np.array([_candle_value(c, 'h', 'high') for c in ohlcv_list], dtype=float)
+    low = np.array([_candle_value(c, 'l', 'low') for c in ohlcv_list], dtype=float)
+    positive = close[close > 0]
+    log_returns = np.diff(np.log(positive[-25:])) if positive.size > 1 else np.empty(0)
+    return {
+        'candles': len(ohlcv_list),
+        'last_close': _finite(close[-1]),
+        'sma_20': _finite(metrics_kernels.sma(close, 20)),
+        'sma_50': _finite(metrics_kernels.sma(close, 50)),
+        'rsi_14': _finite(metrics_kernels.rsi(close, 14)),
+        'atr_14': _finite(metrics_kernels.atr(high, low, close, 14)),
+        'realized_vol_24h': float(np.std(log_returns)) if log_returns.size > 1 else None,
+        'last_candles': ohlcv_list[-raw_candles:],
+    }
+
+
+def _log_bucket(value: Optional[float], bucket_pct: float) -> Optional[int]:
+    """Index of the geometric bucket (width `bucket_pct` %) containing a positive value."""
+    if not value or value <= 0:
+        return None
+    return math.floor(math.log(value) / math.log1p(bucket_pct / 100.0))
+
+
+@dataclasses.dataclass(frozen=True)
+class DecisionSignature:
+    """
+    Signature of the agent inputs for the decision cache, computed once per decision:
+    `context` hashes the categorical fields (pair, trend, risk level, positions, security,
+    prediction, signals), `buckets` holds the bucket indices of the numeric ones (current
+    price, last close, available capital; NaN when missing) and `key` hashes both.
+    """
+    key: str
+    context: str
+    buckets: np.ndarray
+
+    def is_near(self, other: "DecisionSignature", max_bucket_distance: int = 1) -> bool:
+        """Same context and every numeric field within `max_bucket_distance` buckets."""
+        return (self.context == other.context
+                and bool(np.all(np.abs(self.buckets - other.buckets) <= max_bucket_distance)))
+
+
+def decision_signature(inputs: AggregatedInputs, price_bucket_pct: float) -> DecisionSignature:
+    """
+    Signature of a stable subset of the inputs, so that two cycles with near-identical
+    market conditions map to the same (or a neighbouring) decision cache entry.
+    """
+    market = inputs.market_data
+    last_close = _candle_value(market.recent_ohlcv_1h[-1], 'c', 'close') if market.recent_ohlcv_1h else None
+    prediction = inputs.prediction_engine_outputs
+    security = inputs.security_checker_inputs
+    risk = inputs.risk_manager_inputs
+    portfolio = inputs.portfolio_manager_inputs
+    context_fields = [
+        sorted(inputs.target_pair.items()),
+        str(market.recent_trend_1h),
+        str(risk.overall_portfolio_risk_level),
+        portfolio.position_count,
+        sorted(str(p.get('symbol')) for p in portfolio.current_positions),
+        round(security.token_security_score, 2) if security else None,
+        bool(security and security.honeypot_risk),
+        str(prediction.market_regime_1h) if prediction else None,
+        sorted((s.source_name, str(s.signal)) for s in inputs.signal_sources),
+    ]
+    context = hashlib.blake2b(json.dumps(context_fields, separators=(',', ':'), default=str).encode(),
+                              digest_size=16).digest()
+    buckets = np.array([
+        _log_bucket(market.current_price, price_bucket_pct),
+        _log_bucket(last_close, price_bucket_pct),
+        _log_bucket(risk.available_capital_usdc, price_bucket_pct),
+    ], dtype=np.float64) # None -> NaN: never "near" anything
+    key = hashlib.blake2b(context + buckets.tobytes(), digest_size=16).hexdigest()
+    return DecisionSignature(key=key, context=context.hex(), buckets=buckets)
+
+
 # Pydantic model for TradeDecision (Task 3.3 from todo/02-todo-ai-api-gemini.md)
 class TradeDecisionModel(BaseModel):
     decision: Literal["BUY", "SELL", "HOLD"]
@@ -49,6 +179,25 @@ class AIAgent:
         """
         self.config = config
         self.gemini_client = GeminiClient(config=self.config)
+        # Validated decisions by signature key -> (signature, decision), see decision_signature; TTLCache expires on the monotonic clock
+        trading_config = get_config().trading
+        self._decision_cache_enabled = trading_config.ai_decision_cache_ttl_seconds > 0
+        self._decision_cache: TTLCache = TTLCache(
+            maxsize=max(1, trading_config.ai_decision_cache_size),
+            ttl=max(1, trading_config.ai_decision_cache_ttl_seconds)
+        )
+        self._decision_price_bucket_pct = trading_config.ai_decision_price_bucket_pct
+        # Gemini calls: bounded concurrency, token bucket (ai_requests_per_minute) and circuit breaker
+        self._gemini_semaphore = asyncio.Semaphore(max(1, trading_config.ai_max_concurrency))
+        # tokens / s; None when ai_requests_per_minute <= 0 (no rate limit)
+        self._gemini_rate = trading_config.ai_requests_per_minute / 60.0 if trading_config.ai_requests_per_minute > 0 else None
+        self._gemini_burst = float(max(1, trading_config.ai_max_concurrency))
+        self._gemini_tokens = self._gemini_burst
+        self._gemini_tokens_at = time.monotonic()
+        self._gemini_outcomes: deque = deque(maxlen=max(1, trading_config.ai_breaker_window_calls)) # True = failure
+        self._breaker_failure_rate = trading_config.ai_breaker_failure_rate
+        self._breaker_cooldown = trading_config.ai_breaker_cooldown_seconds
+        self._breaker_open_until = 0.0
         # self.market_data_provider: Optional[MarketDataProvider] = None # Will be set by DexBot or passed in decide_trade
         # self.prediction_engine: Optional[PredictionEngine] = None
         # self.risk_manager: Optional[RiskManager] = None
@@ -66,7 +215,7 @@ class AIAgent:
         # Default 'HOLD' decision in case of errors
         default_hold_decision = {
             "decision": "HOLD",
-            "token_pair": f"{aggregated_inputs_model.target_pair.symbol if aggregated_inputs_model.target_pair else 'N/A'}",
+            "token_pair": (aggregated_inputs_model.target_pair or {}).get('symbol', 'N/A'),
             "amount_usd": None,
             "confidence": 0.1,
             "stop_loss_price": None,
@@ -83,16 +232,30 @@ class AIAgent:
         #     default_hold_decision['reasoning'] = f"AIAgent internal error: Invalid aggregated inputs. Details: {e.errors()}"
         #     return default_hold_decision
 
+        # 0. Reuse the decision taken for near-identical inputs (skips the Gemini round-trip)
+        signature: Optional[DecisionSignature] = None
+        if self._decision_cache_enabled:
+            try:
+                signature = decision_signature(aggregated_inputs_model, self._decision_price_bucket_pct)
+                cached_decision = self._cached_decision(signature)
+                if cached_decision is not None:
+                    logger.info("Reusing cached AI decision for near-identical inputs: %s", cached_decision.get("decision"))
+                    return dict(cached_decision)
+            except Exception as e:
+                logger.warning(f"AI decision cache lookup failed, querying Gemini: {e}")
+                signature = None
+
         # 1. Prepare prompt for Gemini
         prompt_for_gemini: Optional[str] = None
         try:
-            # Log a snippet of inputs (or full if debug enabled later)
-            inputs_for_log_dict = aggregated_inputs_model.model_dump(exclude_none=True, exclude={'market_data': {'recent_ohlcv_1h'}}) # Example exclusion for brevity
-            inputs_snippet_log = json.dumps(inputs_for_log_dict, default=str, indent=2)
-
-            if len(inputs_snippet_log) > (self.config.LOG_MAX_MSG_LENGTH // 2): # Use a config for max log length
-                inputs_snippet_log = inputs_snippet_log[:(self.config.LOG_MAX_MSG_LENGTH // 2)] + "... (inputs truncated for log)"
-            logger.debug(f"AIAgent.decide_trade called with inputs (snippet): {inputs_snippet_log}")
+            # Log a snippet of inputs; only serialized when DEBUG is enabled
+            if logger.isEnabledFor(logging.DEBUG):
+                inputs_for_log_dict = aggregated_inputs_model.model_dump(exclude_none=True, exclude={'market_data': {'recent_ohlcv_1h'}}) # Example exclusion for brevity
+                inputs_snippet_log = _dumps_indented(inputs_for_log_dict)
+
+                if len(inputs_snippet_log) > (self.config.LOG_MAX_MSG_LENGTH // 2): # Use a config for max log length
+                    inputs_snippet_log = inputs_snippet_log[:(self.config.LOG_MAX_MSG_LENGTH // 2)] + "... (inputs truncated for log)"
+                logger.debug("AIAgent.decide_trade called with inputs (snippet): %s", inputs_snippet_log)
             
         except Exception as e:
             logger.error(f"Erreur lors de la préparation du snippet de log des inputs pour AIAgent: {e}", exc_info=True)
@@ -101,9 +264,9 @@ class AIAgent:
         try:
             prompt_for_gemini = self._construct_gemini_prompt(aggregated_inputs_model)
             if self.get_config().app.debug_PROMPTS: # Instruction 5 from review
-                logger.debug(f"Full prompt for Gemini:\\n{prompt_for_gemini}")
-            elif len(prompt_for_gemini) > 2000 : # Log snippet if too long and not debug
-                 logger.debug(f"Prompt for Gemini (snippet):\n{prompt_for_gemini[:1000]}\\n...\\n{prompt_for_gemini[-1000:]}")
+                logger.debug("Full prompt for Gemini:\n%s", prompt_for_gemini)
+            elif len(prompt_for_gemini) > 2000 and logger.isEnabledFor(logging.DEBUG): # Log snippet if too long and not debug
+                 logger.debug("Prompt for Gemini (snippet):\n%s\n...\n%s", prompt_for_gemini[:1000], prompt_for_gemini[-1000:])
 
         except Exception as e:
             logger.error(f"Erreur lors de la construction du prompt pour Gemini: {e}", exc_info=True)
@@ -113,8 +276,8 @@ class AIAgent:
         # Determine max_output_tokens based on config (Instruction 6 from review)
         max_output_tokens = self.config.GEMINI_MAX_TOKENS_OUTPUT
 
-        # 2. Call GeminiClient
-        gemini_response = await self.gemini_client.get_decision(prompt_for_gemini, max_output_tokens=max_output_tokens)
+        # 2. Call GeminiClient (rate-limited, short-circuited while the breaker is open)
+        gemini_response = await self._guarded_gemini_call(prompt_for_gemini, max_output_tokens)
 
         # 3. Handle GeminiClient response
         if not gemini_response['success']:
@@ -145,7 +308,8 @@ class AIAgent:
                 logger.warning(f"Gemini returned {validated_decision.decision} without amount_usd. Invalidating. Raw: {parsed_json_data}")
                 raise ValidationError("BUY/SELL decision must include amount_usd.", TradeDecisionModel)
 
-            logger.info(f"Validated AI Decision: {validated_decision.model_dump_json(indent=2)}")
+            if logger.isEnabledFor(logging.INFO): # Serialized only if the record is emitted
+                logger.info("Validated AI Decision: %s", validated_decision.model_dump_json(indent=2))
             
             # Convert Pydantic model to dict for TradeExecutor
             # This is already the format expected by execute_agent_order
@@ -159,7 +323,7 @@ class AIAgent:
             logger.error(f"Gemini response failed Pydantic validation: '{parsed_json_data if 'parsed_json_data' in locals() else raw_decision_text}'. Errors: {e.errors()}", exc_info=True)
             # Log the full text that caused validation error for debugging
             if 'raw_decision_text' in locals():
-                 logger.debug(f"Raw text from Gemini causing validation error: {raw_decision_text}")
+                 logger.debug("Raw text from Gemini causing validation error: %s", raw_decision_text)
             default_hold_decision['reasoning'] = f"AIAgent (Gemini) response failed validation. Details: {e.errors()}"
             return default_hold_decision
         except Exception as e:
@@ -168,28 +332,77 @@ class AIAgent:
             return default_hold_decision
 
         logger.info(f"AIAgent final decision for TradeExecutor: {final_decision_for_executor}")
+        if signature is not None: # Only validated Gemini decisions are cached, never the fallback HOLD
+            self._decision_cache[signature.key] = (signature, dict(final_decision_for_executor))
         return final_decision_for_executor
 
-    def _summarize_ohlcv(self, ohlcv_list: List[Dict], max_candles: int = 12) -> List[Dict]:
-        """Summarizes OHLCV data to include max_candles most recent ones."""
-        if len(ohlcv_list) > max_candles:
-            logger.debug(f"Summarizing OHLCV data from {len(ohlcv_list)} to {max_candles} candles.")
-            return ohlcv_list[-max_candles:]
-        return ohlcv_list
+    def _cached_decision(self, signature: DecisionSignature) -> Optional[Dict[str, Any]]:
+        """Exact hit on the signature key, else a cached decision whose buckets are all adjacent (same context)."""
+        entry = self._decision_cache.get(signature.key)
+        if entry is not None:
+            return entry[1]
+        for cached_signature, decision in list(self._decision_cache.values()):
+            if signature.is_near(cached_signature):
+                return decision
+        return None
+
+    async def _wait_for_gemini_token(self) -> None:
+        """Token bucket: refills at `_gemini_rate` tokens/s up to `_gemini_burst`, waits when empty."""
+        if self._gemini_rate is None:
+            return
+        while True:
+            now = time.monotonic()
+            self._gemini_tokens = min(self._gemini_burst, self._gemini_tokens + (now - self._gemini_tokens_at) * self._gemini_rate)
+            self._gemini_tokens_at = now
+            if self._gemini_tokens >= 1.0:
+                self._gemini_tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._gemini_tokens) / self._gemini_rate)
+
+    def _record_gemini_outcome(self, failed: bool) -> None:
+        """Opens the breaker for `_breaker_cooldown` s when the failure rate over the window exceeds the threshold."""
+        self._gemini_outcomes.append(failed)
+        if len(self._gemini_outcomes) < self._gemini_outcomes.maxlen:
+            return
+        failure_rate = sum(self._gemini_outcomes) / len(self._gemini_outcomes)
+        if failure_rate > self._breaker_failure_rate:
+            self._breaker_open_until = time.monotonic() + self._breaker_cooldown
+            self._gemini_outcomes.clear() # Fresh window once the cooldown is over
+            logger.error("Gemini failure rate %.0f%% over the last calls: circuit breaker open for %.0fs.",
+                         failure_rate * 100, self._breaker_cooldown)
+
+    async def _guarded_gemini_call(self, prompt: str, max_output_tokens: int) -> Dict[str, Any]:
+        """GeminiClient.get_decision behind the concurrency limit, the rate limit and the circuit breaker."""
+        if time.monotonic() < self._breaker_open_until:
+            return {'success': False, 'error': 'Gemini circuit breaker open (recent failures), call skipped.'}
+        async with self._gemini_semaphore:
+            await self._wait_for_gemini_token()
+            try:
+                response = await self.gemini_client.get_decision(prompt, max_output_tokens=max_output_tokens)
+            except Exception as e:
+                logger.error(f"Unexpected error calling Gemini: {e}", exc_info=True)
+                response = {'success': False, 'error': str(e)}
+        self._record_gemini_outcome(not response.get('success'))
+        return response
+
+    def _summarize_ohlcv(self, ohlcv_list: List[Dict], raw_candles: int = PROMPT_RAW_CANDLES) -> Dict[str, Any]:
+        """Replaces the raw OHLCV list by its indicator summary (see summarize_ohlcv)."""
+        logger.debug("Summarizing %d OHLCV candles for the prompt.", len(ohlcv_list))
+        return summarize_ohlcv(ohlcv_list, raw_candles)
 
     def _summarize_signal_sources(self, signal_sources: List[SignalSourceInput], max_signals: int = 3) -> List[SignalSourceInput]:
         """Summarizes signal sources, prioritizing higher confidence and non-neutral signals."""
         if not signal_sources or len(signal_sources) <= max_signals:
             return signal_sources
 
-        # Sort by confidence (desc) and then by whether it's neutral (False first)
-        sorted_signals = sorted(
+        # Top-k by (non-neutral first, confidence desc): heapq.nlargest avoids sorting the whole list
+        top_signals = heapq.nlargest(
+            max_signals,
             signal_sources, 
-            key=lambda s: (s.signal not in ["NEUTRAL", "HOLD"], s.confidence or 0), 
-            reverse=True
+            key=lambda s: (s.signal not in ["NEUTRAL", "HOLD"], s.confidence or 0)
         )
-        logger.debug(f"Summarizing signal sources from {len(signal_sources)} to {max_signals} based on confidence/type.")
-        return sorted_signals[:max_signals]
+        logger.debug("Summarizing signal sources from %d to %d based on confidence/type.", len(signal_sources), max_signals)
+        return top_signals
 
     def _construct_gemini_prompt(self, aggregated_inputs_model: AggregatedInputs) -> str:
         """
@@ -197,30 +410,29 @@ class AIAgent:
         Includes token optimization strategies.
         (Corresponds to todo/02-todo-ai-api-gemini.md Tâche 3.2 & 3.2.5)
         """
-        current_pair_str = "N/A"
-        if aggregated_inputs_model.target_pair:
-            current_pair_str = aggregated_inputs_model.target_pair.symbol
+        current_pair_str = (aggregated_inputs_model.target_pair or {}).get('symbol', 'N/A')
 
-        # Create a mutable copy for summarization
-        summarized_inputs_dict = aggregated_inputs_model.model_dump(exclude_none=True)
+        # Dump everything except the bulky lists, which are summarized straight from the model
+        # (no deep copy of the candles, no re-validation of the signals through SignalSourceInput(**s))
+        summarized_inputs_dict = aggregated_inputs_model.model_dump(
+            exclude_none=True, exclude={'market_data': {'recent_ohlcv_1h'}, 'signal_sources': True}
+        )
 
         # Summarize market_data.recent_ohlcv_1h
-        if summarized_inputs_dict.get('market_data') and summarized_inputs_dict['market_data'].get('recent_ohlcv_1h'):
-            original_ohlcv = summarized_inputs_dict['market_data']['recent_ohlcv_1h']
-            summarized_ohlcv = self._summarize_ohlcv(original_ohlcv, max_candles=self.config.GEMINI_PROMPT_MAX_OHLCV_CANDLES)
-            summarized_inputs_dict['market_data']['recent_ohlcv_1h'] = summarized_ohlcv
+        market_data = aggregated_inputs_model.market_data
+        if market_data is not None and market_data.recent_ohlcv_1h:
+            summarized_inputs_dict['market_data']['recent_ohlcv_1h_summary'] = self._summarize_ohlcv(market_data.recent_ohlcv_1h)
 
         # Summarize signal_sources
-        if summarized_inputs_dict.get('signal_sources'):
-            original_signals = [SignalSourceInput(**s) for s in summarized_inputs_dict['signal_sources']]
-            summarized_signals = self._summarize_signal_sources(original_signals, max_signals=self.config.GEMINI_PROMPT_MAX_SIGNAL_SOURCES)
-            summarized_inputs_dict['signal_sources'] = [s.model_dump() for s in summarized_signals]
+        if aggregated_inputs_model.signal_sources:
+            summarized_signals = self._summarize_signal_sources(aggregated_inputs_model.signal_sources, max_signals=self.config.GEMINI_PROMPT_MAX_SIGNAL_SOURCES)
+            summarized_inputs_dict['signal_sources'] = [s.model_dump(exclude_none=True) for s in summarized_signals]
         
         # TODO: Add more summarizations for other potentially verbose fields if necessary
         # e.g., long reasoning snippets in signals, news summaries in sentiment_analysis, etc.
 
         try:
-            prompt_payload_json = json.dumps(summarized_inputs_dict, default=str, indent=2)
+            prompt_payload_json = _dumps_indented(summarized_inputs_dict)
         except Exception as e:
             logger.error(f"Error serializing summarized AggregatedInputs for prompt construction: {e}", exc_info=True)
             raise ValueError(f"Could not serialize summarized AggregatedInputs for Gemini prompt: {e}")
@@ -306,7 +518,7 @@ async def main_test_agent():
             liquidity_depth_usd=10000000,
             recent_trend_1h="UPWARD",
             key_support_resistance=KeySupportResistance(support_1=165.0, resistance_1=175.0),
-            trading_volume_24h_usd=500000000
+            volume_24h_usd=500000000
         ),
         signal_sources=[
             SignalSourceInput(source_name="TestStrategy", signal="BUY", confidence=0.7, reasoning_snippet="Test signal shows buy.")
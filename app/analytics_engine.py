@@ -7,13 +7,19 @@ except ImportError:
     import pandas as pd
 import numpy as np
 import logging
+from typing import Dict, List, Optional, Union
 from app.config import get_config
 from app.strategy_framework import BaseStrategy
+from app.strategies import indicators, kernels
 
 class AdvancedTradingStrategy(BaseStrategy):
+    _SIGNAL_NAMES = {kernels.SIGNAL_BUY: 'buy', kernels.SIGNAL_SELL: 'sell', kernels.SIGNAL_HOLD: 'hold'}
+
     def __init__(self):
         super().__init__()
         self.logger = logging.getLogger('Analytics')
+        # Lu une fois (et non à chaque analyse de volume)
+        self._min_liquidity_usd = get_config().trading.min_liquidity_usd
         self.parameters = {
             'rsi_period': 14,
             'macd_fast': 12,
@@ -33,7 +39,7 @@ class AdvancedTradingStrategy(BaseStrategy):
         """Analyse market data DataFrame and optional current pair metrics."""
         current_pair_metrics = kwargs.get('current_pair_metrics')
         try:
-            df = market_data_df
+            df = self.ensure_float_ohlcv(market_data_df)
             if df.empty or len(df) < max(self.parameters['rsi_period'], self.parameters['macd_slow'], self.parameters['atr_period'], self.parameters['rolling_structure_period']): 
                 self.logger.warning("Données historiques insuffisantes pour l'analyse complète.")
                 return {'error': 'Données historiques insuffisantes pour l\'analyse'}
@@ -62,7 +68,10 @@ class AdvancedTradingStrategy(BaseStrategy):
             for col in expected_cols:
                 if col not in df.columns:
                     df[col] = np.nan 
-            return df
+            return self.ensure_float_ohlcv(df)
+        elif isinstance(data, dict) and 'close' in data and 'timestamp' in data:
+            # Colonnes OHLCV (get_historical_prices(..., as_columns=True))
+            return pd.DataFrame(data, copy=False)
         elif isinstance(data, dict) and 'priceHistory' in data: 
             return pd.DataFrame(data['priceHistory'])
         elif isinstance(data, dict) and 'pairs' in data and len(data.get('pairs', [])) > 0: 
@@ -75,28 +84,35 @@ class AdvancedTradingStrategy(BaseStrategy):
 
     def _momentum_score(self, df: pd.DataFrame) -> tuple[float, Optional[float], Optional[float], Optional[float]]:
         try:
-            close = df['close'].astype(float)
-            high = df['high'].astype(float)
-            low = df['low'].astype(float)
-
-            rsi = talib.RSI(close, timeperiod=self.parameters['rsi_period']).iloc[-1]
-            macd_line, macd_signal, _ = talib.MACD(close, 
-                                                fastperiod=self.parameters['macd_fast'], 
-                                                slowperiod=self.parameters['macd_slow'], 
-                                                signalperiod=self.parameters['macd_signal'])
-            stoch_k, _ = talib.STOCH(high, low, close, 
-                                     fastk_period=self.parameters['stoch_k'],
-                                     slowk_period=self.parameters['stoch_d'],
-                                     slowd_period=self.parameters['stoch_d'])
+            close, high, low = df['close'], df['high'], df['low']
+
+            if HAS_TALIB:
+                rsi = talib.RSI(close, timeperiod=self.parameters['rsi_period']).iloc[-1]
+                macd_line, macd_signal, _ = talib.MACD(close, 
+                                                    fastperiod=self.parameters['macd_fast'], 
+                                                    slowperiod=self.parameters['macd_slow'], 
+                                                    signalperiod=self.parameters['macd_signal'])
+                stoch_k, _ = talib.STOCH(high, low, close, 
+                                         fastk_period=self.parameters['stoch_k'],
+                                         slowk_period=self.parameters['stoch_d'],
+                                         slowd_period=self.parameters['stoch_d'])
+                macd_last, macd_signal_last, stoch_k_last = macd_line.iloc[-1], macd_signal.iloc[-1], stoch_k.iloc[-1]
+            else:
+                # Fallback NumPy (pas de rolling().apply) quand TA-Lib n'est pas installé
+                close_np, high_np, low_np = close.to_numpy(), high.to_numpy(), low.to_numpy()
+                rsi = indicators.rsi(close_np, self.parameters['rsi_period'])[-1]
+                macd_line, macd_signal, _ = indicators.macd(close_np,
+                                                            self.parameters['macd_fast'],
+                                                            self.parameters['macd_slow'],
+                                                            self.parameters['macd_signal'])
+                stoch_k, _ = indicators.stoch(high_np, low_np, close_np,
+                                              fastk_period=self.parameters['stoch_k'],
+                                              slowk_period=self.parameters['stoch_d'],
+                                              slowd_period=self.parameters['stoch_d'])
+                macd_last, macd_signal_last, stoch_k_last = macd_line[-1], macd_signal[-1], stoch_k[-1]
             
-            valid_indicators = []
-            if pd.notna(rsi): valid_indicators.append(rsi / 100)
-            if pd.notna(macd_line.iloc[-1]) and pd.notna(macd_signal.iloc[-1]):
-                valid_indicators.append(0.5 + (macd_line.iloc[-1] - macd_signal.iloc[-1]) * 0.1)
-            if pd.notna(stoch_k.iloc[-1]): valid_indicators.append(stoch_k.iloc[-1] / 100)
-
-            score = np.mean(valid_indicators) if valid_indicators else 0.5
-            return score, rsi, macd_line.iloc[-1], stoch_k.iloc[-1]
+            score = kernels.momentum_blend(float(rsi), float(macd_last), float(macd_signal_last), float(stoch_k_last))
+            return score, rsi, macd_last, stoch_k_last
         except Exception as e:
             self.logger.error(f"Erreur calcul momentum: {str(e)}", exc_info=True)
             return 0.5, None, None, None
@@ -104,28 +120,27 @@ class AdvancedTradingStrategy(BaseStrategy):
     def _volume_analysis(self, pair_data: Dict) -> int:
         try:
             liquidity = pair_data.get('liquidity_usd', 0.0) 
-            return 1 if liquidity > get_config().MIN_LIQUIDITY_USD else 0
+            return 1 if liquidity > self._min_liquidity_usd else 0
         except Exception as e:
             self.logger.error(f"Erreur analyse volume: {str(e)}")
             return 0
 
     def _market_structure(self, df: pd.DataFrame) -> float:
         try:
-            period = self.parameters['rolling_structure_period']
-            resistance = df['high'].rolling(period).max().iloc[-1]
-            support = df['low'].rolling(period).min().iloc[-1]
-            current = df['close'].iloc[-1]
-            return (current - support) / (resistance - support) if resistance != support else 0.5
+            # Seule la dernière fenêtre est utilisée : inutile de calculer tout le rolling
+            return kernels.market_structure_ratio(df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float),
+                                                  float(df['close'].iloc[-1]), self.parameters['rolling_structure_period'])
         except Exception as e:
             self.logger.error(f"Erreur analyse structure de marché: {str(e)}")
             return 0.5
 
     def _risk_score(self, df: pd.DataFrame) -> float:
         try:
-            high = df['high'].astype(float)
-            low = df['low'].astype(float)
-            close = df['close'].astype(float)
-            atr = talib.ATR(high, low, close, timeperiod=self.parameters['atr_period']).iloc[-1]
+            high, low, close = df['high'], df['low'], df['close']
+            if HAS_TALIB:
+                atr = talib.ATR(high, low, close, timeperiod=self.parameters['atr_period']).iloc[-1]
+            else:
+                atr = indicators.atr(high.to_numpy(), low.to_numpy(), close.to_numpy(), self.parameters['atr_period'])[-1]
             return ((high.iloc[-1] - low.iloc[-1]) / atr) if atr is not None and atr > 0 else 0.0
         except Exception as e:
             self.logger.error(f"Erreur calcul score de risque: {str(e)}")
@@ -141,18 +156,12 @@ class AdvancedTradingStrategy(BaseStrategy):
             market_structure_ratio = analysis.get('market_structure_ratio', 0.5)
             last_price = analysis['last_price']
 
-            signal = 'hold'
-            confidence = 0.5
-
             if volume_quality == 0:
                 return {'signal': 'hold', 'confidence': 0.1, 'reason': 'Low volume quality'}
 
-            if momentum_score > get_config().TRADE_CONFIDENCE_THRESHOLD and market_structure_ratio > 0.6:
-                signal = 'buy'
-                confidence = min(0.95, momentum_score * 0.8 + market_structure_ratio * 0.2)
-            elif momentum_score < (1 - get_config().TRADE_CONFIDENCE_THRESHOLD) and market_structure_ratio < 0.4:
-                signal = 'sell'
-                confidence = min(0.95, (1-momentum_score) * 0.8 + (1-market_structure_ratio) * 0.2)
+            direction, confidence = kernels.combine_signal(float(momentum_score), float(market_structure_ratio),
+                                                           float(get_config().TRADE_CONFIDENCE_THRESHOLD))
+            signal = self._SIGNAL_NAMES[direction]
 
             return {
                 'signal': signal,
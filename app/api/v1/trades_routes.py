@@ -9,6 +9,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from enum import Enum
 from uuid import UUID, uuid4
+import heapq
 import logging
 
 from app.api.v1.auth_routes import require_auth, User, verify_token, TokenData
@@ -158,11 +159,9 @@ async def get_trade_history(
             if t.token_in == token or t.token_out == token
         ]
     
-    # Sort by timestamp descending (newest first)
-    filtered_trades.sort(key=lambda t: t.timestamp, reverse=True)
-    
-    # Apply pagination
-    return filtered_trades[skip:skip + limit]
+    # Newest first, pagination applied on the top skip + limit only (no full sort)
+    newest_trades = heapq.nlargest(skip + limit, filtered_trades, key=lambda t: t.timestamp)
+    return newest_trades[skip:]
 
 @router.get("/history/{trade_id}", response_model=Trade)
 async def get_trade_by_id(
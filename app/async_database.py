@@ -0,0 +1,226 @@
+"""
+Pool de connexions SQLite asynchrone pour les accès faits depuis la boucle du bot.
+
+EnhancedDatabase reste l'API synchrone de référence (schéma, configuration, UI) ; ce pool
+ne couvre que les requêtes exécutées à chaque cycle (trades actifs, insertion groupée des
+trades, blacklist) afin de ne plus bloquer la boucle asyncio sur sqlite3.
+
+Avec aiosqlite, chaque connexion tourne dans son propre thread ; sans aiosqlite, les
+connexions sqlite3 du pool sont utilisées via asyncio.to_thread (une tâche à la fois par
+connexion, garanti par le pool).
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.config import get_config
+from app.database import ACTIVE_TRADE_STATS_SQL, ACTIVE_TRADES_SQL, BLACKLIST_SQL, TRADE_INSERT_SQL, build_trade_row
+
+try:
+    import aiosqlite
+    HAS_AIOSQLITE = True
+except ImportError:
+    HAS_AIOSQLITE = False
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadedCursor:
+    """Curseur sqlite3 dont la lecture par lots s'exécute hors de la boucle asyncio."""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    async def fetchmany(self, size: int) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self._cursor.fetchmany, size)
+
+    async def close(self) -> None:
+        self._cursor.close()
+
+
+class _ThreadedConnection:
+    """Connexion sqlite3 exposant le sous-ensemble asynchrone de l'API aiosqlite utilisé par le pool."""
+
+    def __init__(self, db_path: str, timeout: float):
+        self._conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+    async def execute_fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(lambda: self._conn.execute(sql, params).fetchall())
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> _ThreadedCursor:
+        return _ThreadedCursor(await asyncio.to_thread(self._conn.execute, sql, params))
+
+    async def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> None:
+        await asyncio.to_thread(self._conn.executemany, sql, rows)
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self._conn.commit)
+
+    async def rollback(self) -> None:
+        await asyncio.to_thread(self._conn.rollback)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._conn.close)
+
+
+class AsyncDatabasePool:
+    """
+    Pool borné de connexions SQLite (min_size ouvertes d'avance, jusqu'à max_size à la demande).
+
+    Chaque commande est limitée à `command_timeout` secondes. Les erreurs SQL sont
+    journalisées et converties en valeur de retour neutre (None / False / []),
+    comme dans EnhancedDatabase.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, command_timeout: Optional[float] = None):
+        db_config = get_config().database
+        self.db_path = db_path or db_config.db_path
+        self.min_size = min_size if min_size is not None else db_config.pool_min_size
+        self.max_size = max(self.min_size, max_size if max_size is not None else db_config.pool_max_size)
+        self.command_timeout = command_timeout if command_timeout is not None else db_config.command_timeout_seconds
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._size = 0
+        self._closed = False
+        # Instantané de la blacklist (voir EnhancedDatabase.is_blacklisted)
+        self._blacklist: Optional[Set[str]] = None
+        self._blacklist_loaded_at = float('-inf')
+        self._blacklist_refresh_seconds = db_config.blacklist_refresh_seconds
+
+    @classmethod
+    async def create(cls, db_path: Optional[str] = None, min_size: Optional[int] = None,
+                     max_size: Optional[int] = None, command_timeout: Optional[float] = None) -> "AsyncDatabasePool":
+        pool = cls(db_path, min_size, max_size, command_timeout)
+        for _ in range(pool.min_size):
+            pool._idle.put_nowait(await pool._connect())
+        logger.info(
+            f"AsyncDatabasePool ouvert sur {pool.db_path} ({pool.min_size}-{pool.max_size} connexions, "
+            f"{'aiosqlite' if HAS_AIOSQLITE else 'sqlite3 + threads'})."
+        )
+        return pool
+
+    async def _connect(self):
+        self._size += 1
+        try:
+            if HAS_AIOSQLITE:
+                conn = await aiosqlite.connect(self.db_path, timeout=self.command_timeout)
+                conn.row_factory = sqlite3.Row
+                return conn
+            return _ThreadedConnection(self.db_path, self.command_timeout)
+        except Exception:
+            self._size -= 1
+            raise
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        if self._closed:
+            raise RuntimeError("AsyncDatabasePool is closed")
+        if self._idle.empty() and self._size < self.max_size:
+            conn = await self._connect()
+        else:
+            conn = await asyncio.wait_for(self._idle.get(), timeout=self.command_timeout)
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                await conn.close()
+                self._size -= 1
+            else:
+                self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Any]:
+        """Connexion du pool dont les commandes sont validées ensemble (rollback en cas d'erreur)."""
+        async with self.acquire() as conn:
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            await asyncio.wait_for(conn.commit(), timeout=self.command_timeout)
+
+    async def fetch(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        async with self.acquire() as conn:
+            rows = await asyncio.wait_for(conn.execute_fetchall(sql, params), timeout=self.command_timeout)
+        return [dict(row) for row in rows]
+
+    async def iter_rows(self, sql: str, params: Sequence[Any] = (), chunk_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Lit le résultat par lots de `chunk_size` lignes (la connexion reste réservée jusqu'à la fin de l'itération)."""
+        async with self.acquire() as conn:
+            cursor = await asyncio.wait_for(conn.execute(sql, params), timeout=self.command_timeout)
+            try:
+                while True:
+                    rows = await asyncio.wait_for(cursor.fetchmany(chunk_size), timeout=self.command_timeout)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield dict(row)
+            finally:
+                await cursor.close()
+
+    async def iter_active_trades(self) -> AsyncIterator[Dict[str, Any]]:
+        async for row in self.iter_rows(ACTIVE_TRADES_SQL):
+            yield row
+
+    async def get_active_trade_stats(self) -> Tuple[int, float]:
+        """(nombre de trades ouverts, somme de leurs montants USD), agrégés en SQL."""
+        try:
+            async with self.acquire() as conn:
+                rows = await asyncio.wait_for(conn.execute_fetchall(ACTIVE_TRADE_STATS_SQL), timeout=self.command_timeout)
+            count, exposure = rows[0]
+            return int(count), float(exposure)
+        except (sqlite3.Error, asyncio.TimeoutError) as e:
+            logger.error(f"Error computing active trade stats: {e}")
+            return 0, 0.0
+
+    async def get_active_trades(self) -> List[Dict[str, Any]]:
+        try:
+            return await self.fetch(ACTIVE_TRADES_SQL)
+        except (sqlite3.Error, asyncio.TimeoutError) as e:
+            logger.error(f"Error reading active trades: {e}")
+            return []
+
+    async def get_blacklist_set(self) -> Set[str]:
+        """Toutes les adresses blacklistées, en une requête."""
+        async with self.acquire() as conn:
+            rows = await asyncio.wait_for(conn.execute_fetchall(BLACKLIST_SQL), timeout=self.command_timeout)
+        return {row[0] for row in rows}
+
+    async def is_blacklisted(self, address: str) -> bool:
+        now = time.monotonic()
+        if self._blacklist is None or now - self._blacklist_loaded_at >= self._blacklist_refresh_seconds:
+            try:
+                self._blacklist = await self.get_blacklist_set()
+                self._blacklist_loaded_at = now
+            except (sqlite3.Error, asyncio.TimeoutError) as e:
+                logger.error(f"Error loading the blacklist: {e}")
+                if self._blacklist is None:
+                    return False
+        return address in self._blacklist
+
+    async def record_trade(self, trade_data: dict) -> bool:
+        return bool(await self.record_trades_bulk([trade_data]))
+
+    async def record_trades_bulk(self, trades: List[dict]) -> Optional[int]:
+        """Équivalent asynchrone de EnhancedDatabase.record_trades_bulk (une seule transaction)."""
+        rows = [row for row in (build_trade_row(trade, logger) for trade in trades) if row is not None]
+        if not rows:
+            return 0
+        try:
+            async with self.transaction() as conn:
+                await asyncio.wait_for(conn.executemany(TRADE_INSERT_SQL, rows), timeout=self.command_timeout)
+            return len(rows)
+        except (sqlite3.Error, asyncio.TimeoutError) as e:
+            logger.error(f"Erreur enregistrement groupé de {len(rows)} trades: {e}")
+            return None
+
+    async def close(self) -> None:
+        self._closed = True
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+            self._size -= 1
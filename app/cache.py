@@ -0,0 +1,104 @@
+"""
+Cache à deux niveaux : TTLCache en mémoire (L1) devant Redis (L2, partagé entre instances).
+
+Redis est optionnel : si le module n'est pas installé, si REDIS_ENABLED est faux ou si le
+serveur devient injoignable, le cache continue de fonctionner avec le seul niveau mémoire.
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+from cachetools import TTLCache
+
+from app.config import get_config
+
+try:
+    import redis.asyncio as redis_asyncio
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(value: Any) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(value)
+    return json.dumps(value).encode()
+
+
+def _loads(raw: bytes) -> Any:
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class RedisCache:
+    """
+    Cache clé/valeur JSON avec TTL court, partagé via Redis quand il est disponible.
+
+    Les lectures passent d'abord par le TTLCache local ; en cas d'absence, Redis est
+    interrogé et la valeur trouvée est recopiée localement. Les erreurs Redis sont
+    journalisées puis Redis est désactivé pour cette instance (pas d'exception remontée).
+    """
+
+    def __init__(self, prefix: str, default_ttl: int, url: Optional[str] = None,
+                 enabled: Optional[bool] = None, local_maxsize: int = 1024):
+        redis_config = get_config().redis
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.local_cache = TTLCache(maxsize=local_maxsize, ttl=default_ttl)
+        self._redis = None
+
+        use_redis = redis_config.enabled if enabled is None else enabled
+        if use_redis and not HAS_REDIS:
+            logger.warning(f"RedisCache '{prefix}': module redis non installé, cache mémoire uniquement.")
+        elif use_redis:
+            # redis.asyncio.from_url gère aussi les sockets Unix (unix:///path/redis.sock)
+            self._redis = redis_asyncio.from_url(url or redis_config.url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _disable_redis(self, error: Exception) -> None:
+        logger.warning(f"RedisCache '{self.prefix}': Redis indisponible ({error}), repli sur le cache mémoire.")
+        self._redis = None
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local_cache.get(key)
+        if value is not None or self._redis is None:
+            return value
+        try:
+            raw = await self._redis.get(self._key(key))
+        except Exception as e:
+            self._disable_redis(e)
+            return None
+        if raw is None:
+            return None
+        value = _loads(raw)
+        self.local_cache[key] = value
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.local_cache[key] = value
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(self._key(key), _dumps(value), ex=ttl or self.default_ttl)
+        except Exception as e:
+            self._disable_redis(e)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception as e:
+                logger.debug(f"RedisCache '{self.prefix}': erreur à la fermeture: {e}")
+            self._redis = None
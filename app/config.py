@@ -234,6 +234,11 @@ class DatabaseConfig(BaseConfigSection):
     
     database_url: str = ""
     db_path: str = ""
+    pool_min_size: int = 5
+    pool_max_size: int = 20
+    command_timeout_seconds: float = 5.0
+    # Rechargement de l'instantané de la blacklist (un SELECT pour toutes les adresses)
+    blacklist_refresh_seconds: float = 300.0
     
     def _load_configuration(self):
         default_db_path = os.path.join("data", "numerusx.db")
@@ -242,6 +247,11 @@ class DatabaseConfig(BaseConfigSection):
             "DATABASE_URL", 
             f"sqlite:///{self.db_path}"
         )
+        # Pool asynchrone utilisé par la boucle du bot (app/async_database.py)
+        self.pool_min_size = self._get_env_value("DB_POOL_MIN_SIZE", 5, value_type=int)
+        self.pool_max_size = self._get_env_value("DB_POOL_MAX_SIZE", 20, value_type=int)
+        self.command_timeout_seconds = self._get_env_value("DB_COMMAND_TIMEOUT_SECONDS", 5.0, value_type=float)
+        self.blacklist_refresh_seconds = self._get_env_value("BLACKLIST_REFRESH_SECONDS", 300.0, value_type=float)
     
     def ensure_db_directory(self) -> str:
         """Crée le répertoire de la base de données si nécessaire."""
@@ -260,6 +270,8 @@ class RedisConfig(BaseConfigSection):
         self.password: Optional[str] = None
         self.db: int = 0
         self.url: str = ""
+        self.enabled: bool = False
+        self.pair_cache_ttl_seconds: int = 15
         super().__init__()
     
     def _load_configuration(self):
@@ -278,6 +290,9 @@ class RedisConfig(BaseConfigSection):
             default_url = f"redis://{self.host}:{self.port}/{self.db}"
         
         self.url = self._get_env_value("REDIS_URL", default_url)
+        # Cache partagé (app.cache.RedisCache) ; désactivé => cache mémoire uniquement
+        self.enabled = self._get_env_value("REDIS_ENABLED", False, value_type=bool)
+        self.pair_cache_ttl_seconds = self._get_env_value("REDIS_PAIR_CACHE_TTL_SECONDS", 15, value_type=int)
 
 
 @dataclass
@@ -396,14 +411,45 @@ class TradingConfig(BaseConfigSection):
     """Configuration des paramètres de trading."""
     
     base_asset: str = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
+    # Symbole de base_asset dans les paires cibles ("SOL/USDC")
+    base_asset_symbol: str = "USDC"
     slippage_bps: int = 50
     min_liquidity_usd: float = 10000.0
     max_open_positions: int = 5
     max_order_size_usd: float = 1000.0
+    # Part maximale (en %) du portefeuille engagée sur un seul trade, transmise à l'AIAgent
+    max_portfolio_exposure_per_trade: float = 10.0
     min_order_value_usd: float = 10.0
     trade_confidence_threshold: float = 0.65
     trading_update_interval_seconds: int = 60
+    # Cadence adaptative : un mouvement de prix >= price_move_threshold_pct ramène l'attente au plancher
+    price_move_threshold_pct: float = 1.0
+    min_cycle_interval_seconds: float = 1.0
+    # Plafond du backoff exponentiel après des cycles en échec consécutifs
+    max_error_backoff_seconds: float = 900.0
+    # Échantillons (valeur du portefeuille, trades) conservés par PerformanceMonitor
+    performance_history_capacity: int = 4096
     initial_portfolio_balance_usd: float = 1000.0
+    target_trading_pairs: List[str] = field(default_factory=lambda: ["SOL/USDC"])
+    max_concurrent_pairs: int = 3
+    # Swaps (quote + transaction RPC) exécutés simultanément au plus
+    max_concurrent_executions: int = 2
+    # Requêtes de données de marché (DexScreener, RPC, APIs de sécurité) simultanées au plus
+    max_concurrent_md_requests: int = 2 * (os.cpu_count() or 4)
+    mint_cache_path: str = os.path.join("data", "mint_cache.json")
+    portfolio_value_ttl_seconds: float = 2.0
+    # Durée de validité d'un résultat de SecurityChecker.check_token_security
+    security_cache_ttl_seconds: int = 3600
+    # Cache des décisions de l'AIAgent (entrées quasi identiques entre deux cycles)
+    ai_decision_cache_size: int = 128
+    ai_decision_cache_ttl_seconds: int = 120
+    ai_decision_price_bucket_pct: float = 0.25
+    # Appels Gemini : concurrence, débit et disjoncteur (taux d'échec sur les N derniers appels)
+    ai_max_concurrency: int = 2
+    ai_requests_per_minute: float = 30.0 # <= 0 : pas de limite de débit
+    ai_breaker_window_calls: int = 10
+    ai_breaker_failure_rate: float = 0.5
+    ai_breaker_cooldown_seconds: float = 120.0
     
     # Paramètres avancés
     signal_expiry_seconds: int = 300
@@ -422,14 +468,35 @@ class TradingConfig(BaseConfigSection):
     
     def _load_configuration(self):
         self.base_asset = self._get_env_value("BASE_ASSET", self.base_asset)
+        self.base_asset_symbol = self._get_env_value("BASE_ASSET_SYMBOL", "USDC")
         self.slippage_bps = self._get_env_value("SLIPPAGE_BPS", 50, value_type=int)
         self.min_liquidity_usd = self._get_env_value("MIN_LIQUIDITY_USD", 10000.0, value_type=float)
         self.max_open_positions = self._get_env_value("MAX_OPEN_POSITIONS", 5, value_type=int)
         self.max_order_size_usd = self._get_env_value("MAX_ORDER_SIZE_USD", 1000.0, value_type=float)
+        self.max_portfolio_exposure_per_trade = self._get_env_value("MAX_PORTFOLIO_EXPOSURE_PER_TRADE", 10.0, value_type=float)
         self.min_order_value_usd = self._get_env_value("MIN_ORDER_VALUE_USD", 10.0, value_type=float)
         self.trade_confidence_threshold = self._get_env_value("TRADE_CONFIDENCE_THRESHOLD", 0.65, value_type=float)
         self.trading_update_interval_seconds = self._get_env_value("TRADING_UPDATE_INTERVAL_SECONDS", 60, value_type=int)
+        self.price_move_threshold_pct = self._get_env_value("PRICE_MOVE_THRESHOLD_PCT", 1.0, value_type=float)
+        self.min_cycle_interval_seconds = self._get_env_value("MIN_CYCLE_INTERVAL_SECONDS", 1.0, value_type=float)
+        self.max_error_backoff_seconds = self._get_env_value("MAX_ERROR_BACKOFF_SECONDS", 900.0, value_type=float)
+        self.performance_history_capacity = self._get_env_value("PERF_HISTORY_MAX", 4096, value_type=int)
         self.initial_portfolio_balance_usd = self._get_env_value("INITIAL_PORTFOLIO_BALANCE_USD", 1000.0, value_type=float)
+        self.target_trading_pairs = self._get_env_value("TARGET_TRADING_PAIRS", ["SOL/USDC"], value_type=list)
+        self.max_concurrent_pairs = self._get_env_value("MAX_CONCURRENT_PAIRS", 3, value_type=int)
+        self.max_concurrent_executions = self._get_env_value("MAX_CONCURRENT_EXECUTIONS", 2, value_type=int)
+        self.max_concurrent_md_requests = self._get_env_value("MAX_CONCURRENT_MD_REQUESTS", 2 * (os.cpu_count() or 4), value_type=int)
+        self.mint_cache_path = self._get_env_value("MINT_CACHE_PATH", os.path.join("data", "mint_cache.json"))
+        self.portfolio_value_ttl_seconds = self._get_env_value("PORTFOLIO_VALUE_TTL_SECONDS", 2.0, value_type=float)
+        self.security_cache_ttl_seconds = self._get_env_value("SECURITY_CACHE_TTL_SECONDS", 3600, value_type=int)
+        self.ai_decision_cache_size = self._get_env_value("AI_DECISION_CACHE_SIZE", 128, value_type=int)
+        self.ai_decision_cache_ttl_seconds = self._get_env_value("AI_DECISION_CACHE_TTL_SECONDS", 120, value_type=int)
+        self.ai_decision_price_bucket_pct = self._get_env_value("AI_DECISION_PRICE_BUCKET_PCT", 0.25, value_type=float)
+        self.ai_max_concurrency = self._get_env_value("AI_MAX_CONCURRENCY", 2, value_type=int)
+        self.ai_requests_per_minute = self._get_env_value("AI_REQUESTS_PER_MINUTE", 30.0, value_type=float)
+        self.ai_breaker_window_calls = self._get_env_value("AI_BREAKER_WINDOW_CALLS", 10, value_type=int)
+        self.ai_breaker_failure_rate = self._get_env_value("AI_BREAKER_FAILURE_RATE", 0.5, value_type=float)
+        self.ai_breaker_cooldown_seconds = self._get_env_value("AI_BREAKER_COOLDOWN_SECONDS", 120.0, value_type=float)
         
         # Paramètres avancés
         self.signal_expiry_seconds = self._get_env_value("SIGNAL_EXPIRY_SECONDS", 300, value_type=int)
@@ -459,6 +526,11 @@ class APIConfig(BaseConfigSection):
     # Services externes
     dexscreener_api_url: str = "https://api.dexscreener.com/latest/dex"
     dexscreener_api_key: Optional[str] = None
+    # Pool de connexions HTTP partagé (keep-alive, cache DNS) des clients du bot
+    http_pool_limit: int = 100
+    http_pool_limit_per_host: int = 20
+    http_dns_cache_ttl_seconds: int = 300
+    http_keepalive_timeout_seconds: int = 60
     
     def _load_configuration(self):
         self.host = self._get_env_value("API_HOST", "0.0.0.0")
@@ -479,6 +551,10 @@ class APIConfig(BaseConfigSection):
             "DEXSCREENER_API_KEY",
             encrypted_key="ENCRYPTED_DEXSCREENER_API_KEY"
         )
+        self.http_pool_limit = self._get_env_value("HTTP_POOL_LIMIT", 100, value_type=int)
+        self.http_pool_limit_per_host = self._get_env_value("HTTP_POOL_LIMIT_PER_HOST", 20, value_type=int)
+        self.http_dns_cache_ttl_seconds = self._get_env_value("HTTP_DNS_CACHE_TTL_SECONDS", 300, value_type=int)
+        self.http_keepalive_timeout_seconds = self._get_env_value("HTTP_KEEPALIVE_TIMEOUT_SECONDS", 60, value_type=int)
 
 
 class NumerusXConfig:
@@ -1,20 +1,120 @@
 import sqlite3
 import json
 import os
-from typing import Optional, Dict, List
+import threading
+import time
+from typing import Optional, Dict, Iterator, List, Set, Tuple
 from app.config import get_config
 import logging
 from datetime import datetime
 import uuid
 
+# Requêtes partagées avec AsyncDatabasePool (app/async_database.py)
+BLACKLIST_SQL = 'SELECT address FROM blacklist'
+TRADE_INSERT_SQL = '''
+    INSERT INTO trades 
+    (pair_address, amount, entry_price, protocol, token_symbol, trade_id_external, side, 
+     jupiter_quote_response, jupiter_transaction_data, slippage_bps, transaction_signature, 
+     last_valid_block_height, ai_decision_id, execution_time_ms, gas_used, confidence_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+ACTIVE_TRADES_SQL = '''
+    SELECT id, pair_address, amount, entry_price, protocol, timestamp, token_symbol, trade_id_external, side, 
+           jupiter_quote_response, jupiter_transaction_data, slippage_bps, transaction_signature, 
+           last_valid_block_height, ai_decision_id, execution_time_ms, gas_used, confidence_score
+    FROM trades WHERE status = 'open' AND UPPER(side) = 'BUY'
+'''
+
+# Seules les lignes BUY ouvertes sont des positions : une ligne SELL enregistre la vente, elle
+# ferme (ou réduit) les BUY de la paire via EnhancedDatabase.release_open_position
+ACTIVE_TRADE_STATS_SQL = "SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM trades WHERE status = 'open' AND UPPER(side) = 'BUY'"
+
+
+def build_trade_row(trade_data: dict, logger: logging.Logger) -> Optional[tuple]:
+    """Validates trade_data and returns the parameter tuple for TRADE_INSERT_SQL (None if invalid)."""
+    # Input validation
+    if not all(k in trade_data for k in ['pair', 'amount']):
+        logger.error("Missing required keys in trade_data for record_trade (pair, amount).")
+        return None
+    if not isinstance(trade_data['pair'], str) or not trade_data['pair']:
+        logger.error("Invalid 'pair' in trade_data for record_trade.")
+        return None
+    try:
+        amount = float(trade_data['amount'])
+        entry_price = float(trade_data.get('entry_price', 0.0))
+        slippage_bps_raw = trade_data.get('slippage_bps')
+        slippage_bps = int(slippage_bps_raw) if slippage_bps_raw is not None else get_config().jupiter.default_slippage_bps
+        last_valid_block_height_raw = trade_data.get('last_valid_block_height')
+        last_valid_block_height = int(last_valid_block_height_raw) if last_valid_block_height_raw is not None else None
+        confidence_score = float(trade_data.get('confidence_score', 0.0)) if trade_data.get('confidence_score') else None
+        execution_time_ms = int(trade_data.get('execution_time_ms', 0)) if trade_data.get('execution_time_ms') else None
+        gas_used = int(trade_data.get('gas_used', 0)) if trade_data.get('gas_used') else None
+    except (TypeError, ValueError):
+        logger.error("Invalid numerical values in trade_data.")
+        return None
+
+    # Handle JSON fields carefully (already serialized strings are stored as-is)
+    jupiter_quote_response = trade_data.get('jupiter_quote_response')
+    jupiter_transaction_data = trade_data.get('jupiter_transaction_data')
+    jupiter_quote_response_json = (jupiter_quote_response if isinstance(jupiter_quote_response, str) else json.dumps(jupiter_quote_response)) if jupiter_quote_response else None
+    jupiter_transaction_data_json = (jupiter_transaction_data if isinstance(jupiter_transaction_data, str) else json.dumps(jupiter_transaction_data)) if jupiter_transaction_data else None
+
+    return (
+        trade_data['pair'],
+        amount,
+        entry_price,
+        trade_data.get('protocol', 'Jupiter'),
+        trade_data.get('token_symbol'),
+        trade_data.get('trade_id'),
+        trade_data.get('side'),
+        jupiter_quote_response_json,
+        jupiter_transaction_data_json,
+        slippage_bps,
+        trade_data.get('transaction_signature'),
+        last_valid_block_height,
+        trade_data.get('ai_decision_id'),
+        execution_time_ms,
+        gas_used,
+        confidence_score
+    )
+
+
 class EnhancedDatabase:
+    # Instances partagées, une par (chemin, thread) : sqlite3 interdit l'usage
+    # d'une connexion depuis un autre thread que celui qui l'a créée.
+    _shared_instances: Dict[Tuple[str, int], "EnhancedDatabase"] = {}
+    _shared_lock = threading.Lock()
+
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or get_config().database.db_path
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
         self.logger = logging.getLogger('Database')
+        # Instantané de la blacklist pour is_blacklisted (une requête pour toutes les adresses),
+        # rechargé toutes les blacklist_refresh_seconds
+        self._blacklist: Optional[Set[str]] = None
+        self._blacklist_loaded_at = float('-inf')
+        self._blacklist_refresh_seconds = get_config().database.blacklist_refresh_seconds
         self._init_db()
 
+    @classmethod
+    def get_shared(cls, db_path: Optional[str] = None) -> "EnhancedDatabase":
+        """Returns the shared instance for this database path and the calling thread.
+
+        Components of the bot (PortfolioManager, SecurityChecker, ...) should use this
+        instead of constructing their own EnhancedDatabase, so that a single connection
+        (and a single schema init) is used per process/thread.
+        """
+        path = db_path or get_config().database.db_path
+        key = (path, threading.get_ident())
+        with cls._shared_lock:
+            instance = cls._shared_instances.get(key)
+            if instance is None or instance.conn is None:
+                instance = cls(path)
+                cls._shared_instances[key] = instance
+            return instance
+
     def _init_db(self):
         # Ensure the database directory exists
         db_dir = os.path.dirname(self.db_path)
@@ -231,62 +331,40 @@ class EnhancedDatabase:
                 CREATE INDEX IF NOT EXISTS idx_prefs_key ON user_preferences(preference_key);
             ''')
 
-    def record_trade(self, trade_data: dict):
-        try:
-            # Input validation
-            if not all(k in trade_data for k in ['pair', 'amount']):
-                self.logger.error("Missing required keys in trade_data for record_trade (pair, amount).")
-                return
-            if not isinstance(trade_data['pair'], str) or not trade_data['pair']:
-                self.logger.error("Invalid 'pair' in trade_data for record_trade.")
-                return
-            try:
-                amount = float(trade_data['amount'])
-                entry_price = float(trade_data.get('entry_price', 0.0))
-                slippage_bps = int(trade_data.get('slippage_bps', get_config().jupiter.default_slippage_bps if hasattr(Config, 'JUPITER_DEFAULT_SLIPPAGE_BPS') else 50))
-                last_valid_block_height_raw = trade_data.get('last_valid_block_height')
-                last_valid_block_height = int(last_valid_block_height_raw) if last_valid_block_height_raw is not None else None
-                confidence_score = float(trade_data.get('confidence_score', 0.0)) if trade_data.get('confidence_score') else None
-                execution_time_ms = int(trade_data.get('execution_time_ms', 0)) if trade_data.get('execution_time_ms') else None
-                gas_used = int(trade_data.get('gas_used', 0)) if trade_data.get('gas_used') else None
-            except ValueError:
-                self.logger.error("Invalid numerical values in trade_data.")
-                return
+    _TRADE_INSERT_SQL = TRADE_INSERT_SQL
 
-            # Handle JSON fields carefully
-            jupiter_quote_response_json = json.dumps(trade_data.get('jupiter_quote_response')) if trade_data.get('jupiter_quote_response') else None
-            jupiter_transaction_data_json = json.dumps(trade_data.get('jupiter_transaction_data')) if trade_data.get('jupiter_transaction_data') else None
+    def _trade_row(self, trade_data: dict) -> Optional[tuple]:
+        return build_trade_row(trade_data, self.logger)
 
+    def record_trade(self, trade_data: dict):
+        try:
+            row = self._trade_row(trade_data)
+            if row is None:
+                return None
             with self.conn:
-                cursor = self.conn.execute('''
-                    INSERT INTO trades 
-                    (pair_address, amount, entry_price, protocol, token_symbol, trade_id_external, side, 
-                     jupiter_quote_response, jupiter_transaction_data, slippage_bps, transaction_signature, 
-                     last_valid_block_height, ai_decision_id, execution_time_ms, gas_used, confidence_score)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    trade_data['pair'],
-                    amount,
-                    entry_price,
-                    trade_data.get('protocol', 'Jupiter'),
-                    trade_data.get('token_symbol'),
-                    trade_data.get('trade_id'),
-                    trade_data.get('side'),
-                    jupiter_quote_response_json,
-                    jupiter_transaction_data_json,
-                    slippage_bps,
-                    trade_data.get('transaction_signature'),
-                    last_valid_block_height,
-                    trade_data.get('ai_decision_id'),
-                    execution_time_ms,
-                    gas_used,
-                    confidence_score
-                ))
+                cursor = self.conn.execute(self._TRADE_INSERT_SQL, row)
                 return cursor.lastrowid
         except sqlite3.Error as e:
             self.logger.error(f"Erreur enregistrement trade: {str(e)}")
             return None
 
+    def record_trades_bulk(self, trades: List[dict]) -> Optional[int]:
+        """Inserts several trades in a single transaction (executemany).
+
+        Invalid entries are logged and skipped. Returns the number of inserted rows,
+        or None if the transaction failed (nothing is inserted in that case).
+        """
+        rows = [row for row in (self._trade_row(trade) for trade in trades) if row is not None]
+        if not rows:
+            return 0
+        try:
+            with self.conn:
+                self.conn.executemany(self._TRADE_INSERT_SQL, rows)
+            return len(rows)
+        except sqlite3.Error as e:
+            self.logger.error(f"Erreur enregistrement groupé de {len(rows)} trades: {str(e)}")
+            return None
+
     def record_ai_decision(self, decision_data: dict) -> Optional[str]:
         """Record an AI trading decision."""
         try:
@@ -313,7 +391,9 @@ class EnhancedDatabase:
             
             # Prepare data
             timestamp_utc = decision_data.get('timestamp_utc', datetime.utcnow().isoformat())
-            aggregated_inputs_json = json.dumps(decision_data['aggregated_inputs'])
+            # Accepts inputs already serialized by the caller (e.g. model_dump_json()) to avoid a second pass
+            aggregated_inputs = decision_data['aggregated_inputs']
+            aggregated_inputs_json = aggregated_inputs if isinstance(aggregated_inputs, str) else json.dumps(aggregated_inputs, default=str)
             
             with self.conn:
                 self.conn.execute('''
@@ -462,14 +542,95 @@ class EnhancedDatabase:
             return False
 
     def get_active_trades(self) -> List[Dict]:
-        cursor = self.conn.execute('''
-            SELECT id, pair_address, amount, entry_price, protocol, timestamp, token_symbol, trade_id_external, side, 
-                   jupiter_quote_response, jupiter_transaction_data, slippage_bps, transaction_signature, 
-                   last_valid_block_height, ai_decision_id, execution_time_ms, gas_used, confidence_score
-            FROM trades WHERE status = 'open'
-        ''')
+        cursor = self.conn.execute(ACTIVE_TRADES_SQL)
         return [dict(row) for row in cursor.fetchall()]
 
+    def iter_active_trades(self, chunk_size: int = 100) -> Iterator[Dict]:
+        """Same rows as get_active_trades, streamed from the cursor by chunks instead of fetchall()."""
+        cursor = self.conn.execute(ACTIVE_TRADES_SQL)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+
+    def get_active_trade_stats(self) -> Tuple[int, float]:
+        """(nombre de trades ouverts, somme de leurs montants USD), agrégés en SQL."""
+        try:
+            count, exposure = self.conn.execute(ACTIVE_TRADE_STATS_SQL).fetchone()
+            return int(count), float(exposure)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error computing active trade stats: {e}")
+            return 0, 0.0
+
+    def get_active_exposure_usd(self) -> float:
+        """Somme des montants USD des trades ouverts, en une seule requête."""
+        try:
+            cursor = self.conn.execute(
+                "SELECT COALESCE(SUM(amount), 0) FROM trades WHERE status = 'open' AND UPPER(side) = 'BUY'"
+            )
+            return float(cursor.fetchone()[0])
+        except sqlite3.Error as e:
+            self.logger.error(f"Error computing active exposure: {e}")
+            return 0.0
+
+    def close_trade(self, trade_id: int) -> Optional[float]:
+        """Mark an open trade as closed and return its original USD amount."""
+        try:
+            with self.conn:
+                cursor = self.conn.execute(
+                    "SELECT amount FROM trades WHERE id = ? AND status = 'open'",
+                    (trade_id,)
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                self.conn.execute(
+                    "UPDATE trades SET status = 'closed' WHERE id = ?",
+                    (trade_id,)
+                )
+                return float(row[0] or 0.0)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error closing trade {trade_id}: {e}")
+            return None
+
+    def release_open_position(self, pair_address: str, tokens_sold: float) -> Tuple[int, float]:
+        """Close the open BUY rows of a pair, oldest first, until `tokens_sold` tokens are covered.
+
+        A partially sold row stays open with its remaining cost in `amount`.
+        Returns (rows closed, USD cost released).
+        """
+        rows_closed, cost_released = 0, 0.0
+        remaining = tokens_sold
+        try:
+            with self.conn:
+                rows = self.conn.execute(
+                    "SELECT id, amount, entry_price FROM trades "
+                    "WHERE pair_address = ? AND UPPER(side) = 'BUY' AND status = 'open' ORDER BY timestamp, id",
+                    (pair_address,)
+                ).fetchall()
+                for trade_id, amount, entry_price in rows:
+                    if remaining <= 0:
+                        break
+                    if not entry_price or entry_price <= 0:
+                        continue
+                    row_tokens = amount / entry_price
+                    if remaining >= row_tokens:
+                        self.conn.execute("UPDATE trades SET status = 'closed' WHERE id = ?", (trade_id,))
+                        rows_closed += 1
+                        cost_released += amount
+                        remaining -= row_tokens
+                    else:
+                        cost = remaining * entry_price
+                        self.conn.execute("UPDATE trades SET amount = amount - ? WHERE id = ?", (cost, trade_id))
+                        cost_released += cost
+                        remaining = 0.0
+            return rows_closed, cost_released
+        except sqlite3.Error as e:
+            self.logger.error(f"Error releasing open position for {pair_address}: {e}")
+            return 0, 0.0
+
     def get_recent_trades(self, limit: int = 10) -> List[Dict]:
         """Get recent trades with AI decision info."""
         cursor = self.conn.execute('''
@@ -481,12 +642,21 @@ class EnhancedDatabase:
         ''', (limit,))
         return [dict(row) for row in cursor.fetchall()]
 
+    def get_blacklist_set(self) -> Set[str]:
+        """Toutes les adresses blacklistées, en une requête."""
+        return {row[0] for row in self.conn.execute(BLACKLIST_SQL)}
+
     def is_blacklisted(self, address: str) -> bool:
-        cursor = self.conn.execute(
-            'SELECT 1 FROM blacklist WHERE address = ?', 
-            (address,)
-        )
-        return cursor.fetchone() is not None
+        now = time.monotonic()
+        if self._blacklist is None or now - self._blacklist_loaded_at >= self._blacklist_refresh_seconds:
+            try:
+                self._blacklist = self.get_blacklist_set()
+                self._blacklist_loaded_at = now
+            except sqlite3.Error as e:
+                self.logger.error(f"Database error while loading the blacklist: {e}")
+                if self._blacklist is None:
+                    return False
+        return address in self._blacklist
 
     def add_blacklist(self, address: str, reason: str, metadata: dict):
         try:
@@ -507,6 +677,8 @@ class EnhancedDatabase:
                     (address, reason, metadata, timestamp)
                     VALUES (?, ?, ?, CURRENT_TIMESTAMP)
                 ''', (address, reason, json.dumps(metadata)))
+            if self._blacklist is not None:
+                self._blacklist.add(address)
         except sqlite3.IntegrityError:
             self.logger.warning(f"IntegrityError while adding to blacklist: {address}")
         except sqlite3.Error as e:
@@ -516,6 +688,11 @@ class EnhancedDatabase:
         """Close database connection."""
         if self.conn:
             self.conn.close()
+            self.conn = None
+        with self._shared_lock:
+            for key, instance in list(self._shared_instances.items()):
+                if instance is self:
+                    del self._shared_instances[key]
 
     # Configuration Management Methods
     def initialize_system_status(self):
@@ -3,19 +3,36 @@ import logging
 from app.market.market_data import MarketDataProvider # Changed import
 from app.trading.trading_engine import TradingEngine # Assuming this is the correct name now
 from app.security.security import SecurityChecker # Assuming this is the correct name now
-from app.strategy_framework import BaseStrategy
+from app.strategy_framework import (
+    BaseStrategy, init_strategy_worker, strategy_signal, strategy_signal_in_worker, strategy_signals,
+    strategy_signals_in_worker
+)
+from app.strategies.features import FeatureCache
 from app.strategy_selector import StrategySelector # Import StrategySelector
+import json
+import os
+import random
 import time
+import sys
 import logging
+import numpy as np
 from typing import List, Dict, Optional, Any, Tuple # Added Tuple
 from app.config import get_config
 from app.portfolio_manager import PortfolioManager # Ensure this is the main PortfolioManager
+from app.database import EnhancedDatabase
+from app.async_database import AsyncDatabasePool
 from app.trade_executor import TradeExecutor # Import TradeExecutor
 from app.ai_agent import AIAgent # Import the new AIAgent
 from app.utils.jupiter_api_client import JupiterApiClient # Added
+from app.utils.http import create_pooled_session_from_config
+from app.utils.inflight import InFlightRequests
+from app.utils import metrics_kernels
+from app.strategies import kernels as strategy_kernels
 from app.utils.exceptions import NumerusXBaseError, DataCollectionError # For general error handling and DataCollectionError
-from datetime import datetime # Added for timestamp_utc
+from datetime import datetime, timezone # Added for timestamp_utc
+from pydantic import ValidationError
 import uuid # Added for request_id
+from concurrent.futures import ProcessPoolExecutor
 
 from app.models.ai_inputs import (
     AggregatedInputs,
@@ -24,7 +41,8 @@ from app.models.ai_inputs import (
     PredictionEngineInput,
     RiskManagerInput,
     PortfolioManagerInput,
-    SecurityCheckerInput
+    SecurityCheckerInput,
+    MarketRegime
 )
 from app.socket_manager import get_socket_manager
 import logging
@@ -32,33 +50,133 @@ import logging
 logger = logging.getLogger(__name__)
 
 class PerformanceMonitor:
-    def __init__(self):
-        self.history = [] 
-        self.trades = [] 
-    
+    """Suivi des métriques de performance (valeur du portefeuille, PnL des trades).
+
+    Stockage en colonnes NumPy (SoA) dans deux tampons circulaires de taille fixe :
+    pas d'allocation de dict par événement, mémoire bornée quelle que soit la durée
+    de fonctionnement. Le PnL 24h est une somme glissante tenue à jour à l'ajout et à
+    l'expiration des trades (O(1) amorti par requête). Les horodatages stockés viennent de
+    `time.monotonic()` (insensibles aux corrections NTP) ; ils ne sont convertis en
+    heure murale que pour l'affichage (`history`, `trades`). Entre `begin_cycle` et
+    `end_cycle`, les échantillons reprennent l'horodatage du début du cycle au lieu de
+    relire l'horloge.
+    """
+    HISTORY_CAPACITY = 4096
+    PNL_WINDOW_SECONDS = 86400
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.capacity = capacity
+        # Valeurs du portefeuille
+        self.value_ts = np.zeros(capacity, dtype=np.float64)
+        self.value = np.zeros(capacity, dtype=np.float64)
+        self._value_head = 0
+        self._value_count = 0
+        # Trades
+        self.trade_ts = np.zeros(capacity, dtype=np.float64)
+        self.trade_pnl = np.zeros(capacity, dtype=np.float64)
+        self.trade_ok = np.zeros(capacity, dtype=np.bool_)
+        self._trade_head = 0
+        self._trade_count = 0
+        # Fenêtre 24h : les `_window_len` trades les plus récents, de PnL cumulé `_window_pnl`
+        self._window_len = 0
+        self._window_pnl = 0.0
+        # Lu une fois : la config ne change pas pendant l'exécution
+        self._initial_balance = float(get_config().trading.initial_portfolio_balance_usd)
+        # Horodatage (time.monotonic()) du cycle en cours, None hors cycle
+        self._cycle_ts: Optional[float] = None
+
+    def begin_cycle(self, now: float) -> None:
+        self._cycle_ts = now
+
+    def end_cycle(self) -> None:
+        self._cycle_ts = None
+
+    def _ordered(self, head: int, count: int) -> np.ndarray:
+        """Indices des éléments présents dans un tampon circulaire, du plus ancien au plus récent."""
+        return (np.arange(head - count, head) % self.capacity) if count else np.empty(0, dtype=np.int64)
+
     def track_portfolio_value(self, value: float):
-        self.history.append({
-            'timestamp': time.time(),
-            'metric': 'portfolio_value',
-            'value': value
-        })
+        i = self._value_head
+        now = self._cycle_ts
+        self.value_ts[i] = time.monotonic() if now is None else now
+        self.value[i] = value
+        self._value_head = (i + 1) % self.capacity
+        self._value_count = min(self._value_count + 1, self.capacity)
     
     def track_trade(self, pnl: float, success: bool):
-        self.trades.append({
-            'timestamp': time.time(),
-            'pnl': pnl,
-            'success': success
-        })
+        i = self._trade_head
+        now = self._cycle_ts
+        if now is None:
+            now = time.monotonic()
+        if self._window_len == self.capacity: # L'emplacement écrasé est le plus ancien de la fenêtre
+            self._window_pnl -= self.trade_pnl[i]
+            self._window_len -= 1
+        self.trade_ts[i] = now
+        self.trade_pnl[i] = pnl
+        self.trade_ok[i] = success
+        self._trade_head = (i + 1) % self.capacity
+        self._trade_count = min(self._trade_count + 1, self.capacity)
+        self._window_pnl += pnl
+        self._window_len += 1
+        self._expire_window(now)
+
+    def _expire_window(self, now: float) -> None:
+        """Retire de la somme glissante les trades sortis de la fenêtre PNL_WINDOW_SECONDS."""
+        cutoff = now - self.PNL_WINDOW_SECONDS
+        while self._window_len:
+            oldest = (self._trade_head - self._window_len) % self.capacity
+            if self.trade_ts[oldest] >= cutoff:
+                break
+            self._window_pnl -= self.trade_pnl[oldest]
+            self._window_len -= 1
+        if not self._window_len:
+            self._window_pnl = 0.0 # Repart de zéro : pas de dérive d'arrondi accumulée
+
+    @staticmethod
+    def _wall_clock(mono_ts: np.ndarray) -> np.ndarray:
+        """Horodatages monotones -> timestamps Unix (décalage courant entre les deux horloges)."""
+        return mono_ts + (time.time() - time.monotonic())
+
+    @property
+    def history(self) -> List[Dict[str, Any]]:
+        """Portfolio value samples, as dicts (for inspection/reporting, not the hot path)."""
+        idx = self._ordered(self._value_head, self._value_count)
+        return [{'timestamp': t, 'metric': 'portfolio_value', 'value': v}
+                for t, v in zip(self._wall_clock(self.value_ts[idx]).tolist(), self.value[idx].tolist())]
+
+    @property
+    def trades(self) -> List[Dict[str, Any]]:
+        """Tracked trades, as dicts (for inspection/reporting, not the hot path)."""
+        idx = self._ordered(self._trade_head, self._trade_count)
+        return [{'timestamp': t, 'pnl': p, 'success': ok}
+                for t, p, ok in zip(self._wall_clock(self.trade_ts[idx]).tolist(), self.trade_pnl[idx].tolist(),
+                                    self.trade_ok[idx].tolist())]
     
+    @property
+    def max_drawdown(self) -> float:
+        """Drawdown maximal (fraction 0..1) sur les valeurs de portefeuille conservées."""
+        idx = self._ordered(self._value_head, self._value_count)
+        return float(metrics_kernels.drawdown(self.value[idx])) if idx.size else 0.0
+
     @property
     def daily_pnl_percentage(self) -> float:
-        if not self.trades or get_config().INITIAL_PORTFOLIO_BALANCE_USD == 0:
+        initial_balance = self._initial_balance
+        if initial_balance == 0:
             return 0.0
-        now = time.time()
-        pnl_24h = sum(t['pnl'] for t in self.trades if now - t['timestamp'] <= 86400)
-        return (pnl_24h / get_config().INITIAL_PORTFOLIO_BALANCE_USD) * 100
+        self._expire_window(time.monotonic())
+        return (self._window_pnl / initial_balance) * 100
 
 class DexBot:
+    _PREDICTION_DIRECTION_TO_REGIME = {
+        'up': MarketRegime.BULLISH,
+        'down': MarketRegime.BEARISH,
+        'sideways': MarketRegime.RANGING,
+    }
+    # Open positions detailed in the agent inputs (the total count is always given)
+    MAX_POSITIONS_FOR_AGENT = 20
+    # 1h candles fetched per pair: enough for the strategy indicators (MACD 26+9), the prompt keeps the last 24
+    PAIR_OHLCV_LIMIT = 48
+    _OHLCV_PROMPT_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
     def __init__(self):
         self.config = get_config()
         logger.info("Initializing DexBot components...")
@@ -90,9 +208,13 @@ class DexBot:
 
         # Managers & Checkers
         try:
+            # Une seule EnhancedDatabase (une connexion) partagée entre les composants
+            self.database = EnhancedDatabase.get_shared(self.config.database.db_path)
+
             self.portfolio_manager = PortfolioManager(
-                db_path=self.get_config().database.db_path,
-                market_data_provider=self.market_data_provider
+                db_path=self.config.database.db_path,
+                market_data_provider=self.market_data_provider,
+                db=self.database
             )
             logger.info("PortfolioManager initialized.")
 
@@ -112,8 +234,10 @@ class DexBot:
             self.market_data_cache = MarketDataCache(config=self.config)
             
             self.security_checker = SecurityChecker(
-                db_path=self.get_config().database.db_path,
-                market_data_cache=self.market_data_cache
+                db_path=self.config.database.db_path,
+                market_data_cache=self.market_data_cache,
+                database=self.database,
+                result_cache_ttl=self.config.trading.security_cache_ttl_seconds
             )
             logger.info("SecurityChecker initialized.")
             
@@ -149,6 +273,12 @@ class DexBot:
         else:
             logger.info(f"Default strategy selected as input source: {self.strategy.get_name()}")
 
+        # CPU-bound work (model inference, strategy analysis) runs in worker processes so it never
+        # blocks the event loop and scales with cores; each worker receives the strategy once, at startup.
+        self._cpu_pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), initializer=init_strategy_worker, initargs=(self.strategy,)
+        )
+
         # Prediction Engine (Input Source for AIAgent)
         try:
             self.prediction_engine = PricePredictor(
@@ -156,6 +286,7 @@ class DexBot:
                 data_dir=self.config.PREDICTION_DATA_DIR,
                 config=self.config # Pass config if predictor needs it
             )
+            self.prediction_engine.attach_inference_pool(self._cpu_pool)
             logger.info("PredictionEngine initialized.")
         except Exception as e:
             logger.error(f"Failed to initialize PredictionEngine: {e}", exc_info=True)
@@ -177,7 +308,54 @@ class DexBot:
             logger.error(f"Error initializing Socket.io manager: {e}")
             self.socket_manager = None
         
-        self.performance_monitor = PerformanceMonitor() # Keep for now
+        self.performance_monitor = PerformanceMonitor(max(1, self.config.trading.performance_history_capacity))
+        metrics_kernels.warm_up() # Compilation Numba au démarrage plutôt qu'au premier cycle
+        strategy_kernels.warm_up()
+        # Async SQLite pool for the per-cycle DB accesses, opened lazily in _initialize_async_dependencies
+        self.async_db: Optional[AsyncDatabasePool] = None
+        # Max outbound requests (DexScreener, RPC, security APIs) in flight at once, all pairs included
+        self._io_semaphore = asyncio.Semaphore(max(1, self.config.trading.max_concurrent_md_requests))
+        self._consecutive_failures = 0
+        # Upper bound of the exponential backoff applied after consecutive failed cycles
+        self._max_failure_backoff = self.config.trading.max_error_backoff_seconds
+        # Cycles short-circuited because nothing could be traded (no cash, no position)
+        self.idle_cycles = 0
+        # Below this cash balance (USD) and with no open position, the agent can only answer HOLD
+        self._min_order_value_usd = self.config.trading.min_order_value_usd
+        # Last portfolio valuation (value, time.monotonic() of the read), see _get_portfolio_value
+        self._portfolio_value_cache: Tuple[float, float] = (0.0, float('-inf'))
+        self._portfolio_value_ttl = self.config.trading.portfolio_value_ttl_seconds
+        # Pairs traded each cycle, processed concurrently up to max_concurrent_pairs
+        self._target_pairs: List[str] = list(self.config.trading.target_trading_pairs)
+        self._pair_semaphore = asyncio.Semaphore(max(1, self.config.trading.max_concurrent_pairs))
+        # Strategy signal per target mint, computed for all pairs at once at the start of each cycle
+        self._cycle_strategy_signals: Dict[str, Dict[str, Any]] = {}
+        # Price predictions of all target mints (predict_price_batch), started at the start of each cycle
+        self._cycle_predictions: Optional[asyncio.Task] = None
+        # Swaps of different pairs run concurrently (cash is reserved per order by PortfolioManager.reserve_cash)
+        self._execution_semaphore = asyncio.Semaphore(max(1, self.config.trading.max_concurrent_executions))
+        # Symbol -> mint: static data, resolved once and persisted across restarts
+        self._mint_cache_path = self.config.trading.mint_cache_path
+        self._mint_cache: Dict[str, str] = self._load_mint_cache(self._mint_cache_path)
+        # Symbol -> in-flight resolution, shared by the pairs of a cycle that miss the cache together
+        self._mint_inflight = InFlightRequests()
+        # Adaptive cadence: last price per mint and largest relative move seen during the current cycle
+        self._last_prices: Dict[str, float] = {}
+        self._cycle_price_move = 0.0
+        self._price_move_threshold = self.config.trading.price_move_threshold_pct / 100.0
+        self._min_cycle_interval = self.config.trading.min_cycle_interval_seconds
+        # Constant settings read on every pair, looked up (and normalized) once
+        self._base_asset_symbol = self.config.trading.base_asset_symbol.upper()
+        self._base_asset_mint = self.config.trading.base_asset
+        self._max_exposure_per_trade = self.config.trading.max_portfolio_exposure_per_trade
+        # Set by wake() (e.g. from a price-push handler) to start the next cycle immediately, and by stop()
+        self._wake_event = asyncio.Event()
+        # One pooled aiohttp session shared by the HTTP clients (created in _initialize_async_dependencies)
+        self.http_session = None
+        # Mint -> (check_token_security result, SecurityCheckerInput built from it), see _security_input
+        self._security_inputs: Dict[str, Tuple[Tuple[bool, list], SecurityCheckerInput]] = {}
+        # Indicators per pair, computed once per new candle and shared by all consumers of the cycle
+        self.feature_cache = FeatureCache()
         # Initial portfolio value tracking will be in an async setup method
         
         self.active = False
@@ -186,10 +364,21 @@ class DexBot:
 
     async def _initialize_async_dependencies(self):
         """Handles initialization steps that require async operations, like fetching initial portfolio value."""
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = create_pooled_session_from_config(total_timeout=30, headers={'User-Agent': 'NumerusX-Bot/1.0'})
+            for client in (self.jupiter_client, self.market_data_provider, self.trading_engine, self.market_data_cache):
+                client.attach_http_session(self.http_session)
+        if self.async_db is None:
+            try:
+                self.async_db = await AsyncDatabasePool.create(self.config.database.db_path)
+                self.portfolio_manager.attach_async_db(self.async_db)
+            except Exception as e:
+                logger.error(f"Could not open async DB pool, falling back to synchronous DB access: {e}", exc_info=True)
+        self.portfolio_manager.start_trade_writer() # Batched (write-behind) trade inserts
         try:
             initial_portfolio_value = await self.portfolio_manager.get_total_portfolio_value()
             # Ensure RiskManager has the latest portfolio value. This could be a direct update or managed internally by RM.
-            self.risk_manager.update_current_portfolio_value(initial_portfolio_value)
+            self.risk_manager.update_portfolio_value(initial_portfolio_value)
             self.performance_monitor.track_portfolio_value(initial_portfolio_value)
             logger.info(f"Initial portfolio value for RiskManager and PerformanceMonitor: ${initial_portfolio_value:.2f}")
         except Exception as e:
@@ -202,6 +391,7 @@ class DexBot:
             return
 
         self.active = True
+        self._wake_event.clear() # May still be set by a previous stop()
         logger.info(f"Starting DexBot. Strategy for AIAgent input: {self.strategy.get_name() if self.strategy else 'None'}.")
         
         await self._initialize_async_dependencies()
@@ -220,21 +410,83 @@ class DexBot:
                 logger.critical(f"DexBot main loop exited due to an unhandled exception: {e}", exc_info=True)
                 self.active = False # Ensure bot stops on critical loop error
 
+    def _failure_backoff_seconds(self, interval: float) -> float:
+        """
+        Exponential backoff after `_consecutive_failures` failed cycles (first retry at the base
+        interval), with +/-50% jitter so bot instances sharing an upstream do not retry in step.
+        The cap applies after the jitter: the delay never exceeds `_max_failure_backoff`.
+        """
+        exponent = min(self._consecutive_failures, 16) # Bounded so 2**n stays small
+        return min(self._max_failure_backoff, interval * 2 ** exponent * random.uniform(0.5, 1.5))
+
+    def wake(self) -> None:
+        """Interrupts the wait between two cycles (e.g. on a pushed price update)."""
+        self._wake_event.set()
+
+    def _record_price(self, mint: str, price: float) -> None:
+        last_price = self._last_prices.get(mint)
+        if last_price:
+            self._cycle_price_move = max(self._cycle_price_move, abs(price - last_price) / last_price)
+        self._last_prices[mint] = price
+
+    def _adaptive_interval(self, interval: float) -> float:
+        """Full interval on a quiet market, down to MIN_CYCLE_INTERVAL_SECONDS once prices move by PRICE_MOVE_THRESHOLD_PCT."""
+        if self._price_move_threshold <= 0 or interval <= 0:
+            return interval
+        floor_fraction = min(1.0, self._min_cycle_interval / interval)
+        fraction = 1.0 - self._cycle_price_move / self._price_move_threshold
+        return interval * min(1.0, max(floor_fraction, fraction))
+
+    async def _sleep_until_next_cycle(self, delay: float) -> bool:
+        """Waits `delay` seconds or until wake() / stop(). Returns True if woken up early."""
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=delay)
+            if self.active:
+                logger.info("DexBot woken up before the end of the interval.")
+            woken = True
+        except asyncio.TimeoutError:
+            woken = False
+        self._wake_event.clear()
+        return woken
+
     async def _main_loop(self):
+        interval = self.config.trading.trading_update_interval_seconds # Read once, not per cycle
+        loop_time = asyncio.get_running_loop().time
+        # Scheduled start of the current cycle: cycles start at tick + interval, so wake-up latency does
+        # not accumulate. Resynchronized on the clock after a wake(), a backoff or an overrun.
+        tick = loop_time()
         while self.active:
             try:
-                cycle_start_time = time.monotonic()
+                cycle_start_time = loop_time()
                 logger.info("--- Starting new DexBot cycle ---")
-                await self._run_cycle()
+                self._cycle_price_move = 0.0
+                cycle_ok = await self._run_cycle()
                 
-                cycle_duration = time.monotonic() - cycle_start_time
-                logger.info(f"--- DexBot cycle finished in {cycle_duration:.2f}s ---")
+                now = loop_time()
+                cycle_duration = now - cycle_start_time
+                logger.info("--- DexBot cycle finished in %.2fs ---", cycle_duration)
+
+                if not cycle_ok:
+                    # Upstream outage (DexScreener, RPC...): back off instead of polling at full rate
+                    delay = self._failure_backoff_seconds(interval)
+                    self._consecutive_failures += 1
+                    logger.warning(f"DexBot cycle failed ({self._consecutive_failures} in a row). Next attempt in {delay:.1f}s.")
+                    await self._sleep_until_next_cycle(delay)
+                    tick = loop_time()
+                    continue
+                self._consecutive_failures = 0
                 
-                sleep_duration = max(0, self.config.TRADING_UPDATE_INTERVAL_SECONDS - cycle_duration)
+                cycle_interval = self._adaptive_interval(interval)
+                next_tick = tick + cycle_interval
+                sleep_duration = next_tick - now
                 if sleep_duration > 0 :
-                    await asyncio.sleep(sleep_duration)
+                    if cycle_interval < interval:
+                        logger.info("Price moved %.2f%% this cycle: next cycle in %.1fs.", self._cycle_price_move * 100, sleep_duration)
+                    woken = await self._sleep_until_next_cycle(sleep_duration)
+                    tick = loop_time() if woken else next_tick
                 else:
-                    logger.warning(f"Cycle duration ({cycle_duration:.2f}s) exceeded TRADING_UPDATE_INTERVAL_SECONDS ({self.config.TRADING_UPDATE_INTERVAL_SECONDS}s). Running next cycle immediately.")
+                    logger.warning(f"Cycle duration ({cycle_duration:.2f}s) exceeded the cycle interval ({cycle_interval:.1f}s). Running next cycle immediately.")
+                    tick = now
 
             except asyncio.CancelledError:
                 logger.info("DexBot cycle processing cancelled.")
@@ -242,9 +494,55 @@ class DexBot:
                 break # Exit the while loop
             except Exception as e:
                 logger.error(f"Error in DexBot trading cycle: {e}", exc_info=True)
-                # Potentially add a longer sleep here on repeated critical errors or specific error handling
                 if self.active: # Avoid sleeping if stop() was called
-                    await asyncio.sleep(self.config.TRADING_UPDATE_INTERVAL_SECONDS) # Wait before retrying cycle
+                    delay = self._failure_backoff_seconds(interval)
+                    self._consecutive_failures += 1
+                    logger.warning(f"DexBot cycle errored ({self._consecutive_failures} in a row). Next attempt in {delay:.1f}s.")
+                    await self._sleep_until_next_cycle(delay) # Wait before retrying cycle
+                tick = loop_time()
+
+    @staticmethod
+    def _load_mint_cache(path: str) -> Dict[str, str]:
+        try:
+            with open(path, 'r') as f:
+                cache = json.load(f)
+            return {str(k): str(v) for k, v in cache.items()} if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable mint cache {path}: {e}")
+            return {}
+
+    @staticmethod
+    def _write_mint_cache(path: str, cache: Dict[str, str]) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp" # Per write: lookups of different symbols may persist concurrently
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path) # Atomic: a crash never leaves a truncated cache
+
+    async def _resolve_mint(self, symbol: str) -> Optional[str]:
+        """Mint address for `symbol`, from the mint cache or (once) from MarketDataProvider.get_token_info.
+
+        Concurrent misses on the same symbol wait for a single lookup (and a single cache file write).
+        """
+        mint = self._mint_cache.get(symbol)
+        if mint:
+            return mint
+        return await self._mint_inflight.run(symbol, lambda: self._lookup_mint(symbol))
+
+    async def _lookup_mint(self, symbol: str) -> Optional[str]:
+        token_info_res = await self.market_data_provider.get_token_info(symbol)
+        if not token_info_res.get('success') or not token_info_res['data']:
+            logger.error(f"Could not fetch token info for symbol '{symbol}'. Error: {token_info_res.get('error')}")
+            return None
+        mint = token_info_res['data']['mint']
+        self._mint_cache[symbol] = mint
+        try:
+            await asyncio.to_thread(self._write_mint_cache, self._mint_cache_path, dict(self._mint_cache))
+        except OSError as e:
+            logger.warning(f"Could not persist mint cache to {self._mint_cache_path}: {e}")
+        return mint
 
     async def _get_target_pair_mints(self, pair_symbol_str: str) -> Optional[Tuple[str, str, str, str]]:
         """Parses pair_symbol_str (e.g., "SOL/USDC") and returns (target_symbol, base_symbol, target_mint, base_mint)."""
@@ -254,7 +552,7 @@ class DexBot:
             return None
 
         symbol1, symbol2 = parts[0].upper(), parts[1].upper()
-        base_asset_sym = self.get_config().trading.base_asset_SYMBOL.upper()
+        base_asset_sym = self._base_asset_symbol
         
         target_symbol: Optional[str] = None
         base_symbol_for_pair: Optional[str] = None # This will be the other token in the pair, not necessarily THE base asset of the bot
@@ -273,84 +571,222 @@ class DexBot:
             return None
 
         try:
-            target_token_info_res = await self.market_data_provider.get_token_info(target_symbol)
-            if not target_token_info_res.get('success') or not target_token_info_res['data']:
-                logger.error(f"Could not fetch token info for target_symbol '{target_symbol}'. Error: {target_token_info_res.get('error')}")
+            target_mint = await self._resolve_mint(target_symbol)
+            if not target_mint:
                 return None
-            target_mint = target_token_info_res['data']['mint']
             
             # The "base" for the pair might be the bot's actual base asset (e.g. USDC) or another token.
             # If it's the bot's base asset, we use its mint from config.
             # Otherwise, we fetch its info too.
             if base_symbol_for_pair == base_asset_sym:
-                base_mint = self.get_config().trading.base_asset # Mint address of USDC, etc.
+                base_mint = self._base_asset_mint # Mint address of USDC, etc.
             else:
                 # This case is currently excluded by the logic above, but if supported in future:
-                base_token_info_res = await self.market_data_provider.get_token_info(base_symbol_for_pair)
-                if not base_token_info_res.get('success') or not base_token_info_res['data']:
-                    logger.error(f"Could not fetch token info for base_symbol_for_pair '{base_symbol_for_pair}'. Error: {base_token_info_res.get('error')}")
+                base_mint = await self._resolve_mint(base_symbol_for_pair)
+                if not base_mint:
                     return None
-                base_mint = base_token_info_res['data']['mint']
             
             return target_symbol, base_symbol_for_pair, target_mint, base_mint
         except Exception as e:
             logger.error(f"Error resolving mints for pair '{pair_symbol_str}': {e}", exc_info=True)
             return None
 
+    async def _bounded(self, coro):
+        """Awaits `coro` while holding one of the max_concurrent_md_requests slots."""
+        async with self._io_semaphore:
+            return await coro
+
+    async def _strategy_signal(self, ohlcv_columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Strategy signal for one pair, computed in the CPU pool (in-process if the pool is gone)."""
+        if self._cpu_pool is None:
+            return strategy_signal(self.strategy, ohlcv_columns)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu_pool, strategy_signal_in_worker, ohlcv_columns)
+
+    async def _prepare_strategy_signals(self) -> None:
+        """Strategy signals of every target pair in one vectorized pass (analyze_many), in the CPU pool.
+
+        The pair bundles fetched here are served from the market data cache when the pairs are
+        processed right after.
+        """
+        self._cycle_strategy_signals = {}
+        if not self.strategy:
+            return
+        resolved = await asyncio.gather(*(self._get_target_pair_mints(p) for p in self._target_pairs))
+        mints = [pair_mints[2] for pair_mints in resolved if pair_mints]
+        if not mints:
+            return
+        bundles = await self._bounded(self.market_data_provider.get_pair_bundle(mints, '1h', ohlcv_limit=self.PAIR_OHLCV_LIMIT))
+        ohlcv_by_mint = {mint: bundle['ohlcv'] for mint, bundle in bundles.items() if bundle.get('ohlcv')}
+        if not ohlcv_by_mint:
+            return
+        if self._cpu_pool is None:
+            self._cycle_strategy_signals = strategy_signals(self.strategy, ohlcv_by_mint)
+        else:
+            loop = asyncio.get_running_loop()
+            self._cycle_strategy_signals = await loop.run_in_executor(self._cpu_pool, strategy_signals_in_worker, ohlcv_by_mint)
+
+    async def _predict_cycle_batch(self) -> Dict[str, Any]:
+        """Predictions of every target pair: one data fetch per mint and one model.predict per model."""
+        resolved = await asyncio.gather(*(self._get_target_pair_mints(p) for p in self._target_pairs))
+        mints = [pair_mints[2] for pair_mints in resolved if pair_mints]
+        if not mints:
+            return {}
+        return await self._bounded(self.prediction_engine.predict_price_batch(mints, '1h'))
+
+    async def _pair_prediction(self, mint: str):
+        """Prediction of one pair, from the cycle batch, or predict_price alone if the batch missed it."""
+        if self._cycle_predictions is not None:
+            try:
+                # shield: a pair dropped early (task cancelled) does not cancel the batch shared with the others
+                prediction = (await asyncio.shield(self._cycle_predictions)).get(mint)
+                if prediction is not None:
+                    return prediction
+            except Exception as e:
+                logger.warning(f"Batched predictions unavailable this cycle: {e}")
+        return await self._bounded(self.prediction_engine.predict_price(mint, '1h'))
+
+    @staticmethod
+    def _cancel_pending(*tasks: Optional[asyncio.Task]) -> None:
+        for task in tasks:
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception() # Already failed: mark the exception as retrieved (no "never retrieved" warning)
+
+    async def _get_portfolio_value(self, read_since: Optional[float] = None) -> float:
+        """
+        Portfolio value, reused if read less than PORTFOLIO_VALUE_TTL_SECONDS ago or, when
+        `read_since` (time.monotonic()) is given, if read after that instant.
+        """
+        value, read_at = self._portfolio_value_cache
+        now = time.monotonic()
+        if now - read_at < self._portfolio_value_ttl or (read_since is not None and read_at >= read_since):
+            return value
+        value = await self.portfolio_manager.get_total_portfolio_value()
+        self._portfolio_value_cache = (value, now)
+        return value
+
+    def _invalidate_portfolio_value(self) -> None:
+        self._portfolio_value_cache = (0.0, float('-inf'))
+
+    async def _collect_agent_positions(self) -> Tuple[int, List[Dict[str, Any]], float]:
+        """(open position count, up to MAX_POSITIONS_FOR_AGENT position dicts for the prompt, realized PnL 24h)."""
+        # One snapshot per cycle, shared by the concurrently processed pairs
+        position_count, trades, realized_pnl_24h = await self.portfolio_manager.get_positions_snapshot(self.MAX_POSITIONS_FOR_AGENT)
+        # Current price per position is not fetched here: positions are reported at entry price.
+        positions = [{
+            'symbol': pos_dict.get('token_symbol') or pos_dict.get('pair_address'),
+            'side': pos_dict.get('side'),
+            'amount_usd': pos_dict.get('amount'),
+            'entry_price_usd': pos_dict.get('entry_price'),
+            'opened_at': pos_dict.get('timestamp'),
+        } for pos_dict in trades]
+        return position_count, positions, realized_pnl_24h
+
+    async def _gather_market_data(
+        self, target_mint: str, base_mint_for_pair: str, pair_symbol_str: str
+    ) -> Tuple[Optional[MarketDataInput], Optional[Dict[str, np.ndarray]]]:
+        """Spot price + pair bundle for one pair. Only the price is required: a failed bundle request
+        leaves the candles empty and the liquidity / volume unknown. Returns (None, None) without a price."""
+        try:
+            # Spot price and pair bundle (pair metrics + 1h candles, sharing the same pair listing) in parallel
+            md_price_result, pair_bundles = await asyncio.gather(
+                self._bounded(self.market_data_provider.get_token_price(target_mint, base_mint_for_pair)),
+                self._bounded(self.market_data_provider.get_pair_bundle([target_mint], '1h', ohlcv_limit=self.PAIR_OHLCV_LIMIT)),
+                return_exceptions=True
+            )
+            if isinstance(md_price_result, BaseException):
+                raise md_price_result
+            if not md_price_result.get('success'):
+                logger.warning(f"Current price unavailable for {pair_symbol_str}: {md_price_result.get('error')}")
+                return None, None
+            if isinstance(pair_bundles, BaseException):
+                logger.warning(f"Pair metrics / candles unavailable for {pair_symbol_str}: {pair_bundles}")
+                pair_bundles = {}
+            pair_bundle = pair_bundles.get(target_mint, {})
+            pair_metrics = pair_bundle.get('metrics')
+            ohlcv_columns = pair_bundle.get('ohlcv')
+            # Trend / support-resistance / ATR: incremental update on new candles only
+            features = self.feature_cache.get(target_mint, ohlcv_columns) or {}
+
+            # Up to 24 candles for the prompt: slices of the NumPy columns are views, one list per column
+            ohlcv_list = [
+                {'t': t, 'o': o, 'h': h, 'l': l, 'c': c, 'v': v}
+                for t, o, h, l, c, v in zip(*(ohlcv_columns[k][-24:].tolist() for k in self._OHLCV_PROMPT_COLUMNS))
+            ] if ohlcv_columns else []
+
+            market_data_input = MarketDataInput(
+                current_price=md_price_result['data']['price'],
+                recent_ohlcv_1h=ohlcv_list,
+                liquidity_depth_usd=pair_metrics['liquidity_usd'] if pair_metrics else None,
+                recent_trend_1h=features.get('trend', 'SIDEWAYS'),
+                key_support_resistance={k: features[k] for k in ('support', 'resistance') if k in features},
+                volatility_1h_atr_percentage=features.get('atr_percentage', 0.0),
+                volume_24h_usd=(pair_metrics.get('volume_h24') or 0.0) if pair_metrics else 0.0
+            )
+            return market_data_input, ohlcv_columns
+        except ValidationError as e:
+            logger.error(f"Market data for {pair_symbol_str} rejected by MarketDataInput validation: {e}")
+            return None, None
+        except Exception as e:
+            logger.error(f"Error gathering market data for AIAgent: {e}", exc_info=True)
+            return None, None
+
     async def _gather_ai_agent_inputs(self, target_symbol: str, target_mint: str, base_mint_for_pair: str, base_symbol_for_pair: str) -> Optional[AggregatedInputs]:
         """
         Gathers all necessary inputs from various bot components and assembles
         them into the AggregatedInputs Pydantic model for the AIAgent.
         This corresponds to todo/02-todo-ai-api-gemini.md Tâche 3.1.5
         """
-        request_id = str(uuid.uuid4())
-        timestamp_utc = datetime.utcnow()
+        request_id = uuid.uuid4().hex # Still a valid UUID for the API models (ai_decision_id: UUID), without the dashed formatting
+        timestamp_utc = datetime.now(timezone.utc)
         current_pair_symbol_str = f"{target_symbol}/{base_symbol_for_pair}"
-        logger.info(f"Gathering inputs for AIAgent (request_id: {request_id}, pair: {current_pair_symbol_str})")
+        logger.info("Gathering inputs for AIAgent (request_id: %s, pair: %s)", request_id, current_pair_symbol_str)
 
-        target_pair_info = TargetPairInfo(
-            symbol=current_pair_symbol_str,
-            input_mint=target_mint, # Assuming target_mint is the one we want to buy/sell
-            output_mint=base_mint_for_pair # And base_mint is the quote currency
-        )
+        target_pair_info = {
+            'symbol': current_pair_symbol_str,
+            'input_mint': target_mint, # Assuming target_mint is the one we want to buy/sell
+            'output_mint': base_mint_for_pair # And base_mint is the quote currency
+        }
+
+        # Every independent input (security scan, prediction, portfolio state) is started now so
+        # that all of them run concurrently with the market data requests: the gathering latency
+        # is the slowest call, not the sum of the calls. The strategy signal needs the candles and
+        # starts as soon as they are in.
+        security_task = asyncio.create_task(self._bounded(self.security_checker.check_token_security(target_mint)))
+        prediction_task = asyncio.create_task(self._pair_prediction(target_mint)) if self.prediction_engine else None
+        portfolio_value_task = asyncio.create_task(self._get_portfolio_value())
+        positions_task = asyncio.create_task(self._collect_agent_positions())
+        pending_tasks = (security_task, prediction_task, portfolio_value_task, positions_task)
 
         # 1. Market Data
-        market_data_input: Optional[MarketDataInput] = None
-        try:
-            md_price_result = await self.market_data_provider.get_token_price(target_mint, base_mint_for_pair)
-            md_ohlcv_result = await self.market_data_provider.get_ohlcv_data_dexscreener(current_pair_symbol_str, '1h', limit=24) # Example: 1h, last 24 periods
-            md_liquidity_result = await self.market_data_provider.get_liquidity_info_dexscreener(current_pair_symbol_str)
-            # TODO: Add calls for trend, support/resistance, volatility, volume if available
-            
-            ohlcv_list = []
-            if md_ohlcv_result['success'] and md_ohlcv_result['data']:
-                for bar in md_ohlcv_result['data'][:24]: # Take up to 24 candles for the prompt
-                    ohlcv_list.append(OHLCV(t=int(bar['timestamp']/1000), o=bar['open'], h=bar['high'], l=bar['low'], c=bar['close'], v=bar['volumeUsd']))
+        market_data_input, ohlcv_columns = await self._gather_market_data(target_mint, base_mint_for_pair, current_pair_symbol_str)
 
-            market_data_input = MarketDataInput(
-                current_price=md_price_result['data']['price'] if md_price_result['success'] else None,
-                recent_ohlcv_1h=ohlcv_list if ohlcv_list else None,
-                liquidity_depth_usd=md_liquidity_result['data']['liquidity_usd'] if md_liquidity_result['success'] and md_liquidity_result['data'] else None,
-                # Fields like recent_trend_1h, key_support_resistance, volatility_1h_atr_percentage, trading_volume_24h_usd need to be populated
-                # For now, we'll leave them as None or with placeholder logic if easy
-                trading_volume_24h_usd=md_liquidity_result['data']['volume_24h_usd'] if md_liquidity_result['success'] and md_liquidity_result['data'] else None
-            )
-        except Exception as e:
-            logger.error(f"Error gathering market data for AIAgent: {e}", exc_info=True)
-            # Decide if this is critical; for now, we might proceed with partial data
+        if not market_data_input:
+            logger.warning(f"No usable market data for {current_pair_symbol_str} (see above). Skipping AIAgent decision.")
+            self._cancel_pending(*pending_tasks)
+            return None
+        self._record_price(target_mint, market_data_input.current_price)
 
-        if not market_data_input or not market_data_input.current_price:
-            logger.warning("Critical market data (current price) missing for AIAgent. Skipping decision.")
+        # Cheapest gate first: an illiquid pair is dropped on the pair metrics alone, before
+        # waiting on the security scan, the prediction or the AI call.
+        liquidity_usd = market_data_input.liquidity_depth_usd
+        if liquidity_usd is not None and liquidity_usd < self.config.trading.min_liquidity_usd:
+            logger.info("Liquidity %.0f USD below %.0f USD for %s. Skipping decision.",
+                        liquidity_usd, self.config.trading.min_liquidity_usd, current_pair_symbol_str)
+            self._cancel_pending(*pending_tasks)
             return None
 
         # 2. Signal Sources (Strategies, Analytics Engine)
         signal_sources_inputs: List[SignalSourceInput] = []
         try:
-            if self.strategy:
-                # This needs to be async if strategy.analyze or generate_signal is async
-                # For now, assuming synchronous or handled within strategy methods
-                # The strategy's output needs to be adapted to SignalSourceInput format
-                strategy_output = await self.strategy.generate_signal_async() # Assuming an async method returning a dict
+            if self.strategy and ohlcv_columns:
+                # From the cycle-wide batch, or analyze() + generate_signal() for this pair alone in a worker
+                # process; output already in SignalSourceInput terms
+                strategy_output = self._cycle_strategy_signals.get(target_mint) or await self._strategy_signal(ohlcv_columns)
                 if strategy_output and strategy_output.get('signal') != 'NEUTRAL': # Example: only add non-neutral signals
                     signal_sources_inputs.append(SignalSourceInput(
                         source_name=self.strategy.get_name(),
@@ -366,21 +802,19 @@ class DexBot:
         # 3. Prediction Engine Outputs
         prediction_engine_outputs_input: Optional[PredictionEngineInput] = None
         try:
-            if self.prediction_engine:
-                # Assuming PricePredictor has a method get_formatted_predictions_for_agent
-                # or we adapt its current output here.
-                # For now, let's assume a simplified structure or placeholder
-                raw_predictions = await self.prediction_engine.predict_price_async(target_symbol) # Assuming it takes target_symbol
-                if raw_predictions and raw_predictions.predicted_price_4h is not None:
-                    price_pred = PricePrediction(
-                        target_price_min=raw_predictions.predicted_price_4h * 0.98, # Example
-                        target_price_max=raw_predictions.predicted_price_4h * 1.02, # Example
-                        prediction_period_hours=4,
-                        confidence=raw_predictions.confidence, # Assuming predictor gives this
-                        model_name=raw_predictions.model_name
+            if prediction_task:
+                # PredictionResult (frozen, slotted dataclass) is read attribute by attribute, no dict copy
+                prediction = await prediction_task # Started concurrently with the market data
+                if prediction and prediction.target_price is not None:
+                    prediction_engine_outputs_input = PredictionEngineInput(
+                        price_prediction_4h={
+                            'target_price_min': prediction.target_price * 0.98, # Example
+                            'target_price_max': prediction.target_price * 1.02, # Example
+                            'confidence': prediction.confidence,
+                        },
+                        market_regime_1h=self._PREDICTION_DIRECTION_TO_REGIME.get(prediction.direction, MarketRegime.RANGING)
                     )
-                    prediction_engine_outputs_input = PredictionEngineInput(price_prediction_4h=price_pred)
-                # TODO: Populate market_regime_1h and sentiment_analysis if PredictionEngine provides them
+                # TODO: Populate sentiment_analysis if PredictionEngine provides it
         except Exception as e:
             logger.error(f"Error gathering prediction engine outputs for AIAgent: {e}", exc_info=True)
 
@@ -391,15 +825,14 @@ class DexBot:
             # Let's assume it provides general limits for now.
             # Ensure portfolio value is up-to-date in RiskManager before these calls.
             # This was handled in _initialize_async_dependencies and should be updated periodically.
-            await self.portfolio_manager.update_portfolio_value() # Ensure portfolio value is fresh
-            current_portfolio_value = self.portfolio_manager.total_portfolio_value_usd
-            self.risk_manager.update_current_portfolio_value(current_portfolio_value)
+            current_portfolio_value = await portfolio_value_task # Ensure portfolio value is fresh
+            self.risk_manager.update_portfolio_value(current_portfolio_value)
 
             max_trade_size_usd = self.risk_manager.calculate_max_trade_size_usd(target_symbol) # target_symbol might be optional
-            available_capital = self.portfolio_manager.get_available_cash_usdc() # USDC assumed
+            available_capital = self.portfolio_manager.get_available_cash_for_trading() # USDC assumed
 
             risk_manager_inputs_model = RiskManagerInput(
-                max_exposure_per_trade_percentage=self.config.MAX_PORTFOLIO_EXPOSURE_PER_TRADE, # From global config
+                max_exposure_per_trade_percentage=self._max_exposure_per_trade,
                 current_portfolio_value_usd=current_portfolio_value,
                 available_capital_usdc=available_capital,
                 max_trade_size_usd=max_trade_size_usd,
@@ -410,39 +843,17 @@ class DexBot:
         
         if not risk_manager_inputs_model:
             logger.warning("Critical risk manager inputs missing for AIAgent. Skipping decision.")
+            self._cancel_pending(*pending_tasks)
             return None
 
         # 5. Portfolio Manager Inputs
         portfolio_manager_inputs_model: Optional[PortfolioManagerInput] = None
         try:
-            active_positions_raw = await self.portfolio_manager.get_active_trades() # Assuming this gets current positions
-            pydantic_positions = []
-            if active_positions_raw:
-                for pos_dict in active_positions_raw:
-                    # This needs current price for the asset to calculate current_value_usd and PNL
-                    # Assuming PortfolioManager handles this or we fetch it here.
-                    # For simplicity, we'll use entry price as current if not available.
-                    current_asset_price = pos_dict.get('current_price_usd', pos_dict['entry_price_usd'])
-                    amount_tokens = pos_dict['amount_input_token']
-                    entry_price_usd = pos_dict['entry_price_usd']
-                    current_value_usd = amount_tokens * current_asset_price
-                    unrealized_pnl_usd = (current_asset_price - entry_price_usd) * amount_tokens
-                    unrealized_pnl_percentage = ((current_asset_price - entry_price_usd) / entry_price_usd) * 100 if entry_price_usd else 0
-
-                    pydantic_positions.append(PortfolioPositionInput(
-                        symbol=pos_dict['token_pair'],
-                        amount_tokens=amount_tokens,
-                        entry_price_usd=entry_price_usd,
-                        current_price_usd=current_asset_price,
-                        current_value_usd=current_value_usd,
-                        unrealized_pnl_usd=unrealized_pnl_usd,
-                        unrealized_pnl_percentage=unrealized_pnl_percentage
-                    ))
-            
-            realized_pnl_24h = await self.portfolio_manager.get_realized_pnl_last_24h()
+            position_count, positions, realized_pnl_24h = await positions_task
 
             portfolio_manager_inputs_model = PortfolioManagerInput(
-                current_positions=pydantic_positions if pydantic_positions else None,
+                current_positions=positions,
+                position_count=position_count,
                 total_pnl_realized_24h_usd=realized_pnl_24h
             )
         except Exception as e:
@@ -450,30 +861,21 @@ class DexBot:
 
         if not portfolio_manager_inputs_model:
             logger.warning("Critical portfolio manager inputs missing for AIAgent. Skipping decision.")
+            self._cancel_pending(*pending_tasks)
             return None
 
         # 6. Security Checker Inputs
         security_checker_inputs_model: Optional[SecurityCheckerInput] = None
         try:
-            # Assuming SecurityChecker has a method to get combined score and alerts for a token
-            security_info = await self.security_checker.check_token_security_async(target_mint)
-            if security_info and security_info.get('score') is not None:
-                alerts = []
-                if security_info.get('alerts'): # Assuming alerts is a list of dicts
-                    for alert_dict in security_info['alerts']:
-                        alerts.append(TokenSecurityRisk(**alert_dict)) # Validate with Pydantic model
-                
-                security_checker_inputs_model = SecurityCheckerInput(
-                    target_token_symbol=target_symbol,
-                    target_token_security_score=security_info['score'],
-                    target_token_recent_security_alerts=alerts if alerts else None
-                )
+            security_result = await security_task # Started concurrently with the market data
+            security_checker_inputs_model = self._security_input(target_mint, security_result)
         except Exception as e:
             logger.error(f"Error gathering security checker inputs for AIAgent: {e}", exc_info=True)
         
-        # Assemble final AggregatedInputs
+        # Assemble final AggregatedInputs. Every sub-model was validated when it was built above:
+        # model_construct skips a second validation pass over the whole tree.
         try:
-            aggregated_inputs = AggregatedInputs(
+            aggregated_inputs = AggregatedInputs.model_construct(
                 request_id=request_id,
                 timestamp_utc=timestamp_utc,
                 target_pair=target_pair_info,
@@ -484,109 +886,171 @@ class DexBot:
                 portfolio_manager_inputs=portfolio_manager_inputs_model, # Already validated as non-None
                 security_checker_inputs=security_checker_inputs_model
             )
-            logger.info(f"Successfully gathered inputs for AIAgent (request_id: {request_id}).")
+            logger.info("Successfully gathered inputs for AIAgent (request_id: %s).", request_id)
             return aggregated_inputs
         except Exception as e: # Catch Pydantic validation errors or other issues
             logger.critical(f"Failed to assemble final AggregatedInputs for AIAgent (request_id: {request_id}): {e}", exc_info=True)
             return None
 
-    async def _run_cycle(self):
-        """Exécute un cycle complet de logique de trading."""
-        try:
-            # 0. Determine target pair for this cycle (using config for now)
-            target_pair_info_tuple = await self._get_target_pair_mints(self.config.TARGET_TRADING_PAIR)
-            if not target_pair_info_tuple:
-                logger.error(f"Could not get mint info for target pair {self.config.TARGET_TRADING_PAIR}. Skipping cycle.")
-                return
-            
-            target_symbol, target_mint, base_mint_for_pair, base_symbol_for_pair = target_pair_info_tuple
-            current_pair_symbol_str = f"{target_symbol}/{base_symbol_for_pair}"
-            logger.info(f"Processing cycle for pair: {current_pair_symbol_str}")
-
-            # 1. Gather all inputs for the AIAgent
-            # This step now returns a Pydantic model instance or None
-            aggregated_inputs_model: Optional[AggregatedInputs] = await self._gather_ai_agent_inputs(
-                target_symbol, target_mint, base_mint_for_pair, base_symbol_for_pair
-            )
+    def _security_input(self, mint: str, security_result: Tuple[bool, list]) -> SecurityCheckerInput:
+        """
+        SecurityCheckerInput of a check_token_security result. The checker serves the same
+        cached tuple until its TTL expires, so the model is only rebuilt once per refresh.
+        """
+        cached = self._security_inputs.get(mint)
+        if cached is not None and cached[0] is security_result:
+            return cached[1]
+        is_safe, security_risks = security_result
+        # Score 0-1 (1 = safest) derived from the most severe detected risk (severity 1-10)
+        max_severity = max((risk.severity for risk in security_risks), default=0)
+        model = SecurityCheckerInput(
+            token_security_score=(1.0 - max_severity / 10.0) if is_safe or security_risks else 0.0,
+            recent_security_alerts=[risk.description for risk in security_risks]
+        )
+        self._security_inputs[mint] = (security_result, model)
+        return model
+
+    async def _process_pair_bounded(self, pair_symbol_str: str) -> bool:
+        async with self._pair_semaphore:
+            return await self._process_pair(pair_symbol_str)
 
-            if not aggregated_inputs_model:
-                logger.warning(f"Failed to gather complete inputs for AIAgent for pair {current_pair_symbol_str}. Skipping AI decision.")
-                # Potential: notify UI, increment error counter, etc.
-                return
+    async def _process_pair(self, pair_symbol_str: str) -> bool:
+        """Resolve -> gather inputs -> AI decision -> execution for one pair. Returns False if the pair failed."""
+        # 0. Resolve the mints of the pair
+        target_pair_info_tuple = await self._get_target_pair_mints(pair_symbol_str)
+        if not target_pair_info_tuple:
+            logger.error(f"Could not get mint info for target pair {pair_symbol_str}. Skipping pair.")
+            return False
+        
+        target_symbol, base_symbol_for_pair, target_mint, base_mint_for_pair = target_pair_info_tuple
+        current_pair_symbol_str = f"{target_symbol}/{base_symbol_for_pair}"
+        logger.info("Processing cycle for pair: %s", current_pair_symbol_str)
 
-            # 2. Get decision from AIAgent
-            # AIAgent.decide_trade now expects an AggregatedInputs object
-            ai_decision_dict = await self.ai_agent.decide_trade(aggregated_inputs_model)
+        # 1. Gather all inputs for the AIAgent
+        # This step now returns a Pydantic model instance or None
+        aggregated_inputs_model: Optional[AggregatedInputs] = await self._gather_ai_agent_inputs(
+            target_symbol, target_mint, base_mint_for_pair, base_symbol_for_pair
+        )
 
-            # Record the AI's decision in database
-            try:
-                decision_data = {
-                    "decision_id": aggregated_inputs_model.request_id,
-                    "timestamp_utc": datetime.utcnow().isoformat(),
-                    "decision_type": ai_decision_dict.get("decision", "HOLD"),
-                    "token_pair": current_pair_symbol_str,
-                    "amount_usd": ai_decision_dict.get("amount_usd"),
-                    "confidence": ai_decision_dict.get("confidence", 0.0),
-                    "stop_loss_price": ai_decision_dict.get("stop_loss_price"),
-                    "take_profit_price": ai_decision_dict.get("take_profit_price"),
-                    "reasoning": ai_decision_dict.get("reasoning", "No reasoning provided"),
-                    "full_prompt": ai_decision_dict.get("full_prompt"),
-                    "raw_response": ai_decision_dict.get("raw_response"),
-                    "aggregated_inputs": aggregated_inputs_model.model_dump(),
-                    "execution_status": "PENDING",
-                    "gemini_tokens_input": ai_decision_dict.get("usage_metadata", {}).get("prompt_token_count"),
-                    "gemini_tokens_output": ai_decision_dict.get("usage_metadata", {}).get("candidates_token_count"),
-                    "gemini_cost_usd": ai_decision_dict.get("usage_metadata", {}).get("total_cost_usd")
-                }
+        if not aggregated_inputs_model:
+            logger.warning(f"Failed to gather complete inputs for AIAgent for pair {current_pair_symbol_str}. Skipping AI decision.")
+            # Potential: notify UI, increment error counter, etc.
+            return False
+
+        # 2. Get decision from AIAgent
+        # AIAgent.decide_trade now expects an AggregatedInputs object
+        ai_decision_dict = await self.ai_agent.decide_trade(aggregated_inputs_model)
+
+        # Record the AI's decision in database
+        try:
+            usage = ai_decision_dict.get("usage_metadata") or {} # Looked up once for the three token/cost fields
+            decision_data = {
+                "decision_id": aggregated_inputs_model.request_id,
+                "timestamp_utc": aggregated_inputs_model.timestamp_utc.isoformat(), # Clock read once, when the inputs were gathered
+                "decision_type": ai_decision_dict.get("decision", "HOLD"),
+                "token_pair": current_pair_symbol_str,
+                "amount_usd": ai_decision_dict.get("amount_usd"),
+                "confidence": ai_decision_dict.get("confidence", 0.0),
+                "stop_loss_price": ai_decision_dict.get("stop_loss_price"),
+                "take_profit_price": ai_decision_dict.get("take_profit_price"),
+                "reasoning": ai_decision_dict.get("reasoning", "No reasoning provided"),
+                "full_prompt": ai_decision_dict.get("full_prompt"),
+                "raw_response": ai_decision_dict.get("raw_response"),
+                "aggregated_inputs": aggregated_inputs_model.model_dump_json(), # Serialized once (pydantic-core), stored as is
+                "execution_status": "PENDING",
+                "gemini_tokens_input": usage.get("prompt_token_count"),
+                "gemini_tokens_output": usage.get("candidates_token_count"),
+                "gemini_cost_usd": usage.get("total_cost_usd")
+            }
+            
+            decision_id = self.database.record_ai_decision(decision_data)
+            if decision_id:
+                logger.info("AI decision recorded: %s", decision_id)
                 
-                decision_id = self.database.record_ai_decision(decision_data)
-                if decision_id:
-                    logger.info(f"AI decision recorded: {decision_id}")
-                    
-                    # Emit to Socket.io clients
-                    if hasattr(self, 'socket_manager'):
-                        await self.socket_manager.emit_ai_agent_decision({
-                            "decision_id": decision_id,
-                            "decision": ai_decision_dict.get("decision"),
-                            "confidence": ai_decision_dict.get("confidence"),
-                            "reasoning": ai_decision_dict.get("reasoning", "")[:100],  # Truncated for UI
-                            "token_pair": current_pair_symbol_str
-                        })
-                else:
-                    logger.error("Failed to record AI decision in database")
-                    
-            except Exception as log_e:
-                logger.error(f"Error recording AI agent decision: {log_e}", exc_info=True)
-
-            # 3. Execute trade if BUY or SELL decision
-            if ai_decision_dict and ai_decision_dict.get("decision") in ["BUY", "SELL"]:
-                logger.info(f"AIAgent decided to {ai_decision_dict['decision']} {current_pair_symbol_str}. Attempting execution.")
+                # Emit to Socket.io clients
+                if self.socket_manager is not None: # Set in __init__ (None if unavailable)
+                    await self.socket_manager.emit_ai_agent_decision({
+                        "decision_id": decision_id,
+                        "decision": ai_decision_dict.get("decision"),
+                        "confidence": ai_decision_dict.get("confidence"),
+                        "reasoning": ai_decision_dict.get("reasoning", "")[:100],  # Truncated for UI
+                        "token_pair": current_pair_symbol_str
+                    })
+            else:
+                logger.error("Failed to record AI decision in database")
                 
-                # Pass the entire decision dictionary to TradeExecutor
-                # TradeExecutor.execute_agent_order will extract necessary fields
-                # and perform further checks (e.g., amount_usd is not None).
+        except Exception as log_e:
+            logger.error(f"Error recording AI agent decision: {log_e}", exc_info=True)
+
+        # 3. Execute trade if BUY or SELL decision
+        if ai_decision_dict and ai_decision_dict.get("decision") in ["BUY", "SELL"]:
+            logger.info("AIAgent decided to %s %s. Attempting execution.", ai_decision_dict['decision'], current_pair_symbol_str)
+            self._invalidate_portfolio_value() # Cash / positions may change from here on
+            
+            # Pass the entire decision dictionary to TradeExecutor
+            # TradeExecutor.execute_agent_order will extract necessary fields
+            # and perform further checks (e.g., amount_usd is not None).
+            # Bounded to max_concurrent_executions swaps in flight (RPC / Jupiter rate limits)
+            async with self._execution_semaphore:
                 trade_result = await self.trade_executor.execute_agent_order(ai_decision_dict)
-                
-                if trade_result['success']:
-                    logger.info(f"Trade executed successfully for {current_pair_symbol_str}. Signature: {trade_result.get('signature')}")
-                    self.performance_monitor.track_trade(trade_result.get('pnl_usd', 0), True) # Assuming PNL is part of result
-                else:
-                    logger.error(f"Trade execution failed for {current_pair_symbol_str}: {trade_result.get('error')}. Details: {trade_result.get('details')}")
-                    self.performance_monitor.track_trade(0, False)
-            elif ai_decision_dict and ai_decision_dict.get("decision") == "HOLD":
-                logger.info(f"AIAgent decided to HOLD for {current_pair_symbol_str}. Reasoning: {ai_decision_dict.get('reasoning')}")
+            
+            if trade_result['success']:
+                logger.info("Trade executed successfully for %s. Signature: %s", current_pair_symbol_str, trade_result.get('signature'))
+                self.performance_monitor.track_trade(trade_result.get('pnl_usd', 0), True) # Assuming PNL is part of result
             else:
-                logger.warning(f"AIAgent returned an invalid or no decision for {current_pair_symbol_str}: {ai_decision_dict}")
+                logger.error(f"Trade execution failed for {current_pair_symbol_str}: {trade_result.get('error')}. Details: {trade_result.get('details')}")
+                self.performance_monitor.track_trade(0, False)
+        elif ai_decision_dict and ai_decision_dict.get("decision") == "HOLD":
+            logger.info("AIAgent decided to HOLD for %s. Reasoning: %s", current_pair_symbol_str, ai_decision_dict.get('reasoning'))
+        else:
+            logger.warning(f"AIAgent returned an invalid or no decision for {current_pair_symbol_str}: {ai_decision_dict}")
+        return True
 
-            # 4. Update portfolio value for RiskManager and PerformanceMonitor after potential trade
-            current_portfolio_value = await self.portfolio_manager.get_total_portfolio_value()
-            self.risk_manager.update_current_portfolio_value(current_portfolio_value)
+    async def _run_cycle(self) -> bool:
+        """Exécute un cycle complet de logique de trading. Retourne False si le cycle a échoué."""
+        cycle_started_at = time.monotonic()
+        self.performance_monitor.begin_cycle(cycle_started_at) # Metrics of this cycle reuse this clock read
+        try:
+            # Open trade count/exposure maintained in memory (reconciled with the DB periodically); the row list is loaded lazily
+            open_trade_count, _ = await self.portfolio_manager.refresh_active_trade_stats()
+
+            # Fast path: nothing to sell and not enough cash to buy -> skip market data, security checks and inference
+            if open_trade_count == 0 and self.portfolio_manager.get_available_cash_for_trading() < self._min_order_value_usd:
+                self.idle_cycles += 1
+                logger.debug("Idle cycle: no cash and no open position (idle cycles: %d).", self.idle_cycles)
+                return True
+
+            # Predictions for all pairs in one batch, running while the strategy signals and pairs are prepared
+            if self.prediction_engine:
+                self._cycle_predictions = asyncio.create_task(self._predict_cycle_batch())
+
+            # Strategy indicators for all pairs in one batch; on failure each pair computes its own
+            try:
+                await self._prepare_strategy_signals()
+            except Exception as e:
+                logger.warning(f"Batched strategy signals unavailable this cycle: {e}")
+
+            # 0-3. Pairs are processed concurrently (at most MAX_CONCURRENT_PAIRS at a time)
+            results = await asyncio.gather(*(self._process_pair_bounded(p) for p in self._target_pairs), return_exceptions=True)
+            for pair_symbol_str, result in zip(self._target_pairs, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if isinstance(result, Exception):
+                    logger.error(f"Error processing pair {pair_symbol_str}: {result}", exc_info=result)
+            if not any(result is True for result in results):
+                return False
+
+            # 4. Update portfolio value for RiskManager and PerformanceMonitor after potential trade.
+            # Without a trade attempt, the valuation read while gathering the inputs is still current.
+            current_portfolio_value = await self._get_portfolio_value(read_since=cycle_started_at)
+            self.risk_manager.update_portfolio_value(current_portfolio_value)
             self.performance_monitor.track_portfolio_value(current_portfolio_value)
-            logger.debug(f"Portfolio value updated post-cycle: ${current_portfolio_value:.2f}")
+            logger.debug("Portfolio value updated post-cycle: $%.2f", current_portfolio_value)
+            return True
 
         except DataCollectionError as dce: # Specific error for data gathering issues
             logger.error(f"Data collection error in DexBot cycle: {dce}", exc_info=True)
-            # Potentially pause bot or increase sleep interval on repeated errors
+            # Repeated failures back off in _main_loop
         except NumerusXBaseError as nxe: # Catch custom app errors
             logger.error(f"NumerusX specific error in DexBot cycle: {nxe}", exc_info=True)
         except asyncio.CancelledError:
@@ -596,6 +1060,11 @@ class DexBot:
             logger.critical(f"Unexpected critical error in DexBot cycle: {e}", exc_info=True)
             # This might indicate a need to stop the bot if errors persist
             # For now, it will log and the main_loop will attempt to continue after sleep
+        finally:
+            self._cancel_pending(self._cycle_predictions)
+            self._cycle_predictions = None
+            self.performance_monitor.end_cycle()
+        return False
             
     async def _get_market_data_for_pair(self, target_symbol: str, base_symbol: str, target_mint: str, base_mint: str) -> Dict[str, Any]:
         """Helper to fetch and structure market data for a given pair."""
@@ -629,9 +1098,9 @@ class DexBot:
             return
         
         self.active = False
-        if self.main_loop_task:
-            self.main_loop_task.cancel()
-            # await self.main_loop_task # Wait for it to actually cancel, handle exceptions
+        # Ends the wait between cycles at once; a cycle in progress finishes (no swap cut mid-flight),
+        # close() cancels the loop if it takes too long
+        self._wake_event.set()
         logger.info("DexBot has been signaled to stop.")
 
     async def close(self):
@@ -656,9 +1125,30 @@ class DexBot:
         #     logger.info("JupiterApiClient closed.")
 
         if self.market_data_provider:
-            await self.market_data_provider.close_session() # If MarketDataProvider has a session
+            await self.market_data_provider.close_session()
             logger.info("MarketDataProvider session closed.")
             
+        if self.portfolio_manager:
+            await self.portfolio_manager.stop_trade_writer() # Final flush before the DB is closed
+
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
+            logger.info("Shared HTTP session closed.")
+
+        if self.async_db:
+            await self.async_db.close()
+            self.async_db = None
+            logger.info("Async DB pool closed.")
+            
+        if self._cpu_pool:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+            logger.info("CPU process pool shut down.")
+
+        if self.database:
+            self.database.close()
+            logger.info("Database connection closed.")
+
         # if self.trading_engine: # TradingEngine might also have resources to close
         #     await self.trading_engine.close_resources() 
         #     logger.info("TradingEngine resources closed.")
@@ -675,7 +1165,7 @@ async def main():
                         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                         handlers=[logging.StreamHandler()]) # Add file handler for production
 
-    logger.info("Starting NumerusX DexBot application...")
+    logger.info("Starting NumerusX DexBot application (event loop: %s)...", type(asyncio.get_running_loop()).__module__)
     bot = DexBot()
     try:
         await bot.run()
@@ -688,5 +1178,30 @@ async def main():
         await bot.close()
         logger.info("DexBot has shut down.")
 
+def run_with_best_event_loop() -> None:
+    """Runs main() on uvloop (libuv) when it is installed, else on the default asyncio loop.
+
+    uvloop does not exist on Windows: the selector loop is used there instead of the default
+    Proactor loop, whose transports are closed after the loop at shutdown with aiohttp
+    ("Event loop is closed" errors).
+    """
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(main())
+        return
+
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None # Boucle asyncio par défaut ; la boucle utilisée est journalisée au démarrage de main()
+
+    if uvloop is None:
+        asyncio.run(main())
+    elif sys.version_info >= (3, 12):
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+    else:
+        uvloop.install()
+        asyncio.run(main())
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_with_best_event_loop()
\ No newline at end of file
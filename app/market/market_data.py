@@ -3,9 +3,15 @@ import asyncio
 import json
 import logging
 import time
+from operator import attrgetter
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
 from cachetools import TTLCache
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from app.cache import RedisCache
+from app.utils.http import create_pooled_session_from_config, loads_json
+from app.utils.inflight import InFlightRequests
 from app.config import get_config
 # from app.utils.jupiter_api_client import JupiterApiClient  # Temporarily disabled - SDK not installed
 from app.utils.exceptions import (
@@ -17,15 +23,164 @@ from app.utils.exceptions import (
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("market_data")
 
+OHLCV_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+# Quote tokens préférés pour la sélection du pool de référence du prix
+PREFERRED_QUOTE_SYMBOLS = frozenset({"USDC", "USDT", "SOL", "RAY", "JUP", "WIF"})
+
+
+def _ohlcv_to_columns(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Convertit les bougies DexScreener ({"T","O","H","L","C","V"}) en colonnes NumPy
+    (dict-of-arrays), triées par timestamp croissant. Les bougies incomplètes ou non
+    numériques sont écartées par un masque vectorisé.
+    """
+    rows = [(c.get("T"), c.get("O"), c.get("H"), c.get("L"), c.get("C"), c.get("V")) for c in candles]
+    try:
+        values = np.array(rows, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    except (TypeError, ValueError): # Valeurs manquantes ou non numériques : conversion tolérante
+        values = np.array([[_to_float(x) for x in row] for row in rows], dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    values = values[~np.isnan(values).any(axis=1)]
+    values = values[np.argsort(values[:, 0], kind='stable')]
+    columns = {name: np.ascontiguousarray(values[:, j]) for j, name in enumerate(OHLCV_COLUMNS)}
+    columns['timestamp'] = (columns['timestamp'] // 1000).astype(np.int64) # ms -> s
+    return columns
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+_EMPTY: Dict[str, Any] = {} # Sentinelle partagée (lecture seule) pour les sous-objets absents
+
+
+class NormalizedPair(NamedTuple):
+    """Vue à plat d'une paire DexScreener, calculée une seule fois à l'ingestion."""
+    pair_address: Optional[str]
+    base_token_address: Optional[str]
+    base_symbol: Optional[str]
+    base_name: Optional[str]
+    base_decimals: Optional[int]
+    quote_token_address: Optional[str]
+    quote_symbol: Optional[str]
+    quote_name: Optional[str]
+    price_usd: Optional[float]
+    price_native: Optional[float]
+    liquidity_usd: Optional[float]
+    volume_h24: Optional[float]
+    raw: Dict[str, Any]
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_pair(pair: Dict[str, Any]) -> NormalizedPair:
+    """
+    Aplatit une paire DexScreener brute. Les sous-objets (baseToken, quoteToken, liquidity, volume)
+    ne sont lus qu'une fois, sans allouer de `{}` par accès manquant ; les montants sont
+    convertis en float (None si absents ou invalides).
+    """
+    base = pair.get('baseToken') or _EMPTY
+    quote = pair.get('quoteToken') or _EMPTY
+    return NormalizedPair(
+        pair_address=pair.get('pairAddress'),
+        base_token_address=base.get('address') or pair.get('mint'),
+        base_symbol=base.get('symbol'),
+        base_name=base.get('name'),
+        base_decimals=_optional_int(base.get('decimals')),
+        quote_token_address=quote.get('address'),
+        quote_symbol=quote.get('symbol'),
+        quote_name=quote.get('name'),
+        price_usd=_optional_float(pair.get('priceUsd')),
+        price_native=_optional_float(pair.get('priceNative')),
+        liquidity_usd=_optional_float((pair.get('liquidity') or _EMPTY).get('usd')),
+        volume_h24=_optional_float((pair.get('volume') or _EMPTY).get('h24')),
+        raw=pair
+    )
+
+
+def pair_columns(pairs: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Projette les champs numériques des paires DexScreener brutes en colonnes NumPy alignées
+    sur `pairs` (float64, NaN si absent ou invalide), plus le symbole du quote token en majuscules,
+    pour sélectionner/filtrer les paires par expressions vectorisées.
+    """
+    rows = [
+        (
+            (p.get('liquidity') or _EMPTY).get('usd'),
+            p.get('priceUsd'),
+            (p.get('volume') or _EMPTY).get('h24'),
+            ((p.get('quoteToken') or _EMPTY).get('symbol') or '').upper(),
+        )
+        for p in pairs
+    ]
+    liquidity, price, volume, quote = zip(*rows) if rows else ((), (), (), ())
+    return {
+        # None -> NaN à la conversion en float64
+        'liquidity_usd': np.array([_optional_float(v) for v in liquidity], dtype=np.float64),
+        'price_usd': np.array([_optional_float(v) for v in price], dtype=np.float64),
+        'volume_h24': np.array([_optional_float(v) for v in volume], dtype=np.float64),
+        'quote_symbol': np.array(quote, dtype=object),
+    }
+
+
+def most_liquid_pair(pairs: List[Dict[str, Any]], quote_symbols: Optional[frozenset] = None,
+                     require_price: bool = False) -> Optional[NormalizedPair]:
+    """
+    Paire normalisée ayant la plus forte liquidité USD (None si aucune n'en déclare).
+    `quote_symbols` restreint aux paires cotées contre ces tokens ; `require_price` écarte
+    celles sans priceUsd positif. Seule la paire retenue est normalisée.
+    """
+    if not pairs:
+        return None
+    columns = pair_columns(pairs)
+    liquidity = columns['liquidity_usd']
+    mask = ~np.isnan(liquidity)
+    if quote_symbols is not None:
+        mask &= np.isin(columns['quote_symbol'], list(quote_symbols))
+    if require_price:
+        mask &= columns['price_usd'] > 0
+    if not mask.any():
+        return None
+    return normalize_pair(pairs[int(np.argmax(np.where(mask, liquidity, -np.inf)))])
+
+
+def _columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Format historique (liste de bougies) reconstruit à partir des colonnes."""
+    return [
+        {'timestamp': int(ts), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for ts, o, h, l, c, v in zip(*(columns[name].tolist() for name in OHLCV_COLUMNS))
+    ]
+
+
 class MarketDataProvider:
     """Classe centralisée pour la gestion des données de marché provenant de différentes sources."""
-    
+
     def __init__(self):
         """
         Initialise le fournisseur de données de marché.
         Utilise les paramètres de cache et de rate limit depuis get_config().
         """
         self.session = None
+        # False quand la session est fournie par l'appelant (attach_http_session) : elle n'est pas fermée ici
+        self._owns_session = True
         self.config = get_config() # Store config instance
 
         # Initialize JupiterApiClient
@@ -52,8 +207,14 @@ class MarketDataProvider:
         self.price_cache = TTLCache(maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE, ttl=get_config().MARKET_DATA_CACHE_TTL_SECONDS)
         self.token_info_cache = TTLCache(maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE, ttl=get_config().MARKET_DATA_CACHE_TTL_SECONDS * 5)
         self.liquidity_cache = TTLCache(maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE, ttl=get_config().MARKET_DATA_CACHE_TTL_SECONDS // 2)
-        self.pairs_cache = TTLCache(maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE // 10, ttl=get_config().MARKET_DATA_CACHE_TTL_SECONDS * 10) # Cache for pairs
+        self.pairs_cache = RedisCache(prefix="numerusx:dexscreener_pairs", default_ttl=get_config().redis.pair_cache_ttl_seconds,
+                                      local_maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE // 10) # Cache for pairs (shared via Redis if enabled)
         self.historical_data_cache = TTLCache(maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE // 2, ttl=get_config().MARKET_DATA_CACHE_TTL_SECONDS * 2) # Cache for historical data
+        # Requêtes d'historique en cours, par clé de cache : les appels simultanés pour la même série la partagent
+        self._historical_inflight = InFlightRequests()
+        # Idem pour les prix (plusieurs paires, TradeExecutor et la valorisation du portefeuille dans le même cycle)
+        self._price_inflight = InFlightRequests()
+        self.stats = {'price_cache_hits': 0, 'price_cache_misses': 0, 'price_requests_coalesced': 0}
         self.jupiter_quote_cache = TTLCache(maxsize=get_config().MARKET_DATA_CACHE_MAX_SIZE // 5, ttl=get_config().MARKET_DATA_CACHE_TTL_SECONDS // 4) # Cache for Jupiter quotes
         
         # Initialiser les limites de taux à partir de Config
@@ -67,20 +228,178 @@ class MarketDataProvider:
                 "wait_seconds": limits.get("default_wait", get_config().DEFAULT_API_RATE_LIMIT_WAIT_SECONDS) # Default wait
             }
 
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Crée la session HTTP partagée avec un connecteur poolé (keep-alive, cache DNS) : une seule
+        session pour tous les appels HTTP, le coût TCP+TLS (et DNS) n'est payé qu'une fois par hôte."""
+        return create_pooled_session_from_config()
+
+    def attach_http_session(self, session: aiohttp.ClientSession) -> None:
+        """Utilise une session fournie par l'appelant (ex: DexBot), qui reste responsable de sa fermeture."""
+        self.session = session
+        self._owns_session = False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Retourne la session partagée, en la (re)créant si nécessaire."""
+        if not self.session or self.session.closed:
+            self.session = self._create_session()
+            self._owns_session = True
+        return self.session
+
     async def __aenter__(self):
         """Initialisation du contexte asynchrone."""
-        self.session = aiohttp.ClientSession()
+        self._get_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Nettoyage du contexte asynchrone."""
-        if self.session:
+        await self.close_session()
+
+    async def close_session(self):
+        """Ferme la session HTTP partagée et la connexion Redis du cache de paires (idempotent)."""
+        if self._owns_session and self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
+        await self.pairs_cache.close()
+
+    async def _make_api_request(self, method: str, url: str, request_label: str,
+                                params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Effectue une requête HTTP via la session partagée et décode le JSON.
+        Le rate limit est appliqué sur l'API correspondant au préfixe de `request_label`
+        (ex: 'dexscreener_historical_ohlcv' -> 'dexscreener').
+        Returns a structured response: {'success': True/False, 'error': 'message' or None, 'data': json_or_None}
+        """
+        api_name = request_label.split('_', 1)[0]
+        if api_name in self.rate_limits:
+            await self._check_rate_limit(api_name)
+
+        logger.debug(f"{request_label} request: {method} {url} params={params}")
+        async with self._get_session().request(method, url, params=params, timeout=get_config().API_TIMEOUT_SECONDS) as response:
+            raw = await response.read()
+            if response.status != 200:
+                error_msg = f"{request_label}: API returned status {response.status}"
+                logger.warning(f"{error_msg}: {raw[:500]!r}")
+                return {'success': False, 'error': error_msg, 'data': None}
+            try:
+                return {'success': True, 'error': None, 'data': loads_json(raw)}
+            except json.JSONDecodeError as e: # orjson.JSONDecodeError en hérite
+                logger.error(f"{request_label}: JSON decode error for {url}: {e}")
+                return {'success': False, 'error': f"JSONDecodeError: {str(e)}", 'data': None}
             
+    async def get_token_pairs(self, token_address: str) -> Dict[str, Any]:
+        """
+        Liste des paires DexScreener d'un token (réponse brute 'pairs').
+        Mise en cache à TTL court dans `pairs_cache` (mémoire + Redis si activé), ce qui évite
+        que plusieurs tâches ou instances du bot refassent le même appel.
+        Returns a structured response: {'success': True/False, 'error': 'message' or None, 'data': list_of_pairs_or_None}
+        """
+        cached_pairs = await self.pairs_cache.get(token_address)
+        if cached_pairs is not None:
+            return {'success': True, 'error': None, 'data': cached_pairs}
+
+        url = f"{get_config().DEXSCREENER_API_URL}/latest/dex/tokens/{token_address}"
+        response = await self._make_api_request("GET", url, "dexscreener_token_pairs")
+        if not response['success']:
+            return response
+
+        pairs = (response['data'] or {}).get("pairs") or []
+        if pairs:
+            await self.pairs_cache.set(token_address, pairs)
+        return {'success': True, 'error': None, 'data': pairs}
+
+    # DexScreener accepte jusqu'à 30 adresses séparées par des virgules sur /latest/dex/tokens
+    DEXSCREENER_MAX_TOKENS_PER_REQUEST = 30
+
+    async def _prefetch_token_pairs(self, token_addresses: List[str]) -> None:
+        """
+        Place dans `pairs_cache` les listes de paires des tokens absents, par lots
+        (un appel DexScreener pour jusqu'à 30 tokens au lieu d'un par token).
+        """
+        missing = [a for a in token_addresses if await self.pairs_cache.get(a) is None]
+
+        for i in range(0, len(missing), self.DEXSCREENER_MAX_TOKENS_PER_REQUEST):
+            chunk = missing[i:i + self.DEXSCREENER_MAX_TOKENS_PER_REQUEST]
+            url = f"{get_config().DEXSCREENER_API_URL}/latest/dex/tokens/{','.join(chunk)}"
+            response = await self._make_api_request("GET", url, "dexscreener_token_pairs_batch")
+            if not response['success']:
+                logger.warning(f"Batched DexScreener pairs request failed for {len(chunk)} token(s): {response['error']}")
+                continue
+            wanted = set(chunk)
+            pairs_by_token: Dict[str, List[Dict[str, Any]]] = {}
+            for raw_pair in (response['data'] or {}).get("pairs") or []:
+                pair = normalize_pair(raw_pair)
+                for address in (pair.base_token_address, pair.quote_token_address):
+                    if address in wanted:
+                        pairs_by_token.setdefault(address, []).append(raw_pair)
+            for address, pairs in pairs_by_token.items():
+                await self.pairs_cache.set(address, pairs)
+
+    # Requêtes OHLCV simultanées au plus dans get_historical_prices_batch
+    MAX_CONCURRENT_OHLCV_REQUESTS = 8
+
+    async def get_historical_prices_batch(self, token_addresses: List[str], timeframe: str = "1h",
+                                          limit: int = 100) -> Dict[str, Optional[Dict[str, np.ndarray]]]:
+        """
+        Historique OHLCV (colonnes NumPy, voir get_historical_prices) de plusieurs tokens.
+        Les séries en cache sont servies directement ; pour les autres, les listes de paires sont
+        récupérées par lots (_prefetch_token_pairs) puis l'OHLCV, qui n'a pas d'endpoint groupé
+        chez DexScreener, est demandé en parallèle (MAX_CONCURRENT_OHLCV_REQUESTS au plus) :
+        une requête par token au lieu de deux.
+        Returns {token_address: columns_or_None} ; les échecs sont journalisés et valent None.
+        """
+        addresses = list(dict.fromkeys(a for a in token_addresses if a))
+        results: Dict[str, Optional[Dict[str, np.ndarray]]] = {}
+        to_fetch = []
+        for address in addresses:
+            cached = self.historical_data_cache.get(f"{address}_{timeframe}_{limit}_dexscreener_historical")
+            if cached:
+                results[address] = cached
+            else:
+                to_fetch.append(address)
+        if not to_fetch:
+            return results
+
+        await self._prefetch_token_pairs(to_fetch)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_OHLCV_REQUESTS)
+
+        async def fetch(address: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_historical_prices(address, timeframe, limit, as_columns=True)
+
+        responses = await asyncio.gather(*(fetch(a) for a in to_fetch), return_exceptions=True)
+        for address, response in zip(to_fetch, responses):
+            if isinstance(response, BaseException):
+                logger.warning(f"Historical data unavailable for {address}: {response}")
+                response = None
+            results[address] = response['data'] if response and response['success'] else None
+        return results
+
+    async def get_pair_bundle(self, token_addresses: List[str], timeframe: str = "1h",
+                              ohlcv_limit: int = 24) -> Dict[str, Dict[str, Any]]:
+        """
+        Regroupe en un seul passage les données de marché par token : listes de paires par lots
+        et historique OHLCV en parallèle (voir get_historical_prices_batch), sans appel de
+        paires par token.
+        Returns {token_address: {'metrics': pair_dict_or_None, 'ohlcv': columns_or_None}}.
+        """
+        addresses = list(dict.fromkeys(a for a in token_addresses if a))
+        await self._prefetch_token_pairs(addresses) # Métriques de paires, même si l'OHLCV est en cache
+        ohlcv_by_token = await self.get_historical_prices_batch(addresses, timeframe, ohlcv_limit)
+
+        bundles: Dict[str, Dict[str, Any]] = {}
+        for address in addresses:
+            best_pair = most_liquid_pair(await self.pairs_cache.get(address) or [])
+            bundles[address] = {
+                'metrics': self._convert_dexscreener_format(best_pair) if best_pair else None,
+                'ohlcv': ohlcv_by_token.get(address)
+            }
+        return bundles
+
     async def get_token_price(self, token_address: str, reference_token: str = "USDC") -> Dict[str, Any]:
         """
         Obtient le prix d'un token via plusieurs sources avec mécanisme de repli.
-        Utilise le cache.
+        Utilise le cache ; les appels simultanés pour le même prix attendent une seule requête
+        (compteurs dans `self.stats`).
         
         Args:
             token_address: Adresse du token Solana
@@ -94,8 +413,19 @@ class MarketDataProvider:
         cache_key = f"{token_address}_{reference_token}_price"
         cached_value = self.price_cache.get(cache_key)
         if cached_value:
+            self.stats['price_cache_hits'] += 1
             return {'success': True, 'error': None, 'data': cached_value}
-            
+
+        if cache_key in self._price_inflight:
+            self.stats['price_requests_coalesced'] += 1
+        else:
+            self.stats['price_cache_misses'] += 1
+        return await self._price_inflight.run(
+            cache_key, lambda: self._fetch_token_price(token_address, reference_token, cache_key)
+        )
+
+    async def _fetch_token_price(self, token_address: str, reference_token: str, cache_key: str) -> Dict[str, Any]:
+        """Requête effective de get_token_price (Jupiter puis DexScreener), mise en cache sous `cache_key`."""
         final_errors = [] # Collect error messages from different sources
         
         # Essayer Jupiter d'abord
@@ -181,52 +511,24 @@ class MarketDataProvider:
             final_errors.append(f"JupiterSDK Unexpected Error: {str(e)}")
             logger.error(f"Unexpected error in _get_jupiter_token_info call for {token_address}: {e}", exc_info=True)
         
-        # Fallback to DexScreener (this part was previously making direct calls, now should rely on a refactored _get_dexscreener_token_info or adapt)
-        # Assuming the DexScreener part of get_token_info was already refactored to use _get_dexscreener_info and raise DexScreenerAPIError
-        # For now, I will adapt the existing DexScreener logic within get_token_info to raise/catch DexScreenerAPIError directly here.
-        # This section previously contained direct aiohttp calls for DexScreener token info.
-        # It needs to be refactored to use a helper that raises DexScreenerAPIError or handle it here.
-
-        # Let's assume we make a call to a hypothetical _get_dexscreener_token_info_via_api that might raise DexScreenerAPIError
-        # If such a helper doesn't exist, the direct DexScreener call logic within this method needs its try-except blocks updated.
-        # The previous edit modified the DexScreener part within this function to raise DexScreenerAPIError.
-        # So, we will add a try-except block for that.
-
+        # Fallback to DexScreener: pair listing for the token (shared pairs cache)
         try:
             logger.debug(f"Fetching token info for {token_address} from DexScreener (fallback within get_token_info)")
-            await self._check_rate_limit("dexscreener") # Keep rate limit for direct dexscreener calls if any
-            if not self.session or self.session.closed: 
-                self.session = aiohttp.ClientSession()
-            
-            ds_token_url = f"{self.config.DEXSCREENER_API_URL}/latest/dex/tokens/{token_address}"
-            logger.debug(f"DexScreener token info request (direct): GET {ds_token_url}")
+            pairs_response = await self.get_token_pairs(token_address)
+            if not pairs_response['success']:
+                raise DexScreenerAPIError(f"DexScreener pairs request failed (direct call): {pairs_response['error']}")
+            if not pairs_response['data']:
+                raise DexScreenerAPIError("No pairs array or empty pairs in DexScreener response (direct call)")
 
-            async with self.session.get(ds_token_url, timeout=self.config.API_TIMEOUT_SECONDS) as response:
-                response_text = await response.text()
-                if response.status == 200:
-                    try:
-                        ds_api_data = json.loads(response_text)
-                        if ds_api_data.get("pairs") and isinstance(ds_api_data["pairs"], list) and len(ds_api_data["pairs"]) > 0:
-                            best_pair_for_info = sorted(
-                                [p for p in ds_api_data["pairs"] if p.get("liquidity", {}).get("usd") is not None],
-                                key=lambda x: float(x["liquidity"]["usd"]), 
-                                reverse=True
-                            )
-                            if best_pair_for_info:
-                                token_data = self._convert_dexscreener_format(best_pair_for_info[0], is_token_info=True)
-                                if token_data and token_data.get("address"):
-                                    self.token_info_cache[cache_key] = token_data
-                                    return {'success': True, 'error': None, 'data': token_data, 'source': 'dexscreener'}
-                                else:
-                                    raise DexScreenerAPIError("Failed to convert DexScreener data or address missing (direct call)", original_exception=ValueError("Converted data invalid"))
-                            else:
-                                raise DexScreenerAPIError("No pairs with USD liquidity found on DexScreener for token info (direct call)")
-                        else:
-                            raise DexScreenerAPIError("No pairs array or empty pairs in DexScreener response (direct call)")
-                    except json.JSONDecodeError as e:
-                        raise DexScreenerAPIError(f"JSONDecodeError from DexScreener (direct call): {str(e)}", original_exception=e)
-                else:
-                    raise DexScreenerAPIError(f"DexScreener API returned status {response.status} (direct call)", status_code=response.status, original_exception=ValueError(response_text))
+            # Only the most liquid pair is used: max() instead of a full sort
+            best_pair_for_info = most_liquid_pair(pairs_response['data'])
+            if not best_pair_for_info:
+                raise DexScreenerAPIError("No pairs with USD liquidity found on DexScreener for token info (direct call)")
+            token_data = self._convert_dexscreener_format(best_pair_for_info, is_token_info=True)
+            if not token_data.get("address"):
+                raise DexScreenerAPIError("Failed to convert DexScreener data or address missing (direct call)", original_exception=ValueError("Converted data invalid"))
+            self.token_info_cache[cache_key] = token_data
+            return {'success': True, 'error': None, 'data': token_data, 'source': 'dexscreener'}
         except DexScreenerAPIError as e:
             final_errors.append(f"DexScreener Error: {str(e)}")
             logger.warning(f"DexScreenerAPIError for {token_address} token info (direct call): {e}")
@@ -339,7 +641,7 @@ class MarketDataProvider:
         await self._check_rate_limit("dexscreener")
         
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = self._create_session()
             
         # DexScreener API for token pairs
         url = f"{get_config().DEXSCREENER_API_URL}/latest/dex/tokens/{token_address}/pools?include=dexId,baseToken,quoteToken,liquidity,priceUsd,volume" # More targeted query
@@ -350,7 +652,7 @@ class MarketDataProvider:
                 response_text = await response.text()
                 if response.status == 200:
                     try:
-                        data = json.loads(response_text)
+                        data = loads_json(response_text)
                         logger.debug(f"DexScreener price response data: {data}")
 
                         if not data.get("pools") or not isinstance(data["pools"], list) or len(data["pools"]) == 0:
@@ -361,32 +663,16 @@ class MarketDataProvider:
                         # Note: Jupiter's /price is simpler as it resolves the best price across pools.
                         # DexScreener's /tokens/{token}/pools gives multiple options.
                         # We might want to refine this logic to iterate or pick the most liquid pool against USDC/SOL.
-                        best_pool = None
-                        highest_liquidity = -1
-
-                        for pool in data["pools"]:
-                            # Prefer pools against common quote tokens like USDC, USDT, SOL
-                            # and ensure priceUsd and liquidity.usd are present
-                            quote_symbol = pool.get("quoteToken", {}).get("symbol", "").upper()
-                            liquidity_usd_str = pool.get("liquidity", {}).get("usd")
-                            price_usd_str = pool.get("priceUsd")
-
-                            if price_usd_str and liquidity_usd_str:
-                                try:
-                                    current_liquidity_usd = float(liquidity_usd_str)
-                                    if quote_symbol in ["USDC", "USDT", "SOL", "RAY", "JUP", "WIF"] and current_liquidity_usd > highest_liquidity: # Added more common quote tokens
-                                        highest_liquidity = current_liquidity_usd
-                                        best_pool = pool
-                                except ValueError:
-                                    logger.warning(f"Could not parse liquidity or price for pool {pool.get('pairAddress')} for token {token_address}")
-                                    continue
+                        # Prefer pools against common quote tokens like USDC, USDT, SOL
+                        # and ensure priceUsd and liquidity.usd are present (vectorized selection)
+                        best_pool = most_liquid_pair(data["pools"], quote_symbols=PREFERRED_QUOTE_SYMBOLS, require_price=True)
                         
                         if not best_pool: # If no preferred pool found, take the first one with priceUsd
-                            for pool in data["pools"]:
-                                if pool.get("priceUsd"):
-                                    best_pool = pool
-                                    logger.debug(f"No preferred quote token pool found for {token_address}, using first available pool: {best_pool.get('pairAddress')}")
-                                    break
+                            price_column = pair_columns(data["pools"])['price_usd']
+                            with_price = np.flatnonzero(price_column > 0)
+                            best_pool = normalize_pair(data["pools"][int(with_price[0])]) if with_price.size else None
+                            if best_pool:
+                                logger.debug(f"No preferred quote token pool found for {token_address}, using first available pool: {best_pool.pair_address}")
                             
                         if not best_pool:
                             logger.warning(f"No suitable pool with priceUsd found for token {token_address} on DexScreener after filtering.")
@@ -397,7 +683,7 @@ class MarketDataProvider:
                         price_data = self._convert_dexscreener_format(best_pool, is_token_info=False) # is_token_info=False for price context
                         
                         if price_data.get("price") is None:
-                            logger.warning(f"DexScreener returned null price for {token_address} from pool {best_pool.get('pairAddress')}")
+                            logger.warning(f"DexScreener returned null price for {token_address} from pool {best_pool.pair_address}")
                             return {'success': False, 'error': f"null_price_from_selected_pool: {token_address}", 'data': None, 'source': 'dexscreener'}
 
                         return {'success': True, 'error': None, 'data': price_data, 'source': 'dexscreener'}
@@ -485,7 +771,7 @@ class MarketDataProvider:
         # Example call to DexScreener for a specific pair (pool)
         await self._check_rate_limit("dexscreener")
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = self._create_session()
 
         url = f"{get_config().DEXSCREENER_API_URL}/latest/dex/pairs/{get_config().SOLANA_CHAIN_ID_DEXSCREENER}/{pool_address}" # Assuming Solana chain and pool address format
         logger.debug(f"DexScreener specific pool liquidity request: GET {url}")
@@ -494,7 +780,7 @@ class MarketDataProvider:
                 response_text = await response.text()
                 if response.status == 200:
                     try:
-                        data = json.loads(response_text)
+                        data = loads_json(response_text)
                         if data.get("pair"):
                             pair_data = data["pair"]
                             # Convert this pair_data to your standardized liquidity format
@@ -530,7 +816,7 @@ class MarketDataProvider:
         # Fallback to trying DexScreener pools for the token
         await self._check_rate_limit("dexscreener")
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = self._create_session()
 
         url = f"{get_config().DEXSCREENER_API_URL}/latest/dex/tokens/{token_address}/pools"
         logger.debug(f"DexScreener best liquidity (pools) request: GET {url}")
@@ -539,11 +825,11 @@ class MarketDataProvider:
                 response_text = await response.text()
                 if response.status == 200:
                     try:
-                        data = json.loads(response_text)
+                        data = loads_json(response_text)
                         if data.get("pools") and len(data["pools"]) > 0:
                             # Select pool with highest USD liquidity
-                            best_pool = max(data["pools"], key=lambda p: float(p.get("liquidity", {}).get("usd", 0)))
-                            converted_data = self._convert_dexscreener_format(best_pool, is_liquidity_info=True)
+                            best_pool = most_liquid_pair(data["pools"])
+                            converted_data = self._convert_dexscreener_format(best_pool, is_liquidity_info=True) if best_pool else {}
                             if converted_data.get('liquidity_usd') is not None:
                                 return {'success': True, 'error': None, 'data': converted_data, 'source': 'dexscreener-pools'}
                             else:
@@ -594,35 +880,45 @@ class MarketDataProvider:
         return ["Jupiter", "DexScreener", "Raydium", "Orca"] # Example
         
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10), retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)))
-    async def get_historical_prices(self, token_address: str, timeframe: str = "1h", limit: int = 100, exchange: str = "dexscreener") -> Dict[str, Any]:
+    async def get_historical_prices(self, token_address: str, timeframe: str = "1h", limit: int = 100, exchange: str = "dexscreener",
+                                    as_columns: bool = False) -> Dict[str, Any]:
         """
         Récupère les données de prix historiques. Pour l'instant, supporte DexScreener.
-        Returns a structured response: {'success': True/False, 'error': 'message' or None, 'data': list_of_ohlcv_or_None}
+        Avec `as_columns=True`, 'data' est un dict de colonnes NumPy (timestamp/open/high/low/close/volume)
+        directement utilisable par `pd.DataFrame(data, copy=False)`.
+        Les appels simultanés pour la même série (ex: plusieurs paires sur le même token dans un
+        cycle) attendent une seule requête.
+        Returns a structured response: {'success': True/False, 'error': 'message' or None, 'data': list_of_ohlcv_or_columns_or_None}
         """
         cache_key = f"{token_address}_{timeframe}_{limit}_{exchange}_historical"
         cached_data = self.historical_data_cache.get(cache_key)
         if cached_data:
-            return {'success': True, 'error': None, 'data': cached_data}
+            return {'success': True, 'error': None, 'data': cached_data if as_columns else _columns_to_records(cached_data)}
+
+        response = await self._historical_inflight.run(
+            cache_key, lambda: self._fetch_historical_columns(token_address, timeframe, limit, exchange, cache_key)
+        )
+        if response['success'] and not as_columns:
+            return {**response, 'data': _columns_to_records(response['data'])}
+        return response
 
+    async def _fetch_historical_columns(self, token_address: str, timeframe: str, limit: int, exchange: str,
+                                        cache_key: str) -> Dict[str, Any]:
+        """Requête effective de get_historical_prices ('data' en colonnes), mise en cache sous `cache_key`."""
         if exchange.lower() == "dexscreener":
             # 1. Find the most liquid pair for the token_address on DexScreener
-            pairs_info_url = f"{get_config().DEXSCREENER_API_URL}/latest/dex/tokens/{token_address}"
-            pairs_response = await self._make_api_request("GET", pairs_info_url, "dexscreener_pairs_for_historical")
+            pairs_response = await self.get_token_pairs(token_address)
 
-            if not pairs_response['success'] or not pairs_response['data'].get("pairs"):
+            if not pairs_response['success'] or not pairs_response['data']:
                 logger.warning(f"Could not fetch pairs for {token_address} from DexScreener for historical data: {pairs_response.get('error', 'No pairs data')}")
                 return {'success': False, 'error': f"Failed to get pairs for historical data: {pairs_response.get('error', 'No pairs data')}", 'data': None}
 
-            sorted_pairs = sorted(
-                [p for p in pairs_response['data']["pairs"] if p.get("liquidity", {}).get("usd") is not None],
-                key=lambda x: float(x["liquidity"]["usd"]),
-                reverse=True
-            )
-            if not sorted_pairs:
+            best_pair = most_liquid_pair(pairs_response['data'])
+            if not best_pair:
                 logger.warning(f"No liquid pairs found for {token_address} on DexScreener for historical data.")
                 return {'success': False, 'error': "No liquid pairs found for historical data", 'data': None}
             
-            best_pair_address = sorted_pairs[0].get("pairAddress")
+            best_pair_address = best_pair.pair_address
             if not best_pair_address: # This check was correctly in my full diff, ensuring it's here
                 logger.warning(f"Best pair for {token_address} on DexScreener has no address.")
                 return {'success': False, 'error': "Best pair has no address", 'data': None}
@@ -653,39 +949,18 @@ class MarketDataProvider:
                 raw_data = api_response['data']
                 # DexScreener OHLCV format: {"OHLCV": [{"T":timestamp_ms, "O":open, "H":high, "L":low, "C":close, "V":volume_native}, ...]}
                 if raw_data and "OHLCV" in raw_data and isinstance(raw_data["OHLCV"], list):
-                    formatted_candles = []
-                    for candle in raw_data["OHLCV"]:
-                        try:
-                            # Ensure all necessary keys are present and values are convertible
-                            ts = candle.get("T")
-                            o = candle.get("O")
-                            h = candle.get("H")
-                            l = candle.get("L")
-                            c = candle.get("C")
-                            v = candle.get("V")
-                            if all(x is not None for x in [ts, o, h, l, c, v]):
-                                formatted_candles.append({
-                                    "timestamp": ts // 1000, # Convert ms to s
-                                    "open": float(o),
-                                    "high": float(h),
-                                    "low": float(l),
-                                    "close": float(c),
-                                    "volume": float(v) # Volume in token terms
-                                })
-                            else:
-                                logger.warning(f"Skipping candle with missing data in historical OHLCV for {token_address}: {candle}")
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Error converting candle data in historical OHLCV for {token_address}: {candle}. Error: {e}")
-                    
-                    # Sort by timestamp ascending if not already (DexScreener usually returns descending)
-                    formatted_candles.sort(key=lambda x: x["timestamp"])
-                    
-                    # Trim to limit if more data than requested 
-                    final_candles = formatted_candles[-limit:] if len(formatted_candles) > limit else formatted_candles
-
-                    if final_candles:
-                        self.historical_data_cache[cache_key] = final_candles
-                        return {'success': True, 'error': None, 'data': final_candles}
+                    columns = _ohlcv_to_columns(raw_data["OHLCV"])
+                    skipped = len(raw_data["OHLCV"]) - len(columns['timestamp'])
+                    if skipped:
+                        logger.warning(f"Skipped {skipped} candle(s) with missing or invalid data in historical OHLCV for {token_address}")
+
+                    # Trim to limit if more data than requested
+                    if len(columns['timestamp']) > limit:
+                        columns = {name: col[-limit:] for name, col in columns.items()}
+
+                    if len(columns['timestamp']):
+                        self.historical_data_cache[cache_key] = columns
+                        return {'success': True, 'error': None, 'data': columns}
                     else:
                         # This case could happen if all candles had missing data or limit was 0
                         err_msg = f"No valid OHLCV data processed from DexScreener for {token_address} with resolution {selected_res_info['res']}"
@@ -777,56 +1052,53 @@ class MarketDataProvider:
             logger.error(error_msg, exc_info=True)
             return {'success': False, 'error': str(e), 'data': None, 'source': 'jupiter_sdk', 'details': e}
 
-    def _convert_dexscreener_format(self, data: Dict, is_token_info: bool = False, is_pair_list: bool = False) -> Dict:
-        """Normalisation des données DexScreener vers un schéma standardisé."""
-        # 'data' here is a single pair object from DexScreener response
+    def _convert_dexscreener_format(self, data: Any, is_token_info: bool = False, is_pair_list: bool = False,
+                                    is_liquidity_info: bool = False) -> Dict:
+        """
+        Normalisation des données DexScreener vers un schéma standardisé.
+        `data` est une paire DexScreener brute ou déjà normalisée (NormalizedPair).
+        """
+        pair = data if isinstance(data, NormalizedPair) else normalize_pair(data)
+        raw = pair.raw
         
         if is_token_info: # Extract info about the baseToken from a DexScreener pair
-            base_token_ds = data.get('baseToken', {})
             return {
-                'address': base_token_ds.get('address'),
-                'symbol': base_token_ds.get('symbol'),
-                'name': base_token_ds.get('name'),
+                'address': pair.base_token_address,
+                'symbol': pair.base_symbol,
+                'name': pair.base_name,
                 'decimals': None, # DexScreener pair data doesn't usually have decimals here
-                'logoURI': data.get('info', {}).get('imageUrl'), # DexScreener might have imageUrl for pair
+                'logoURI': (raw.get('info') or _EMPTY).get('imageUrl'), # DexScreener might have imageUrl for pair
                 'tags': [],
                 'source': 'dexscreener_pair_as_info',
-                'extensions': {'pairAddress': data.get('pairAddress')}
+                'extensions': {'pairAddress': pair.pair_address}
             }
 
-        # Default conversion for a pair structure
-        base_token = data.get('baseToken', {})
-        quote_token = data.get('quoteToken', {})
-        
-        # DexScreener price is usually priceNative or priceUsd
-        price_usd = data.get('priceUsd')
-        if price_usd is None and data.get('priceNative') is not None:
-            # If only priceNative is available, it might be against SOL or other native token.
-            # For simplicity, if priceUsd is missing, we mark it as None. Accurate conversion needs quote token price.
-            price_usd = None 
-            
+        # Default conversion for a pair structure.
+        # DexScreener price is usually priceNative or priceUsd; if only priceNative is available it is
+        # quoted against the quote token, so priceUsd stays None (accurate conversion needs quote token price).
         return {
-            'pairAddress': data.get('pairAddress'),
+            'pairAddress': pair.pair_address,
             'baseToken': {
-                'address': base_token.get('address'),
-                'symbol': base_token.get('symbol'),
-                'name': base_token.get('name')
+                'address': pair.base_token_address,
+                'symbol': pair.base_symbol,
+                'name': pair.base_name
             },
             'quoteToken': {
-                'address': quote_token.get('address'),
-                'symbol': quote_token.get('symbol'),
-                'name': quote_token.get('name')
+                'address': pair.quote_token_address,
+                'symbol': pair.quote_symbol,
+                'name': pair.quote_name
             },
-            'priceUsd': float(price_usd) if price_usd is not None else None,
-            'priceNative': float(data.get('priceNative')) if data.get('priceNative') is not None else None,
-            'liquidity_usd': float(data.get('liquidity', {}).get('usd', 0)),
-            'volume_h24': float(data.get('volume', {}).get('h24', 0)),
-            'fdv': float(data.get('fdv',0)), # Fully Diluted Valuation
-            'marketCap': float(data.get('marketCap',0)), # Market Cap if available
-            'dexId': data.get('dexId'),
-            'url': data.get('url'),
+            'price': pair.price_usd,
+            'priceUsd': pair.price_usd,
+            'priceNative': pair.price_native,
+            'liquidity_usd': pair.liquidity_usd or None, # Missing or zero: unknown, not $0 of liquidity
+            'volume_h24': pair.volume_h24 or 0.0,
+            'fdv': float(raw.get('fdv') or 0), # Fully Diluted Valuation
+            'marketCap': float(raw.get('marketCap') or 0), # Market Cap if available
+            'dexId': raw.get('dexId'),
+            'url': raw.get('url'),
             'source': 'dexscreener',
-            'raw_data': data # Keep original for further details
+            'raw_data': raw # Keep original for further details
         }
 
     async def get_token_transactions(self, token_address: str, limit: int = 100) -> List[Dict[str, Any]]:
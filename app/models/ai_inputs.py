@@ -3,6 +3,8 @@ Pydantic models for AI Agent inputs.
 Defines structured data models for aggregating all inputs to the AI trading agent.
 """
 
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel, Field, confloat, constr
 from datetime import datetime
 from enum import Enum
@@ -41,8 +43,8 @@ class MarketDataInput(BaseModel):
     recent_ohlcv_1h: List[Dict[str, float]] = Field(
         ..., description="Recent OHLCV data for 1h periods"
     )
-    liquidity_depth_usd: float = Field(
-        ..., gt=0, description="Available liquidity depth in USD"
+    liquidity_depth_usd: Optional[float] = Field(
+        default=None, gt=0, description="Available liquidity depth in USD (None if the pair metrics are unavailable)"
     )
     recent_trend_1h: TrendDirection = Field(
         ..., description="Recent 1h trend direction"
@@ -169,11 +171,14 @@ class PortfolioManagerInput(BaseModel):
 
 class AggregatedInputs(BaseModel):
     """Complete aggregated inputs for the AI trading agent."""
+    request_id: Optional[str] = Field(
+        default=None, description="Identifier of the aggregation (reused as the AI decision id)"
+    )
     timestamp_utc: datetime = Field(
         default_factory=datetime.utcnow, description="Timestamp of data aggregation"
     )
     target_pair: Dict[str, str] = Field(
-        ..., description="Target trading pair information (base/quote)"
+        ..., description="Target trading pair information: symbol, input_mint, output_mint"
     )
     market_data: MarketDataInput = Field(
         ..., description="Market data for the target pair"
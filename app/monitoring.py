@@ -1,45 +1,77 @@
 import time
 import numpy as np
-from collections import defaultdict
 import logging
 
 class PerformanceMonitor:
-    def __init__(self):
-        self.metrics = defaultdict(list)
-        self.start_time = time.time()
+    """Métriques libres (latence, profit, issue des trades) dans un tampon circulaire NumPy.
+
+    Deux colonnes de taille fixe (valeur, identifiant de métrique) : pas
+    d'objet Python par échantillon et mémoire bornée ; les agrégats du rapport sont des
+    réductions masquées sur des tableaux contigus.
+    """
+    CAPACITY = 65536
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self._val = np.empty(capacity, dtype=np.float64)
+        self._metric_id = np.empty(capacity, dtype=np.uint8)
+        self._head = 0
+        self._count = 0
+        self._metric_ids = {} # nom de métrique -> uint8
+        self.start_time = time.monotonic()
         self.logger = logging.getLogger('PerfMonitor')
 
-    def track(self, metric: str, value: float):
+    def track(self, metric: str, value):
+        """Enregistre un échantillon. L'issue d'un trade ('success' / autre) est stockée en 1.0 / 0.0."""
         try:
-            self.metrics[metric].append((time.time(), value))
+            metric_id = self._metric_ids.get(metric)
+            if metric_id is None:
+                if len(self._metric_ids) > np.iinfo(np.uint8).max:
+                    raise ValueError(f"trop de métriques distinctes, '{metric}' ignorée")
+                metric_id = self._metric_ids[metric] = len(self._metric_ids)
+            if isinstance(value, str):
+                value = 1.0 if value == 'success' else 0.0
+            i = self._head
+            self._val[i] = value
+            self._metric_id[i] = metric_id
+            self._head = (i + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
         except Exception as e:
             self.logger.error(f"Erreur de tracking: {str(e)}")
 
+    def _values(self, metric: str) -> np.ndarray:
+        """Valeurs conservées pour une métrique (ordre de stockage, pas chronologique)."""
+        metric_id = self._metric_ids.get(metric)
+        if metric_id is None or not self._count:
+            return np.empty(0, dtype=np.float64)
+        stored = slice(0, self._count)
+        return self._val[stored][self._metric_id[stored] == metric_id]
+
     def generate_report(self) -> dict:
+        profits = self._values('profit')
         return {
             'uptime': self._format_uptime(),
             'success_rate': self._calc_success_rate(),
             'avg_latency': self._calc_avg_latency(),
-            'profitability': np.nanmean(self.metrics['profit']) if self.metrics['profit'] else 0
+            'profitability': float(np.nanmean(profits)) if profits.size else 0
         }
 
     def _format_uptime(self) -> str:
-        delta = time.time() - self.start_time
+        delta = time.monotonic() - self.start_time
         hours = int(delta // 3600)
         minutes = int((delta % 3600) // 60)
         return f"{hours}h{minutes}m"
 
     def _calc_success_rate(self) -> float:
-        trades = self.metrics.get('trade', [])
-        if not trades:
+        trades = self._values('trade')
+        if not trades.size:
             return 0.0
-        successes = sum(1 for _,s in trades if s == 'success')
-        return successes / len(trades)
+        return float(trades.sum() / trades.size)
 
     def _calc_avg_latency(self) -> float:
-        latencies = [v for _,v in self.metrics.get('latency', [])]
-        return np.mean(latencies) if latencies else 0
+        latencies = self._values('latency')
+        return float(latencies.mean()) if latencies.size else 0
 
     def log_metrics(self):
         report = self.generate_report()
-        self.logger.info(f"Rapport performance: {report}")
\ No newline at end of file
+        self.logger.info(f"Rapport performance: {report}")
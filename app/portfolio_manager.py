@@ -1,81 +1,281 @@
 from app.database import EnhancedDatabase
+from app.async_database import AsyncDatabasePool
 from app.config import get_config
 from app.market.market_data import MarketDataProvider # Import MarketDataProvider
-from typing import List, Dict, Optional, Any
+from app.utils.inflight import InFlightRequests
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Deque, List, Dict, Optional, Any, Tuple
+import asyncio
 import logging
 import time # For timestamping
 import json
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 class PortfolioManager:
-    def __init__(self, market_data_provider: MarketDataProvider, db_path: Optional[str] = None):
-        """Manages the portfolio, including cash, positions, and overall value."""
-        self.db = EnhancedDatabase(db_path)
+    # Write-behind des trades : flush périodique ou dès que le lot atteint cette taille
+    TRADE_FLUSH_INTERVAL_SECONDS = 1.0
+    TRADE_FLUSH_BATCH_SIZE = 100
+    # Recalage des compteurs de trades ouverts sur la base (COUNT/SUM SQL)
+    ACTIVE_TRADES_RECONCILE_SECONDS = 300.0
+    # Fenêtre du PnL réalisé transmis à l'AIAgent
+    REALIZED_PNL_WINDOW_SECONDS = 86400.0
+
+    def __init__(self, market_data_provider: MarketDataProvider, db_path: Optional[str] = None,
+                 db: Optional[EnhancedDatabase] = None):
+        """Manages the portfolio, including cash, positions, and overall value.
+
+        `db` lets the caller inject an already opened EnhancedDatabase; otherwise the
+        shared instance for `db_path` is used.
+        """
+        self.db = db or EnhancedDatabase.get_shared(db_path)
+        # Optional async pool (see attach_async_db): per-cycle reads and batched inserts then
+        # no longer block the event loop. self.db remains used for the synchronous paths.
+        self.async_db: Optional[AsyncDatabasePool] = None
         self.market_data_provider = market_data_provider
         self.base_currency = get_config().trading.base_asset # e.g., USDC mint address
         # Initialize cash balance from DB or config, for now, from config.
         # A more robust approach would load last known cash balance from DB.
-        self._current_cash_balance_usd = get_config().INITIAL_PORTFOLIO_BALANCE_USD
+        self._current_cash_balance_usd = get_config().trading.initial_portfolio_balance_usd
+        # Cash set aside by BUY orders in flight (see reserve_cash), not yet debited by record_executed_trade
+        self._reserved_cash_usd = 0.0
+        # Open trade count and running total (USD at cost), seeded once from the DB and then
+        # maintained on trade open/close instead of re-aggregating active trades every cycle.
+        # reconcile_active_trade_stats() realigns them on the DB every ACTIVE_TRADES_RECONCILE_SECONDS.
+        self._active_trade_count, self._active_exposure_usd = self.db.get_active_trade_stats()
+        self._active_stats_reconciled_at = time.monotonic()
+        # Trades executed but not yet written to the DB (see start_trade_writer)
+        self._pending_trades: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Active trades list: only loaded when someone asks for it, dropped at each cycle and on trade open/close.
+        self._active_trades_cache: Optional[List[Dict[str, Any]]] = None
+        self._active_trades_cache_ts: float = 0.0
+        # Positions snapshot load per limit, shared by the pairs of a cycle and dropped like the list cache
+        self._positions_snapshot = InFlightRequests(keep_results=True)
+        # Realized PnL of the trades closed in the last REALIZED_PNL_WINDOW_SECONDS: (time.monotonic(), pnl)
+        # in closing order, and their running sum, maintained on close and expiry instead of rescanning trades
+        self._realized_pnl_events: Deque[Tuple[float, float]] = deque()
+        self._realized_pnl_window_sum = 0.0
         logger.info(f"PortfolioManager initialized. Initial cash: ${self._current_cash_balance_usd:.2f} USD")
 
-    def get_available_cash_for_trading(self) -> float:
-        """Returns the currently available cash balance in USD."""
-        # This could be more complex, e.g., accounting for unsettled trades or margin.
-        # For now, it's the main cash balance.
-        return self._current_cash_balance_usd
-
-    async def get_total_portfolio_value(self) -> float:
-        """Calculates the total current value of the portfolio (cash + value of open positions)."""
-        total_value = self._current_cash_balance_usd
-        open_positions = self.db.get_active_trades() # Assuming this returns a list of position-like dicts
-        
-        # TODO: Implement a proper position tracking mechanism instead of just active trades.
-        # Active trades might not represent the full picture of all assets held.
-        # For now, let's assume get_active_trades gives us enough info to value positions.
-
-        for position in open_positions:
+    def attach_async_db(self, async_db: AsyncDatabasePool) -> None:
+        self.async_db = async_db
+
+    def start_trade_writer(self) -> None:
+        """Starts the background task that batches trade inserts (must be called from a running loop).
+
+        Until it is started, record_executed_trade writes each trade synchronously.
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop_trade_writer(self) -> None:
+        """Stops the background writer and flushes the remaining trades."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
             try:
-                # Position dict needs: 'output_token_mint', 'amount_tokens_out' (or similar for asset held)
-                # Let's assume a simplified structure for now, needs alignment with DB schema
-                token_mint = position.get('output_token_mint') # The asset we hold
-                amount_tokens = position.get('amount_tokens_out') # The amount of that asset we hold
-                
-                if not token_mint or amount_tokens is None:
-                    logger.warning(f"Skipping position due to missing mint or amount: {position}")
-                    continue
-
-                # Skip if the held asset is the base currency (cash already accounted for)
-                if token_mint == self.base_currency:
-                    continue
-
-                # Fetch current price of the asset vs. base currency (USD)
-                price_response = await self.market_data_provider.get_token_price(token_mint, self.base_currency)
-                
-                if price_response['success'] and price_response['data']:
-                    current_price_usd = price_response['data']['price']
-                    position_value_usd = amount_tokens * current_price_usd
-                    total_value += position_value_usd
-                    logger.debug(f"Valued position: {amount_tokens} of {token_mint} at ${current_price_usd:.4f} = ${position_value_usd:.2f}")
-                else:
-                    entry_price = position.get('entry_price') # Or avg_buy_price if available
-                    if entry_price and amount_tokens:
-                         # Fallback: use entry price if current price unavailable, but log warning
-                        logger.warning(f"Could not fetch current price for {token_mint}. Using entry price ${entry_price:.4f} for valuation. Error: {price_response.get('error')}")
-                        total_value += amount_tokens * entry_price
-                    else:
-                        logger.error(f"Could not value position for {token_mint} due to missing price and entry_price/amount. Position: {position}")
-            except Exception as e:
-                logger.error(f"Error valuing position {position.get('pair', 'N/A')}: {e}", exc_info=True)
-        
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_pending_trades_async()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.TRADE_FLUSH_INTERVAL_SECONDS)
+            await self.flush_pending_trades_async()
+
+    def flush_pending_trades(self) -> int:
+        """Writes all pending trades in one transaction. Returns the number of rows inserted.
+
+        On a DB error the batch is put back in front of the queue for the next flush.
+        """
+        if not self._pending_trades:
+            return 0
+        batch, self._pending_trades = self._pending_trades, []
+        inserted = self.db.record_trades_bulk(batch)
+        if inserted is None:
+            logger.error(f"Failed to flush {len(batch)} pending trade(s) to DB. Will retry on next flush.")
+            self._pending_trades[:0] = batch
+            return 0
+        logger.debug(f"Flushed {inserted} trade(s) to DB.")
+        return inserted
+
+    async def flush_pending_trades_async(self) -> int:
+        """Same as flush_pending_trades, through the async pool when one is attached."""
+        if self.async_db is None:
+            return self.flush_pending_trades()
+        if not self._pending_trades:
+            return 0
+        batch, self._pending_trades = self._pending_trades, []
+        inserted = await self.async_db.record_trades_bulk(batch)
+        if inserted is None:
+            logger.error(f"Failed to flush {len(batch)} pending trade(s) to DB. Will retry on next flush.")
+            self._pending_trades[:0] = batch
+            return 0
+        logger.debug(f"Flushed {inserted} trade(s) to DB.")
+        return inserted
+
+    async def refresh_active_trades(self) -> List[Dict[str, Any]]:
+        """Reloads the active trades from the DB. Called once at the start of each bot cycle."""
+        await self.flush_pending_trades_async() # Positions are read from the DB
+        if self.async_db is not None:
+            self._active_trades_cache = await self.async_db.get_active_trades()
+        else:
+            self._active_trades_cache = self.db.get_active_trades()
+        self._active_trades_cache_ts = time.time()
+        return self._active_trades_cache
+
+    async def get_active_trades(self) -> List[Dict[str, Any]]:
+        """Active trades from the per-cycle cache, reloaded only if it was invalidated."""
+        if self._active_trades_cache is None:
+            return await self.refresh_active_trades()
+        return self._active_trades_cache
+
+    async def iter_active_trades(self) -> AsyncIterator[Dict[str, Any]]:
+        """Active trades one by one: from the cache if loaded, else streamed from the DB cursor."""
+        if self._active_trades_cache is not None:
+            for trade in self._active_trades_cache:
+                yield trade
+            return
+        await self.flush_pending_trades_async()
+        if self.async_db is not None:
+            async for trade in self.async_db.iter_active_trades():
+                yield trade
+        else:
+            for trade in self.db.iter_active_trades():
+                yield trade
+
+    async def refresh_active_trade_stats(self) -> Tuple[int, float]:
+        """Start-of-cycle refresh: drops the list cache and returns the in-memory (open trade count, USD amount).
+
+        The DB is only read when a reconciliation is due.
+        """
+        self._invalidate_active_trades()
+        if time.monotonic() - self._active_stats_reconciled_at >= self.ACTIVE_TRADES_RECONCILE_SECONDS:
+            await self.reconcile_active_trade_stats()
+        return self._active_trade_count, self._active_exposure_usd
+
+    async def get_active_trade_stats(self) -> Tuple[int, float]:
+        return self._active_trade_count, self._active_exposure_usd
+
+    async def reconcile_active_trade_stats(self) -> Tuple[int, float]:
+        """Realigns the open trade counters on the DB (SQL COUNT/SUM), e.g. after trades closed elsewhere."""
+        await self.flush_pending_trades_async()
+        if self.async_db is not None:
+            count, exposure = await self.async_db.get_active_trade_stats()
+        else:
+            count, exposure = self.db.get_active_trade_stats()
+        if count != self._active_trade_count or abs(exposure - self._active_exposure_usd) > 0.01:
+            logger.info(
+                f"Active trades reconciled with DB: {self._active_trade_count} -> {count} trade(s), "
+                f"exposure ${self._active_exposure_usd:.2f} -> ${exposure:.2f}"
+            )
+        self._active_trade_count, self._active_exposure_usd = count, exposure
+        self._active_stats_reconciled_at = time.monotonic()
+        return count, exposure
+
+    def _invalidate_active_trades(self) -> None:
+        self._active_trades_cache = None
+        self._positions_snapshot.clear()
+
+    async def get_positions_snapshot(self, limit: int) -> Tuple[int, List[Dict[str, Any]], float]:
+        """(open trade count, up to `limit` active trades, realized PnL of the last 24h), read together.
+
+        The trades are read once per cycle (one DB cursor) and shared by concurrent callers until the
+        next refresh_active_trade_stats() or trade open/close; count and PnL are in-memory.
+        """
+        # A failed load is not kept: the next caller retries
+        count, trades = await self._positions_snapshot.run(limit, lambda: self._load_positions(limit))
+        return count, trades, await self.get_realized_pnl_last_24h()
+
+    async def _load_positions(self, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        count = self._active_trade_count
+        trades: List[Dict[str, Any]] = []
+        if count: # Rows are only streamed (up to `limit`) if any trade is open
+            async with aclosing(self.iter_active_trades()) as active_trades:
+                async for trade in active_trades:
+                    trades.append(trade)
+                    if len(trades) >= limit:
+                        break
+        return count, trades
+
+    def get_available_cash_for_trading(self) -> float:
+        """Returns the cash balance in USD not already reserved by a BUY in flight."""
+        return self._current_cash_balance_usd - self._reserved_cash_usd
+
+    def reserve_cash(self, amount_usd: float) -> bool:
+        """Sets cash aside for a BUY about to be executed; False if not enough is available.
+
+        Check and reservation happen without an await in between, so concurrent executions
+        cannot spend the same cash twice. The caller releases it with release_cash right before
+        record_executed_trade debits the actual amount, or when the order is abandoned.
+        """
+        if amount_usd > self.get_available_cash_for_trading():
+            return False
+        self._reserved_cash_usd += amount_usd
+        return True
+
+    def release_cash(self, amount_usd: float) -> None:
+        self._reserved_cash_usd = max(0.0, self._reserved_cash_usd - amount_usd)
+
+    async def get_total_portfolio_value(self, mark_to_market: bool = False) -> float:
+        """Calculates the total current value of the portfolio (cash + value of open positions).
+
+        By default, open positions are valued at cost from the cached `_active_exposure_usd`
+        aggregate, which avoids re-reading every active trade on each cycle.
+        With `mark_to_market=True`, one price is fetched per distinct token (concurrently)
+        and the unrealized delta vs. entry price is added.
+        """
+        total_value = self._current_cash_balance_usd + self._active_exposure_usd
+        if mark_to_market:
+            total_value += await self._get_mark_to_market_delta()
         logger.info(f"Total portfolio value calculated: ${total_value:.2f}")
         return total_value
 
-    def get_open_positions_summary(self) -> List[Dict[str, Any]]:
+    async def _get_mark_to_market_delta(self) -> float:
+        """Unrealized P&L of open positions, with a single price fetch per distinct mint."""
+        mint_index: Dict[str, int] = {}
+        position_mint_idx: List[int] = []
+        amounts: List[float] = []
+        entry_prices: List[float] = []
+        for position in await self.get_active_trades():
+            # Position dict needs: 'output_token_mint', 'amount_tokens_out' (or similar for asset held)
+            token_mint = position.get('output_token_mint')
+            if not token_mint or token_mint == self.base_currency or position.get('amount_tokens_out') is None:
+                continue
+            position_mint_idx.append(mint_index.setdefault(token_mint, len(mint_index)))
+            amounts.append(position['amount_tokens_out'])
+            entry_prices.append(position.get('entry_price') or 0.0)
+
+        if not mint_index:
+            return 0.0
+
+        mints = list(mint_index)
+        price_responses = await asyncio.gather(
+            *(self.market_data_provider.get_token_price(mint, self.base_currency) for mint in mints),
+            return_exceptions=True
+        )
+
+        # Current price per mint (NaN if unavailable), then the delta of all positions in one vector operation
+        current_prices = np.full(len(mints), np.nan)
+        for i, (mint, price_response) in enumerate(zip(mints, price_responses)):
+            if isinstance(price_response, Exception) or not price_response.get('success') or not price_response.get('data'):
+                error = price_response if isinstance(price_response, Exception) else price_response.get('error')
+                logger.warning(f"Could not fetch current price for {mint}. Keeping positions at entry price. Error: {error}")
+                continue
+            current_prices[i] = price_response['data']['price']
+        position_prices = current_prices[np.asarray(position_mint_idx, dtype=np.intp)]
+        deltas = np.asarray(amounts, dtype=np.float64) * (position_prices - np.asarray(entry_prices, dtype=np.float64))
+        return float(np.nansum(deltas))
+
+    async def get_open_positions_summary(self) -> List[Dict[str, Any]]:
         """Returns a summary of all currently open positions/active trades."""
         # This should ideally fetch consolidated positions, not just individual trades that are active.
         # For now, uses get_active_trades() as a proxy.
-        active_trades = self.db.get_active_trades()
+        active_trades = await self.get_active_trades()
         summary = []
         for trade in active_trades:
             # Assuming trade dictionary from DB has relevant fields
@@ -114,7 +314,11 @@ class PortfolioManager:
         last_valid_block_height: Optional[int] = None,
         reason_source: Optional[str] = "UNKNOWN" # e.g., AI_AGENT, MANUAL, STRATEGY_X
     ) -> bool:
-        """Records an executed trade in the database and updates cash balance."""
+        """Records an executed trade and updates cash balance / exposure.
+
+        Once start_trade_writer() is running, the DB insert is deferred to the next batched
+        flush (write-behind); otherwise the trade is written immediately.
+        """
         try:
             # Database recording
             db_trade_data = {
@@ -138,8 +342,14 @@ class PortfolioManager:
                 'timestamp': time.time(), # Record execution timestamp here
                 'reason_source': reason_source,
             }
-            self.db.record_trade(db_trade_data)
-            logger.info(f"Trade {trade_id} recorded in DB. Signature: {transaction_signature}")
+            self._pending_trades.append(db_trade_data)
+            self._invalidate_active_trades()
+            if side == "BUY": # Only open BUY rows count as positions (see ACTIVE_TRADE_STATS_SQL)
+                self._active_trade_count += 1
+                self._active_exposure_usd += amount_in_usd
+            if self._flush_task is None or len(self._pending_trades) >= self.TRADE_FLUSH_BATCH_SIZE:
+                self.flush_pending_trades()
+            logger.info(f"Trade {trade_id} recorded. Signature: {transaction_signature}")
 
             # Update cash balance
             # If we spent base currency (USDC) to buy another token
@@ -147,9 +357,14 @@ class PortfolioManager:
                 self._current_cash_balance_usd -= (amount_in_usd + (fee_usd or 0.0))
                 logger.info(f"BUY trade. Cash reduced by ${amount_in_usd + (fee_usd or 0.0):.2f}. New cash: ${self._current_cash_balance_usd:.2f}")
             # If we sold a token for base currency (USDC)
+            # The sold tokens close (or reduce) the open BUY rows of the pair: their cost leaves the exposure
             elif side == "SELL" and output_token_mint == self.base_currency:
-                self._current_cash_balance_usd += (amount_out_tokens - (fee_usd or 0.0)) # amount_out_tokens is USDC amount received
-                logger.info(f"SELL trade. Cash increased by ${amount_out_tokens - (fee_usd or 0.0):.2f}. New cash: ${self._current_cash_balance_usd:.2f}")
+                self.flush_pending_trades() # The BUY rows being sold must be in the DB
+                rows_closed, cost_released = self.db.release_open_position(pair_address, amount_in_tokens)
+                # amount_out_tokens is the USDC amount received
+                self._release_position(rows_closed, cost_released, amount_out_tokens - (fee_usd or 0.0))
+                logger.info(f"SELL trade. Cash increased by ${amount_out_tokens - (fee_usd or 0.0):.2f}, exposure released: "
+                            f"${cost_released:.2f}. New cash: ${self._current_cash_balance_usd:.2f}")
             # TODO: Handle trades between non-base currencies if portfolio holds multiple crypto assets.
             # For now, assumes trades are always into or out of the base_currency (USD/USDC).
 
@@ -162,6 +377,50 @@ class PortfolioManager:
             # Potentially raise a custom PortfolioManagerError
             return False
 
+    def close_trade(self, trade_id: int, exit_amount_usd: float) -> bool:
+        """Closes an open trade: marks it closed in DB, releases its exposure and credits cash."""
+        self.flush_pending_trades()
+        entry_amount_usd = self.db.close_trade(trade_id)
+        if entry_amount_usd is None:
+            logger.warning(f"close_trade: no open trade found with id {trade_id}.")
+            return False
+        self._release_position(1, entry_amount_usd, exit_amount_usd)
+        logger.info(
+            f"Trade {trade_id} closed. Exposure released: ${entry_amount_usd:.2f}, "
+            f"cash credited: ${exit_amount_usd:.2f}. New cash: ${self._current_cash_balance_usd:.2f}"
+        )
+        return True
+
+    def _release_position(self, rows_closed: int, cost_released_usd: float, proceeds_usd: float) -> None:
+        """Removes sold positions from the open trade counters and credits the proceeds.
+
+        The realized PnL is the proceeds minus the released cost, so the portfolio value only moves by that PnL.
+        """
+        self._invalidate_active_trades()
+        self._active_trade_count = max(0, self._active_trade_count - rows_closed)
+        self._active_exposure_usd = max(0.0, self._active_exposure_usd - cost_released_usd)
+        self._current_cash_balance_usd += proceeds_usd
+        if cost_released_usd > 0:
+            realized_pnl = proceeds_usd - cost_released_usd
+            self._realized_pnl_events.append((time.monotonic(), realized_pnl))
+            self._realized_pnl_window_sum += realized_pnl
+
+    async def get_realized_pnl_last_24h(self) -> float:
+        """Realized PnL (USD) of the trades closed by this instance in the last REALIZED_PNL_WINDOW_SECONDS.
+
+        Amortized O(1): expired closes are dropped from the running sum, no trade is re-read.
+        """
+        self._expire_realized_pnl(time.monotonic())
+        return self._realized_pnl_window_sum
+
+    def _expire_realized_pnl(self, now: float) -> None:
+        cutoff = now - self.REALIZED_PNL_WINDOW_SECONDS
+        events = self._realized_pnl_events
+        while events and events[0][0] < cutoff:
+            self._realized_pnl_window_sum -= events.popleft()[1]
+        if not events:
+            self._realized_pnl_window_sum = 0.0 # Restart from zero: no accumulated rounding drift
+
     def get_position(self, token_mint: str) -> Optional[Dict[str, Any]]:
         """Retrieves the consolidated position for a given token mint."""
         # This requires a proper positions table in the DB that aggregates trades.
@@ -171,6 +430,7 @@ class PortfolioManager:
         # Example logic if we had a positions table:
         # return self.db.get_position_by_mint(token_mint)
         # For now, simulate by looking at last BUY trade if any (very naive)
+        self.flush_pending_trades()
         all_trades = self.db.get_trades_for_token(token_mint)
         if all_trades:
             # This is not a real position, just an example of what kind of data might be needed
@@ -1,12 +1,15 @@
 import logging
+import heapq
 import time
 import numpy as np
 import pandas as pd
 import json
 import os
 from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
+from concurrent.futures import Executor
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.neural_network import MLPRegressor
@@ -18,9 +21,9 @@ import joblib
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("prediction_engine")
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PredictionResult:
-    """Classe représentant le résultat d'une prédiction."""
+    """Classe représentant le résultat d'une prédiction (immuable, sans __dict__ par instance)."""
     target_price: float
     confidence: float  # 0-1
     timeframe: str
@@ -29,6 +32,24 @@ class PredictionResult:
     model_name: str
     timestamp: float
 
+# Modèles chargés dans un processus d'inférence : chemin -> (mtime, modèle)
+_WORKER_MODELS: Dict[str, Tuple[float, Any]] = {}
+
+
+def _predict_in_worker(model_path: str, X: np.ndarray) -> np.ndarray:
+    """
+    Exécuté dans un processus du pool d'inférence : le modèle est chargé depuis son fichier
+    joblib au premier appel (puis après chaque réentraînement, détecté par le mtime) au lieu
+    d'être sérialisé à chaque prédiction.
+    """
+    mtime = os.path.getmtime(model_path)
+    cached = _WORKER_MODELS.get(model_path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, joblib.load(model_path))
+        _WORKER_MODELS[model_path] = cached
+    return cached[1].predict(X)
+
+
 class MarketRegimeClassifier:
     """Classe pour identifier le régime de marché actuel."""
     
@@ -129,6 +150,9 @@ class MarketRegimeClassifier:
 class PricePredictor:
     """Classe principale pour les prévisions de prix basées sur l'apprentissage automatique."""
     
+    # Récupérations de données simultanées au plus dans predict_price_batch
+    MAX_CONCURRENT_FETCHES = 8
+    
     def __init__(self, model_dir: str = "models", data_dir: str = "data"):
         """
         Initialise le prédicteur de prix.
@@ -144,6 +168,8 @@ class PricePredictor:
         self.features = {}
         self.market_regime_classifier = MarketRegimeClassifier()
         self.last_training = {}
+        # Pool de processus optionnel pour l'inférence (voir attach_inference_pool)
+        self._inference_pool: Optional[Executor] = None
         
         # Créer les répertoires si nécessaire
         os.makedirs(model_dir, exist_ok=True)
@@ -177,6 +203,18 @@ class PricePredictor:
         except Exception as e:
             logger.error(f"Erreur lors du chargement des modèles: {e}")
 
+    def attach_inference_pool(self, executor: Optional[Executor]) -> None:
+        """Exécute `model.predict` dans `executor` (ProcessPoolExecutor) plutôt que dans la boucle asyncio."""
+        self._inference_pool = executor
+
+    async def _run_model(self, model_name: str, X: np.ndarray) -> np.ndarray:
+        """Inférence hors de la boucle asyncio si un pool est attaché et que le modèle est sur disque."""
+        model_path = os.path.join(self.model_dir, f"{model_name}.joblib")
+        if self._inference_pool is None or not os.path.exists(model_path):
+            return self.models[model_name].predict(X)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._inference_pool, _predict_in_worker, model_path, X)
+
     async def predict_price(self, token_address: str, timeframe: str = "1h") -> PredictionResult:
         """
         Prédit le prix futur d'un token.
@@ -189,60 +227,117 @@ class PricePredictor:
             Résultat de la prédiction
         """
         try:
-            # Identifier le bon modèle pour ce token et cette période
-            model_name = f"{token_address}_{timeframe}_predictor"
-            
-            if (model_name not in self.models) and (f"generic_{timeframe}_predictor" not in self.models):
-                # Si aucun modèle spécifique n'est disponible, utiliser un modèle générique
-                model_name = f"generic_{timeframe}_predictor"
-                if model_name not in self.models:
-                    # Entraîner un nouveau modèle générique
-                    logger.info(f"Aucun modèle disponible pour {token_address} sur {timeframe}, création d'un nouveau modèle...")
-                    await self.train_model(token_address, timeframe)
-            
-            # Obtenir les données récentes pour la prédiction
-            recent_data = await self._get_recent_data(token_address, timeframe)
-            if recent_data.empty:
-                raise ValueError(f"Pas assez de données pour {token_address} sur {timeframe}")
-                
-            # Préparer les caractéristiques pour la prédiction
-            features_df = self._prepare_features(recent_data)
-            
-            # Standardiser les caractéristiques
-            if model_name in self.scalers:
-                X = self.scalers[model_name].transform(features_df)
-            else:
-                X = features_df.values
-                
-            # Faire la prédiction
-            model = self.models[model_name]
-            prediction = model.predict(X)
-            
-            # Calculer la confiance de la prédiction
-            confidence = self._calculate_confidence(model, X, recent_data)
-            
-            # Déterminer la direction
-            current_price = recent_data['close'].iloc[-1]
-            predicted_price = prediction[0]
-            direction = "up" if predicted_price > current_price * 1.01 else "down" if predicted_price < current_price * 0.99 else "sideways"
-            
-            # Déterminer les facteurs de support
-            supporting_factors = self._determine_supporting_factors(model, features_df)
-            
-            return PredictionResult(
-                target_price=float(predicted_price),
-                confidence=float(confidence),
-                timeframe=timeframe,
-                direction=direction,
-                supporting_factors=supporting_factors,
-                model_name=model_name,
-                timestamp=time.time()
-            )
+            model_name = await self._resolve_model_name(token_address, timeframe)
+            features_df, X, recent_data = await self._prediction_inputs(token_address, timeframe, model_name)
+            prediction = await self._run_model(model_name, X)
+            return self._build_prediction_result(model_name, timeframe, float(prediction[0]), features_df, X, recent_data)
             
         except Exception as e:
             logger.error(f"Erreur lors de la prédiction pour {token_address} sur {timeframe}: {e}")
             raise
 
+    async def predict_price_batch(self, token_addresses: List[str], timeframe: str = "1h") -> Dict[str, PredictionResult]:
+        """
+        Prédit le prix de plusieurs tokens : les données sont récupérées en parallèle, puis
+        un seul appel `model.predict` est fait par modèle sur les lignes de caractéristiques empilées.
+        
+        Args:
+            token_addresses: Adresses des tokens
+            timeframe: Intervalle de temps (1m, 5m, 15m, 1h, 4h, 1d)
+            
+        Returns:
+            Dictionnaire adresse -> résultat ; les tokens en échec sont journalisés et absents du résultat
+        """
+        # Résolution séquentielle : un modèle générique manquant n'est entraîné qu'une fois
+        model_names = {}
+        for token_address in token_addresses:
+            try:
+                model_names[token_address] = await self._resolve_model_name(token_address, timeframe)
+            except Exception as e:
+                logger.error(f"Erreur lors de la prédiction pour {token_address} sur {timeframe}: {e}")
+
+        addresses = list(model_names)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+
+        async def bounded_inputs(addr: str):
+            async with semaphore:
+                return await self._prediction_inputs(addr, timeframe, model_names[addr])
+
+        inputs = await asyncio.gather(*(bounded_inputs(addr) for addr in addresses), return_exceptions=True)
+
+        by_model: Dict[str, List[Tuple[str, pd.DataFrame, np.ndarray, pd.DataFrame]]] = {}
+        for addr, item in zip(addresses, inputs):
+            if isinstance(item, Exception):
+                logger.error(f"Erreur lors de la prédiction pour {addr} sur {timeframe}: {item}")
+                continue
+            by_model.setdefault(model_names[addr], []).append((addr, *item))
+
+        results: Dict[str, PredictionResult] = {}
+        for model_name, items in by_model.items():
+            try:
+                predictions = await self._run_model(model_name, np.vstack([X for _, _, X, _ in items]))
+            except Exception as e:
+                logger.error(f"Erreur lors de la prédiction groupée ({model_name}, {len(items)} tokens): {e}")
+                continue
+            for (addr, features_df, X, recent_data), predicted_price in zip(items, predictions):
+                results[addr] = self._build_prediction_result(model_name, timeframe, float(predicted_price), features_df, X, recent_data)
+        return results
+
+    async def _resolve_model_name(self, token_address: str, timeframe: str) -> str:
+        """Identifie le modèle à utiliser pour ce token et cette période (entraîne un modèle générique si besoin)."""
+        model_name = f"{token_address}_{timeframe}_predictor"
+        
+        if (model_name not in self.models) and (f"generic_{timeframe}_predictor" not in self.models):
+            # Si aucun modèle spécifique n'est disponible, utiliser un modèle générique
+            model_name = f"generic_{timeframe}_predictor"
+            if model_name not in self.models:
+                # Entraîner un nouveau modèle générique
+                logger.info(f"Aucun modèle disponible pour {token_address} sur {timeframe}, création d'un nouveau modèle...")
+                await self.train_model(token_address, timeframe)
+        return model_name
+
+    async def _prediction_inputs(self, token_address: str, timeframe: str,
+                                 model_name: str) -> Tuple[pd.DataFrame, np.ndarray, pd.DataFrame]:
+        """Retourne (features_df, X standardisé d'une ligne, données récentes) pour un token."""
+        # Obtenir les données récentes pour la prédiction
+        recent_data = await self._get_recent_data(token_address, timeframe)
+        if recent_data.empty:
+            raise ValueError(f"Pas assez de données pour {token_address} sur {timeframe}")
+            
+        # Préparer les caractéristiques pour la prédiction
+        features_df = self._prepare_features(recent_data)
+        
+        # Standardiser les caractéristiques
+        if model_name in self.scalers:
+            X = self.scalers[model_name].transform(features_df)
+        else:
+            X = features_df.values
+        return features_df, X, recent_data
+
+    def _build_prediction_result(self, model_name: str, timeframe: str, predicted_price: float,
+                                 features_df: pd.DataFrame, X: np.ndarray, recent_data: pd.DataFrame) -> PredictionResult:
+        model = self.models[model_name]
+        
+        # Calculer la confiance de la prédiction
+        confidence = self._calculate_confidence(model, X, recent_data)
+        
+        # Déterminer la direction
+        current_price = recent_data['close'].iloc[-1]
+        direction = "up" if predicted_price > current_price * 1.01 else "down" if predicted_price < current_price * 0.99 else "sideways"
+        
+        # Déterminer les facteurs de support
+        supporting_factors = self._determine_supporting_factors(model, features_df)
+        
+        return PredictionResult(
+            target_price=predicted_price,
+            confidence=float(confidence),
+            timeframe=timeframe,
+            direction=direction,
+            supporting_factors=supporting_factors,
+            model_name=model_name,
+            timestamp=time.time()
+        )
+
     async def train_model(self, token_address: str, timeframe: str) -> bool:
         """
         Entraîne ou met à jour un modèle de prédiction.
@@ -597,7 +692,7 @@ class PricePredictor:
             feature_importances = dict(zip(feature_names, importances))
             
             # Ne garder que les caractéristiques les plus importantes
-            top_features = dict(sorted(feature_importances.items(), key=lambda x: x[1], reverse=True)[:5])
+            top_features = dict(heapq.nlargest(5, feature_importances.items(), key=lambda x: x[1]))
             
             # Normaliser pour que la somme soit 1
             total = sum(top_features.values())
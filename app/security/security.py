@@ -7,6 +7,7 @@ from typing import Dict, Any, List, Optional, Set, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import aiohttp
 import sqlite3
+from cachetools import TTLCache
 from dataclasses import dataclass
 from app.config import get_config
 from app.services.market_data_cache import MarketDataCache
@@ -28,10 +29,17 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 class Security:
     """Handles API authentication (JWT) and password management."""
 
+    VERIFIED_TOKEN_CACHE_SIZE = 4096
+    VERIFIED_TOKEN_CACHE_TTL_SECONDS = 300
+
     def __init__(self):
         self.secret_key = get_config().security.jwt_secret_key
         self.algorithm = "HS256" # Standard algorithm for JWT
         self.expiration_seconds = get_config().security.jwt_expiration
+        # Jetons déjà validés -> (résultat, exp) : un client renvoie le même jeton à chaque
+        # requête, inutile de refaire le décodage et la vérification de signature à chaque fois
+        self._verified_tokens: TTLCache = TTLCache(maxsize=self.VERIFIED_TOKEN_CACHE_SIZE,
+                                                   ttl=self.VERIFIED_TOKEN_CACHE_TTL_SECONDS)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verifies a plain password against a hashed one."""
@@ -57,11 +65,19 @@ class Security:
         """Verifies a JWT token. Corresponds to task 1.6 requirement for API auth.
         Returns (is_valid, message_or_userid).
         """
+        cached = self._verified_tokens.get(token)
+        if cached is not None:
+            user_id, expires_at = cached
+            if expires_at is None or time.time() < expires_at: # Un jeton en cache n'est jamais servi après son exp
+                return True, user_id
+            self._verified_tokens.pop(token, None)
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             # For now, just confirming token is valid and not expired.
             # logger.info(f"Token valid for user_id: {payload.get('user_id')}")
-            return True, payload.get("user_id", "Token valid") # Or return payload itself if needed
+            user_id = payload.get("user_id", "Token valid") # Or return payload itself if needed
+            self._verified_tokens[token] = (user_id, payload.get("exp")) # Seuls les jetons valides sont mis en cache
+            return True, user_id
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
             return False, "Token has expired"
@@ -83,25 +99,43 @@ class SecurityRisk:
 class SecurityChecker:
     """Classe pour vérifier la sécurité des tokens et des transactions."""
     
-    def __init__(self, db_path: str, market_data_cache: Optional[MarketDataCache] = None):
+    def __init__(self, db_path: str, market_data_cache: Optional[MarketDataCache] = None,
+                 database: Optional[Any] = None, result_cache_size: int = 10_000,
+                 result_cache_ttl: int = 3600):
         """
         Initialise le vérificateur de sécurité.
         
         Args:
             db_path: Chemin vers la base de données SQLite
             market_data_cache: Cache de données de marché indépendant (optionnel)
+            database: EnhancedDatabase partagée (optionnel) ; sa connexion est réutilisée
+                au lieu d'en ouvrir une nouvelle
+            result_cache_size: Nombre max de résultats de check_token_security en cache
+            result_cache_ttl: Durée de validité (s) d'un résultat en cache
         """
         self.db_path = db_path
         self.market_data = market_data_cache  # Utilise MarketDataCache au lieu de MarketDataCache
+        self._shared_database = database
         self.conn = self._initialize_database()
         self.blacklist = self._load_blacklist()
+        self._blacklist_loaded_at = time.monotonic()
+        self._blacklist_refresh_seconds = get_config().database.blacklist_refresh_seconds
         self.suspicious_patterns = self._load_suspicious_patterns()
         self.request_timestamps: Dict[str, List[float]] = {}  # Pour la protection contre les taux limites
+        # Résultats de check_token_security par adresse : les propriétés de sécurité
+        # d'un token changent rarement, inutile de tout revérifier à chaque cycle.
+        self.security_result_cache: TTLCache = TTLCache(maxsize=result_cache_size, ttl=result_cache_ttl)
+        # Un verrou par token en cours de vérification : les appels concurrents pour le même
+        # token attendent le premier résultat au lieu de relancer toutes les requêtes.
+        self._security_check_locks: Dict[str, asyncio.Lock] = {}
         
     def _initialize_database(self) -> sqlite3.Connection:
         """Initialise la connexion à la base de données et crée les tables si nécessaire."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            if self._shared_database is not None and self._shared_database.conn is not None:
+                conn = self._shared_database.conn
+            else:
+                conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
             # Créer la table de blacklist si elle n'existe pas
@@ -143,6 +177,14 @@ class SecurityChecker:
             logger.error(f"Erreur lors du chargement de la liste noire: {e}")
             return set()
             
+    def _refresh_blacklist(self) -> None:
+        """Recharge l'instantané de la liste noire ; en cas d'erreur, l'instantané précédent est conservé."""
+        try:
+            self.blacklist = {row[0] for row in self.conn.execute("SELECT address FROM blacklist")}
+        except Exception as e:
+            logger.error(f"Erreur lors du rechargement de la liste noire: {e}")
+        self._blacklist_loaded_at = time.monotonic()
+            
     def _load_suspicious_patterns(self) -> List[Dict[str, Any]]:
         """Charge les modèles suspects pour la détection des arnaques."""
         # Ces modèles pourraientt être chargés d'un fichier de config, ici on les définit en dur
@@ -207,16 +249,49 @@ class SecurityChecker:
             return False
         return bool(SOLANA_ADDRESS_PATTERN.match(address))
     
-    async def check_token_security(self, token_address: str) -> Tuple[bool, List[SecurityRisk]]:
+    async def check_token_security(self, token_address: str, use_cache: bool = True) -> Tuple[bool, List[SecurityRisk]]:
         """
         Vérifie la sécurité d'un token avec plusieurs couches d'analyse.
         
         Args:
             token_address: Adresse du token Solana
+            use_cache: Réutiliser un résultat récent (voir security_result_cache)
             
         Returns:
             Tuple (sécurité_validée, liste_risques)
         """
+        if not use_cache:
+            result = await self._run_security_checks(token_address)
+            self.security_result_cache[token_address] = result
+            return result
+
+        cached = self.security_result_cache.get(token_address)
+        if cached is not None:
+            return cached
+
+        lock = self._security_check_locks.setdefault(token_address, asyncio.Lock())
+        try:
+            async with lock:
+                # Un appel concurrent a pu remplir le cache pendant l'attente du verrou
+                cached = self.security_result_cache.get(token_address)
+                if cached is not None:
+                    return cached
+                result = await self._run_security_checks(token_address)
+                self.security_result_cache[token_address] = result
+                return result
+        finally:
+            if not lock.locked() and self._security_check_locks.get(token_address) is lock:
+                del self._security_check_locks[token_address]
+
+    def invalidate_security_cache(self, token_address: Optional[str] = None) -> None:
+        """Invalide le résultat en cache d'un token, ou tout le cache si aucune adresse n'est donnée."""
+        if token_address is None:
+            self.security_result_cache.clear()
+        else:
+            self.security_result_cache.pop(token_address, None)
+
+    async def _run_security_checks(self, token_address: str) -> Tuple[bool, List[SecurityRisk]]:
+        """Exécute réellement toutes les vérifications (sans cache)."""
         # Valider le format de l'adresse
         if not self.validate_solana_address(token_address):
             return False, [SecurityRisk(
@@ -226,7 +301,10 @@ class SecurityChecker:
                 metadata={"address": token_address}
             )]
             
-        # Vérifier si le token est sur la liste noire
+        # Vérifier si le token est sur la liste noire (instantané rechargé périodiquement :
+        # les ajouts faits par d'autres composants ou processus finissent par être vus)
+        if time.monotonic() - self._blacklist_loaded_at >= self._blacklist_refresh_seconds:
+            self._refresh_blacklist()
         if token_address in self.blacklist:
             return False, [SecurityRisk(
                 risk_type="blacklisted",
@@ -238,37 +316,30 @@ class SecurityChecker:
         # Collecte des risques détectés
         risks = []
         
-        # Exécuter toutes les vérifications de sécurité
-        try:
-            # 1. Vérifier l'âge et l'historique du token
-            age_risks = await self._check_token_age_and_history(token_address)
-            risks.extend(age_risks)
-            
-            # 2. Analyser la distribution des détenteurs
-            holder_risks = await self._analyze_holder_distribution(token_address)
-            risks.extend(holder_risks)
-            
-            # 3. Vérifier les métriques on-chain
-            metrics_risks = await self._get_onchain_metrics(token_address)
-            risks.extend(metrics_risks)
-            
-            # 4. Détection avancée de modèles de rug pull
-            rugpull_risks = await self._detect_rugpull_patterns(token_address)
-            risks.extend(rugpull_risks)
-            
-            # 5. Analyse de la profondeur de liquidité
-            liquidity_risks = await self._analyze_liquidity_depth(token_address)
-            risks.extend(liquidity_risks)
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification de sécurité pour {token_address}: {e}")
-            # Ajouter un risque pour l'échec de vérification
-            risks.append(SecurityRisk(
-                risk_type="verification_failure",
-                severity=5,
-                description=f"Échec de la vérification complète: {str(e)}",
-                metadata={"address": token_address, "error": str(e)}
-            ))
+        # Les cinq analyses sont indépendantes : elles s'exécutent en parallèle (la durée
+        # totale est celle de la plus lente) et l'échec de l'une n'annule pas les autres.
+        analyses = (
+            self._check_token_age_and_history,  # 1. Âge et historique du token
+            self._analyze_holder_distribution,  # 2. Distribution des détenteurs
+            self._get_onchain_metrics,          # 3. Métriques on-chain
+            self._detect_rugpull_patterns,      # 4. Détection avancée de modèles de rug pull
+            self._analyze_liquidity_depth,      # 5. Profondeur de liquidité
+        )
+        results = await asyncio.gather(*(analysis(token_address) for analysis in analyses), return_exceptions=True)
+        for analysis, result in zip(analyses, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                logger.error(f"Erreur lors de la vérification de sécurité ({analysis.__name__}) pour {token_address}: {result}")
+                # Ajouter un risque pour l'échec de vérification
+                risks.append(SecurityRisk(
+                    risk_type="verification_failure",
+                    severity=5,
+                    description=f"Échec de la vérification complète: {str(result)}",
+                    metadata={"address": token_address, "error": str(result), "check": analysis.__name__}
+                ))
+            else:
+                risks.extend(result)
             
         # Déterminer si le token est sûr en fonction des risques
         is_safe = all(risk.severity < 7 for risk in risks)
@@ -404,6 +475,8 @@ class SecurityChecker:
             Liste des risques détectés
         """
         risks = []
+        config = get_config() # Seuils lus une fois par analyse
+
         try:
             holder_response = await self._get_token_holders(token_address)
             
@@ -457,14 +530,14 @@ class SecurityChecker:
                         # Ensure percentage is a float or int before comparison
                         if not isinstance(largest_percentage, (float, int)):
                             logger.warning(f"Largest holder percentage is not a number for {token_address}: {largest_percentage}. Skipping concentration check.")
-                        elif largest_percentage > get_config().HOLDER_CONCENTRATION_THRESHOLD_HIGH: # Use Config value
+                        elif largest_percentage > config.HOLDER_CONCENTRATION_THRESHOLD_HIGH: # Use Config value
                             risks.append(SecurityRisk(
                                 risk_type="high_concentration",
                                 severity=8,
                                 description=f"Un seul détenteur non vérifié possède {largest_percentage*100:.1f}% des tokens",
                                 metadata={"holder_address": largest_holder.get("address"), "percentage": largest_percentage}
                             ))
-                        elif largest_percentage > get_config().HOLDER_CONCENTRATION_THRESHOLD_MEDIUM: # Use Config value
+                        elif largest_percentage > config.HOLDER_CONCENTRATION_THRESHOLD_MEDIUM: # Use Config value
                             risks.append(SecurityRisk(
                                 risk_type="medium_concentration",
                                 severity=5,
@@ -478,11 +551,11 @@ class SecurityChecker:
                 
                 # Calculer le nombre de détenteurs
                 holder_count = len(holders) # Total holders including verified/unverified, valid/invalid entries filtered above might differ
-                if holder_count < get_config().MIN_HOLDERS_COUNT_THRESHOLD: # Use Config value
+                if holder_count < config.MIN_HOLDERS_COUNT_THRESHOLD: # Use Config value
                     risks.append(SecurityRisk(
                         risk_type="few_holders",
                         severity=6,
-                        description=f"Le token n'a que {holder_count} détenteurs (Seuil: {get_config().MIN_HOLDERS_COUNT_THRESHOLD})",
+                        description=f"Le token n'a que {holder_count} détenteurs (Seuil: {config.MIN_HOLDERS_COUNT_THRESHOLD})",
                         metadata={"holder_count": holder_count}
                     ))
             else: # Case where holders list was initially empty
@@ -516,6 +589,8 @@ class SecurityChecker:
             Liste des risques détectés liés aux métriques on-chain.
         """
         risks = []
+        config = get_config()
+
         try:
             if not self.market_data:
                 logger.warning("MarketDataCache non disponible dans SecurityChecker pour _get_onchain_metrics.")
@@ -597,19 +672,19 @@ class SecurityChecker:
 
                     logger.info(f"Liquidité pour {token_address} (métriques on-chain): ${usd_liquidity:.2f} USD")
 
-                    if usd_liquidity < get_config().MIN_LIQUIDITY_THRESHOLD_ERROR:
+                    if usd_liquidity < config.MIN_LIQUIDITY_THRESHOLD_ERROR:
                         risks.append(SecurityRisk(
                             risk_type="critically_low_liquidity_metrics",
                             severity=9,
-                            description=f"Liquidité critique (métriques): ${usd_liquidity:.2f} USD (Seuil: ${get_config().MIN_LIQUIDITY_THRESHOLD_ERROR}).",
-                            metadata={"liquidity_usd": usd_liquidity, "threshold": get_config().MIN_LIQUIDITY_THRESHOLD_ERROR}
+                            description=f"Liquidité critique (métriques): ${usd_liquidity:.2f} USD (Seuil: ${config.MIN_LIQUIDITY_THRESHOLD_ERROR}).",
+                            metadata={"liquidity_usd": usd_liquidity, "threshold": config.MIN_LIQUIDITY_THRESHOLD_ERROR}
                         ))
-                    elif usd_liquidity < get_config().MIN_LIQUIDITY_THRESHOLD_WARNING:
+                    elif usd_liquidity < config.MIN_LIQUIDITY_THRESHOLD_WARNING:
                         risks.append(SecurityRisk(
                             risk_type="low_liquidity_warning_metrics",
                             severity=6,
-                            description=f"Faible liquidité (métriques): ${usd_liquidity:.2f} USD (Seuil avertissement: ${get_config().MIN_LIQUIDITY_THRESHOLD_WARNING}).",
-                            metadata={"liquidity_usd": usd_liquidity, "threshold": get_config().MIN_LIQUIDITY_THRESHOLD_WARNING}
+                            description=f"Faible liquidité (métriques): ${usd_liquidity:.2f} USD (Seuil avertissement: ${config.MIN_LIQUIDITY_THRESHOLD_WARNING}).",
+                            metadata={"liquidity_usd": usd_liquidity, "threshold": config.MIN_LIQUIDITY_THRESHOLD_WARNING}
                         ))
                     
                     # TODO: Further liquidity depth analysis if data is available and structured for it.
@@ -647,6 +722,8 @@ class SecurityChecker:
             Liste des risques détectés
         """
         risks = []
+        config = get_config()
+
         price_history_data: Optional[List[Dict[str, Any]]] = None
         transaction_history_data: Optional[List[Dict[str, Any]]] = None
         liquidity_history_data: Optional[List[Dict[str, Any]]] = None
@@ -665,7 +742,7 @@ class SecurityChecker:
                 
             # 1. Obtenir l'historique des prix
             # get_historical_prices from MDP already returns structured response
-            price_response = await self.market_data.get_historical_prices(token_address, timeframe=get_config().RUGPULL_PRICE_TIMEFRAME, limit=get_config().RUGPULL_PRICE_LIMIT)
+            price_response = await self.market_data.get_historical_prices(token_address, timeframe=config.RUGPULL_PRICE_TIMEFRAME, limit=config.RUGPULL_PRICE_LIMIT)
             if price_response['success'] and price_response['data'] is not None:
                 price_history_data = price_response['data']
             else:
@@ -679,7 +756,7 @@ class SecurityChecker:
                 ))
 
             # 2. Obtenir les transactions récentes
-            transaction_response = await self._get_recent_transactions(token_address, limit=get_config().RUGPULL_TRANSACTION_LIMIT)
+            transaction_response = await self._get_recent_transactions(token_address, limit=config.RUGPULL_TRANSACTION_LIMIT)
             if transaction_response['success'] and transaction_response['data'] is not None:
                 transaction_history_data = transaction_response['data']
             else:
@@ -693,7 +770,7 @@ class SecurityChecker:
                 ))
 
             # 3. Obtenir l'historique de liquidité
-            liquidity_hist_response = await self._get_liquidity_history(token_address, timeframe=get_config().RUGPULL_LIQUIDITY_TIMEFRAME, limit=get_config().RUGPULL_LIQUIDITY_LIMIT)
+            liquidity_hist_response = await self._get_liquidity_history(token_address, timeframe=config.RUGPULL_LIQUIDITY_TIMEFRAME, limit=config.RUGPULL_LIQUIDITY_LIMIT)
             if liquidity_hist_response['success'] and liquidity_hist_response['data'] is not None:
                 liquidity_history_data = liquidity_hist_response['data']
             else:
@@ -707,7 +784,7 @@ class SecurityChecker:
                 ))
             
             # 4. Obtenir les détenteurs de tokens (pour l'analyse du comportement des gros portefeuilles)
-            # Note: get_config().SECURITY_MAX_HOLDERS_TO_FETCH est utilisé par _get_token_holders
+            # Note: config.SECURITY_MAX_HOLDERS_TO_FETCH est utilisé par _get_token_holders
             # Cela peut être un appel coûteux, à utiliser judicieusement.
             token_holders_response = await self._get_token_holders(token_address) # _get_token_holders gère sa propre limite via Config
             token_holders_data: Optional[Dict[str, Any]] = None
@@ -744,12 +821,12 @@ class SecurityChecker:
                 
                 if price_changes:
                     max_drop = min(price_changes) # min will find the largest negative change
-                    if max_drop < get_config().RUGPULL_PRICE_DROP_THRESHOLD:  # e.g., -0.5 for 50% drop
+                    if max_drop < config.RUGPULL_PRICE_DROP_THRESHOLD:  # e.g., -0.5 for 50% drop
                         risks.append(SecurityRisk(
                             risk_type="significant_price_drop", # More specific
                             severity=8,
-                            description=f"Chute de prix brutale détectée: {max_drop*100:.1f}% en {get_config().RUGPULL_PRICE_TIMEFRAME} intervalle.",
-                            metadata={"max_drop_percentage": max_drop, "timeframe": get_config().RUGPULL_PRICE_TIMEFRAME}
+                            description=f"Chute de prix brutale détectée: {max_drop*100:.1f}% en {config.RUGPULL_PRICE_TIMEFRAME} intervalle.",
+                            metadata={"max_drop_percentage": max_drop, "timeframe": config.RUGPULL_PRICE_TIMEFRAME}
                         ))
             elif not price_history_data and not data_fetch_errors: # Data fetch was successful but list is empty/too short
                  logger.info(f"Historique des prix pour {token_address} est vide ou insuffisant pour l'analyse de chute de prix.")
@@ -778,12 +855,12 @@ class SecurityChecker:
                     # For simplicity, checking overall min drop in the fetched history for now.
                     # More sophisticated: analyze drops in rolling windows or specifically recent ones.
                     largest_drop = min(recent_liquidity_changes) # min will find the largest negative change
-                    if largest_drop < get_config().RUGPULL_LIQUIDITY_DROP_THRESHOLD:  # e.g., -0.3 for 30% drop
+                    if largest_drop < config.RUGPULL_LIQUIDITY_DROP_THRESHOLD:  # e.g., -0.3 for 30% drop
                         risks.append(SecurityRisk(
                             risk_type="significant_liquidity_drop", # More specific
                             severity=9,
-                            description=f"Retrait important de liquidité détecté: {largest_drop*100:.1f}% en {get_config().RUGPULL_LIQUIDITY_TIMEFRAME} intervalle.",
-                            metadata={"liquidity_drop_percentage": largest_drop, "timeframe": get_config().RUGPULL_LIQUIDITY_TIMEFRAME}
+                            description=f"Retrait important de liquidité détecté: {largest_drop*100:.1f}% en {config.RUGPULL_LIQUIDITY_TIMEFRAME} intervalle.",
+                            metadata={"liquidity_drop_percentage": largest_drop, "timeframe": config.RUGPULL_LIQUIDITY_TIMEFRAME}
                         ))
             elif not liquidity_history_data and not data_fetch_errors:
                 logger.info(f"Historique de liquidité pour {token_address} est vide ou insuffisant pour l'analyse de retrait.")
@@ -925,6 +1002,8 @@ class SecurityChecker:
             Liste des risques détectés
         """
         risks = []
+        config = get_config()
+
         try:
             if not self.market_data:
                 logger.warning("MarketDataCache non disponible pour _analyze_liquidity_depth.")
@@ -1009,14 +1088,14 @@ class SecurityChecker:
                 if total_volume > 0:
                     asymmetry_ratio = abs(buy_volume - sell_volume) / total_volume
                     
-                    if asymmetry_ratio > get_config().LIQUIDITY_ASYMMETRY_THRESHOLD_SEVERE: # Use Config
+                    if asymmetry_ratio > config.LIQUIDITY_ASYMMETRY_THRESHOLD_SEVERE: # Use Config
                         risks.append(SecurityRisk(
                             risk_type="severe_liquidity_asymmetry",
                             severity=8,
                             description=f"Asymétrie sévère de la liquidité: {asymmetry_ratio*100:.1f}%",
                             metadata={"asymmetry_ratio": asymmetry_ratio, "buy_volume_usd": buy_volume, "sell_volume_usd": sell_volume}
                         ))
-                    elif asymmetry_ratio > get_config().LIQUIDITY_ASYMMETRY_THRESHOLD_MODERATE: # Use Config
+                    elif asymmetry_ratio > config.LIQUIDITY_ASYMMETRY_THRESHOLD_MODERATE: # Use Config
                         risks.append(SecurityRisk(
                             risk_type="moderate_liquidity_asymmetry",
                             severity=5,
@@ -1032,22 +1111,22 @@ class SecurityChecker:
                 sorted_sell_orders = sorted([o for o in sell_orders if isinstance(o.get("price"), (int, float))], key=lambda x: float(x["price"])) 
 
                 if sorted_sell_orders:
-                    price_impact_1k = self._calculate_price_impact(sorted_sell_orders, get_config().PRICE_IMPACT_USD_AMOUNT_1K)
-                    if price_impact_1k > get_config().PRICE_IMPACT_THRESHOLD_HIGH_1K: 
+                    price_impact_1k = self._calculate_price_impact(sorted_sell_orders, config.PRICE_IMPACT_USD_AMOUNT_1K)
+                    if price_impact_1k > config.PRICE_IMPACT_THRESHOLD_HIGH_1K: 
                         risks.append(SecurityRisk(
                             risk_type="high_price_impact_1k",
                             severity=6,
-                            description=f"Impact de prix élevé pour {get_config().PRICE_IMPACT_USD_AMOUNT_1K} USD: {price_impact_1k*100:.2f}%",
-                            metadata={"price_impact_usd": get_config().PRICE_IMPACT_USD_AMOUNT_1K, "impact_percentage": price_impact_1k}
+                            description=f"Impact de prix élevé pour {config.PRICE_IMPACT_USD_AMOUNT_1K} USD: {price_impact_1k*100:.2f}%",
+                            metadata={"price_impact_usd": config.PRICE_IMPACT_USD_AMOUNT_1K, "impact_percentage": price_impact_1k}
                         ))
                     
-                    price_impact_10k = self._calculate_price_impact(sorted_sell_orders, get_config().PRICE_IMPACT_USD_AMOUNT_10K)
-                    if price_impact_10k > get_config().PRICE_IMPACT_THRESHOLD_HIGH_10K:
+                    price_impact_10k = self._calculate_price_impact(sorted_sell_orders, config.PRICE_IMPACT_USD_AMOUNT_10K)
+                    if price_impact_10k > config.PRICE_IMPACT_THRESHOLD_HIGH_10K:
                         risks.append(SecurityRisk(
                             risk_type="high_price_impact_10k",
                             severity=7,
-                            description=f"Impact de prix élevé pour {get_config().PRICE_IMPACT_USD_AMOUNT_10K} USD: {price_impact_10k*100:.2f}%",
-                            metadata={"price_impact_usd": get_config().PRICE_IMPACT_USD_AMOUNT_10K, "impact_percentage": price_impact_10k}
+                            description=f"Impact de prix élevé pour {config.PRICE_IMPACT_USD_AMOUNT_10K} USD: {price_impact_10k*100:.2f}%",
+                            metadata={"price_impact_usd": config.PRICE_IMPACT_USD_AMOUNT_10K, "impact_percentage": price_impact_10k}
                         ))
                 else:
                     logger.info(f"Aucun ordre de vente ('sell_orders') trouvé ou valide pour {token_address} pour l'analyse d'impact de prix.")
@@ -1135,6 +1214,7 @@ class SecurityChecker:
             
             # Ajouter à la liste noire en mémoire
             self.blacklist.add(token_address)
+            self.invalidate_security_cache(token_address)
             
             # Ajouter à la base de données
             cursor = self.conn.cursor()
@@ -1362,6 +1442,8 @@ class SecurityChecker:
                 
                 # Mettre à jour la liste en mémoire
                 self.blacklist = self._load_blacklist()
+                for address in to_remove:
+                    self.invalidate_security_cache(address)
                 
                 logger.info(f"Nettoyage de la liste noire: {len(to_remove)} entrées supprimées")
                 
@@ -1416,6 +1498,10 @@ class SecurityChecker:
     def close(self):
         """Ferme les ressources ouvertes."""
         if hasattr(self, "conn") and self.conn:
+            if self._shared_database is not None and self.conn is self._shared_database.conn:
+                # Connexion partagée : fermée par son propriétaire (EnhancedDatabase)
+                self.conn = None
+                return
             try:
                 self.conn.close()
             except Exception as e:
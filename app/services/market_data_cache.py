@@ -14,6 +14,8 @@ import json
 from dataclasses import dataclass, asdict
 
 from app.config import get_config
+from app.market.market_data import normalize_pair
+from app.utils.http import loads_json
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +59,7 @@ class MarketDataCache:
         self.config = config or get_config()
         self.redis_client = None
         self.session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = True
         
         # Configuration cache
         self.cache_ttl = {
@@ -89,12 +92,14 @@ class MarketDataCache:
             await self.redis_client.ping()
             logger.info("Redis connection established for MarketDataCache")
             
-            # HTTP session
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30),
-                headers={'User-Agent': 'NumerusX-Bot/1.0'}
-            )
-            logger.info("HTTP session created for MarketDataCache")
+            # HTTP session (sauf si une session partagée a été fournie via attach_http_session)
+            if self.session is None or self.session.closed:
+                self.session = aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=30),
+                    headers={'User-Agent': 'NumerusX-Bot/1.0'}
+                )
+                self._owns_session = True
+                logger.info("HTTP session created for MarketDataCache")
             
         except Exception as e:
             logger.error(f"Failed to initialize MarketDataCache connections: {e}")
@@ -102,9 +107,14 @@ class MarketDataCache:
             
         return self
         
+    def attach_http_session(self, session: aiohttp.ClientSession) -> None:
+        """Utilise une session fournie par l'appelant (ex: DexBot), qui reste responsable de sa fermeture."""
+        self.session = session
+        self._owns_session = False
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Ferme les connexions."""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
         if self.redis_client:
             await self.redis_client.aclose()
@@ -289,19 +299,19 @@ class MarketDataCache:
             url = f"{self.api_sources['dexscreener']}/dex/tokens/{token_address}"
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = loads_json(await response.read())
                     if data.get('pairs'):
-                        pair = data['pairs'][0]  # Premier pair trouvé
+                        pair = normalize_pair(data['pairs'][0])  # Premier pair trouvé
                         return CachedTokenInfo(
                             address=token_address,
-                            symbol=pair.get('baseToken', {}).get('symbol', 'UNKNOWN'),
-                            name=pair.get('baseToken', {}).get('name', 'Unknown Token'),
-                            decimals=int(pair.get('baseToken', {}).get('decimals', 9)),
-                            price_usd=float(pair.get('priceUsd', 0)),
-                            market_cap_usd=pair.get('marketCap'),
-                            volume_24h_usd=pair.get('volume', {}).get('h24'),
+                            symbol=pair.base_symbol or 'UNKNOWN',
+                            name=pair.base_name or 'Unknown Token',
+                            decimals=pair.base_decimals if pair.base_decimals is not None else 9,
+                            price_usd=pair.price_usd or 0.0,
+                            market_cap_usd=pair.raw.get('marketCap'),
+                            volume_24h_usd=pair.volume_h24,
                             created_at=None,  # DexScreener ne fournit pas cette info
-                            liquidity_usd=pair.get('liquidity', {}).get('usd'),
+                            liquidity_usd=pair.liquidity_usd,
                             timestamp=time.time(),
                             source='dexscreener'
                         )
@@ -313,7 +323,7 @@ class MarketDataCache:
             url = f"{self.api_sources['jupiter']}/price?ids={token_address}"
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = loads_json(await response.read())
                     token_data = data.get('data', {}).get(token_address)
                     if token_data:
                         return CachedTokenInfo(
@@ -340,7 +350,7 @@ class MarketDataCache:
             url = f"{self.api_sources['jupiter']}/price?ids={token_address}"
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = loads_json(await response.read())
                     token_data = data.get('data', {}).get(token_address)
                     if token_data:
                         return CachedPriceData(
@@ -362,7 +372,7 @@ class MarketDataCache:
             url = f"{self.api_sources['dexscreener']}/dex/tokens/{token_address}"
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = loads_json(await response.read())
                     if data.get('pairs'):
                         pair = data['pairs'][0]
                         return {
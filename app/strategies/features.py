@@ -0,0 +1,119 @@
+"""
+Indicateurs par paire calculés une fois par cycle, puis partagés par tous les consommateurs
+(entrées de l'AIAgent, stratégies, moteur de prédiction).
+
+Le premier passage sur une paire calcule les séries complètes (NumPy, voir `indicators`) ;
+les passages suivants n'appliquent les récurrences EMA / Wilder qu'aux bougies plus récentes
+que le dernier horodatage vu, au lieu de recalculer tout l'historique à chaque cycle.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.strategies import indicators
+
+RSI_PERIOD = 14
+EMA_FAST_SPAN = 12
+EMA_SLOW_SPAN = 26
+ATR_PERIOD = 14
+SUPPORT_RESISTANCE_PERIOD = 24
+# Écart relatif minimal entre EMA rapide et lente pour qualifier une tendance
+TREND_THRESHOLD = 0.002
+
+
+@dataclass
+class IndicatorState:
+    """État des récurrences (EMA, lissages de Wilder) après la dernière bougie traitée."""
+    last_ts: int
+    last_close: float
+    ema_fast: float
+    ema_slow: float
+    avg_gain: float
+    avg_loss: float
+    atr: float
+    features: Dict[str, Any] = field(default_factory=dict)
+
+
+def _full_state(ts: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> IndicatorState:
+    delta = np.diff(close)
+    avg_gain = indicators.wilder_smooth(np.clip(delta, 0.0, None), RSI_PERIOD) if delta.size else np.zeros(1)
+    avg_loss = indicators.wilder_smooth(np.clip(-delta, 0.0, None), RSI_PERIOD) if delta.size else np.zeros(1)
+    return IndicatorState(
+        last_ts=int(ts[-1]),
+        last_close=float(close[-1]),
+        ema_fast=float(indicators.ema(close, EMA_FAST_SPAN)[-1]),
+        ema_slow=float(indicators.ema(close, EMA_SLOW_SPAN)[-1]),
+        avg_gain=float(avg_gain[-1]),
+        avg_loss=float(avg_loss[-1]),
+        atr=float(indicators.wilder_smooth(indicators.true_range(high, low, close), ATR_PERIOD)[-1]),
+    )
+
+
+def _advance(state: IndicatorState, high: float, low: float, close: float, ts: int) -> None:
+    """Applique une bougie aux récurrences (mêmes formules que ewm(adjust=False))."""
+    delta = close - state.last_close
+    state.avg_gain += (max(delta, 0.0) - state.avg_gain) / RSI_PERIOD
+    state.avg_loss += (max(-delta, 0.0) - state.avg_loss) / RSI_PERIOD
+    state.ema_fast += 2.0 / (EMA_FAST_SPAN + 1) * (close - state.ema_fast)
+    state.ema_slow += 2.0 / (EMA_SLOW_SPAN + 1) * (close - state.ema_slow)
+    true_range = max(high - low, abs(high - state.last_close), abs(low - state.last_close))
+    state.atr += (true_range - state.atr) / ATR_PERIOD
+    state.last_close = close
+    state.last_ts = ts
+
+
+def _features(state: IndicatorState, high: np.ndarray, low: np.ndarray) -> Dict[str, Any]:
+    rsi = 100.0 if state.avg_loss == 0 else 100.0 - 100.0 / (1.0 + state.avg_gain / state.avg_loss)
+    ema_gap = (state.ema_fast - state.ema_slow) / state.ema_slow if state.ema_slow else 0.0
+    if ema_gap > TREND_THRESHOLD:
+        trend = "UPWARD"
+    elif ema_gap < -TREND_THRESHOLD:
+        trend = "DOWNWARD"
+    else:
+        trend = "SIDEWAYS"
+    return {
+        'last_ts': state.last_ts,
+        'rsi': rsi,
+        'ema_fast': state.ema_fast,
+        'ema_slow': state.ema_slow,
+        'atr': state.atr,
+        'atr_percentage': min(1.0, state.atr / state.last_close) if state.last_close > 0 else 0.0,
+        'trend': trend,
+        'support': float(low[-SUPPORT_RESISTANCE_PERIOD:].min()),
+        'resistance': float(high[-SUPPORT_RESISTANCE_PERIOD:].max()),
+    }
+
+
+class FeatureCache:
+    """
+    Features par paire, clé (paire, horodatage de la dernière bougie).
+
+    `get` renvoie le dict mis en cache tant qu'aucune nouvelle bougie n'est apparue ;
+    sinon seules les nouvelles bougies sont intégrées. Un recalcul complet n'a lieu
+    qu'à la première vue de la paire ou si l'historique reçu ne recouvre plus l'état.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._states: LRUCache = LRUCache(maxsize=maxsize)
+
+    def get(self, pair_key: str, columns: Optional[Dict[str, np.ndarray]]) -> Optional[Dict[str, Any]]:
+        """`columns` : colonnes OHLCV float64 triées par timestamp (format de get_pair_bundle)."""
+        if not columns or len(columns['close']) == 0:
+            return None
+        ts, high, low, close = columns['timestamp'], columns['high'], columns['low'], columns['close']
+        state: Optional[IndicatorState] = self._states.get(pair_key)
+
+        if state is not None and int(ts[-1]) == state.last_ts:
+            return state.features
+        if state is None or int(ts[0]) > state.last_ts:
+            state = _full_state(ts, high, low, close)
+        else:
+            for i in np.flatnonzero(ts > state.last_ts).tolist():
+                _advance(state, float(high[i]), float(low[i]), float(close[i]), int(ts[i]))
+
+        state.features = _features(state, high, low)
+        self._states[pair_key] = state
+        return state.features
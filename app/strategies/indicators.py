@@ -0,0 +1,136 @@
+"""
+Indicateurs techniques vectorisés (NumPy) pour les stratégies.
+
+Utilisés en remplacement de TA-Lib lorsqu'il n'est pas installé : tous les calculs
+opèrent sur des `np.ndarray` (via `.to_numpy()`), sans callback Python par ligne
+(`rolling().apply`). Les lissages de Wilder suivent la même récurrence que TA-Lib ;
+seule l'initialisation diffère, l'écart devient négligeable après quelques périodes.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _as_array(values) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=float)
+    return np.asarray(values, dtype=float)
+
+
+def ema(values, span: int) -> np.ndarray:
+    """Exponential moving average (alpha = 2 / (span + 1))."""
+    return pd.Series(_as_array(values)).ewm(span=span, adjust=False).mean().to_numpy(copy=True)
+
+
+def wilder_smooth(values, period: int) -> np.ndarray:
+    """Wilder smoothing (alpha = 1 / period), as used by RSI/ATR/ADX."""
+    return pd.Series(_as_array(values)).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy(copy=True)
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average via cumulative sums; NaN until `period` values are available."""
+    arr = _as_array(values)
+    out = np.full(arr.shape, np.nan)
+    if period <= 0 or len(arr) < period:
+        return out
+    csum = np.cumsum(np.insert(arr, 0, 0.0))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def wma(values, period: int) -> np.ndarray:
+    """Linearly weighted moving average computed with a single convolution."""
+    arr = _as_array(values)
+    out = np.full(arr.shape, np.nan)
+    if period <= 0 or len(arr) < period:
+        return out
+    weights = np.arange(1, period + 1, dtype=float)
+    out[period - 1:] = np.convolve(arr, weights[::-1], mode='valid') / weights.sum()
+    return out
+
+
+def rolling_max(values, period: int) -> np.ndarray:
+    arr = _as_array(values)
+    out = np.full(arr.shape, np.nan)
+    if len(arr) >= period > 0:
+        out[period - 1:] = np.lib.stride_tricks.sliding_window_view(arr, period).max(axis=1)
+    return out
+
+
+def rolling_min(values, period: int) -> np.ndarray:
+    arr = _as_array(values)
+    out = np.full(arr.shape, np.nan)
+    if len(arr) >= period > 0:
+        out[period - 1:] = np.lib.stride_tricks.sliding_window_view(arr, period).min(axis=1)
+    return out
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    arr = _as_array(close)
+    out = np.full(arr.shape, np.nan)
+    if len(arr) <= period:
+        return out
+    delta = np.diff(arr)
+    avg_gain = wilder_smooth(np.clip(delta, 0.0, None), period)
+    avg_loss = wilder_smooth(np.clip(-delta, 0.0, None), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    out[period:] = values[period - 1:]
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns (macd_line, signal_line, histogram)."""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def stoch(high, low, close, fastk_period: int = 14, slowk_period: int = 3,
+          slowd_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """Slow stochastic oscillator, returns (slow_k, slow_d)."""
+    c = _as_array(close)
+    highest = rolling_max(high, fastk_period)
+    lowest = rolling_min(low, fastk_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fast_k = np.where(highest != lowest, (c - lowest) / (highest - lowest) * 100.0, 50.0)
+    fast_k[np.isnan(highest)] = np.nan
+    slow_k = pd.Series(fast_k).rolling(slowk_period).mean().to_numpy(copy=True)
+    slow_d = pd.Series(slow_k).rolling(slowd_period).mean().to_numpy(copy=True)
+    return slow_k, slow_d
+
+
+def true_range(high, low, close) -> np.ndarray:
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = np.concatenate(([np.nan], c[:-1]))
+    return np.nanmax(np.vstack((h - l, np.abs(h - prev_close), np.abs(l - prev_close))), axis=0)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    tr = true_range(high, low, close)
+    out = wilder_smooth(tr, period)
+    out[:period] = np.nan
+    return out
+
+
+def adx(high, low, close, period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Average Directional Index, returns (adx, plus_di, minus_di)."""
+    h, l = _as_array(high), _as_array(low)
+    up_move = np.concatenate(([0.0], np.diff(h)))
+    down_move = np.concatenate(([0.0], -np.diff(l)))
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    atr_values = wilder_smooth(true_range(high, low, close), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * wilder_smooth(plus_dm, period) / atr_values
+        minus_di = 100.0 * wilder_smooth(minus_dm, period) / atr_values
+        dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx_values = wilder_smooth(np.nan_to_num(dx), period)
+
+    plus_di[:period] = np.nan
+    minus_di[:period] = np.nan
+    adx_values[:2 * period - 1] = np.nan
+    return adx_values, plus_di, minus_di
@@ -0,0 +1,81 @@
+"""
+Noyaux scalaires de combinaison de signaux, compilés avec Numba lorsqu'il est disponible.
+
+Les indicateurs sont déjà calculés en NumPy (voir `indicators`) ; il ne reste ici que
+l'arithmétique de combinaison (moyenne des indicateurs, seuils buy/sell) appelée par
+paire et par cycle. Sans Numba, les mêmes fonctions s'exécutent en Python pur.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Décorateur neutre utilisé quand Numba n'est pas installé."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+
+
+@njit(cache=True, fastmath=False)
+def momentum_blend(rsi: float, macd_last: float, macd_signal_last: float, stoch_k_last: float) -> float:
+    """Moyenne des indicateurs de momentum normalisés (0..1), NaN ignorés ; 0.5 si aucun n'est valide."""
+    total = 0.0
+    count = 0
+    if not np.isnan(rsi):
+        total += rsi / 100.0
+        count += 1
+    if not np.isnan(macd_last) and not np.isnan(macd_signal_last):
+        total += 0.5 + (macd_last - macd_signal_last) * 0.1
+        count += 1
+    if not np.isnan(stoch_k_last):
+        total += stoch_k_last / 100.0
+        count += 1
+    return total / count if count > 0 else 0.5
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def market_structure_ratio(high: np.ndarray, low: np.ndarray, close_last: float, period: int) -> float:
+    """Position du dernier prix entre support (plus bas) et résistance (plus haut) sur `period` bougies."""
+    n = high.shape[0]
+    start = n - period if n > period else 0
+    resistance = high[start]
+    support = low[start]
+    for i in range(start + 1, n):
+        if high[i] > resistance:
+            resistance = high[i]
+        if low[i] < support:
+            support = low[i]
+    if resistance == support:
+        return 0.5
+    return (close_last - support) / (resistance - support)
+
+
+@njit(cache=True, fastmath=True)
+def combine_signal(momentum_score: float, structure_ratio: float, threshold: float):
+    """
+    Règles buy/sell de AdvancedTradingStrategy.generate_signal.
+    Retourne (direction, confidence) avec direction dans SIGNAL_SELL/HOLD/BUY.
+    """
+    if momentum_score > threshold and structure_ratio > 0.6:
+        return SIGNAL_BUY, min(0.95, momentum_score * 0.8 + structure_ratio * 0.2)
+    if momentum_score < (1.0 - threshold) and structure_ratio < 0.4:
+        return SIGNAL_SELL, min(0.95, (1.0 - momentum_score) * 0.8 + (1.0 - structure_ratio) * 0.2)
+    return SIGNAL_HOLD, 0.5
+
+
+def warm_up() -> None:
+    """Force la compilation JIT (ou le chargement du cache) hors du chemin critique."""
+    if HAS_NUMBA:
+        dummy = np.linspace(1.0, 2.0, 48)
+        momentum_blend(50.0, 0.1, 0.0, 50.0)
+        market_structure_ratio(dummy + 0.1, dummy - 0.1, 1.5, 24)
+        combine_signal(0.5, 0.5, 0.6)
@@ -73,10 +73,34 @@ class MeanReversionStrategy(BaseStrategy):
         analysis_results['last_price'] = market_data['close'].iloc[-1]
         return analysis_results
 
+    def vectorized_analyze(self, big_df: pd.DataFrame) -> pd.DataFrame:
+        """Bollinger Bands for every pair in one pass (groupby + rolling), latest row per pair."""
+        tok = big_df[self.TOKEN_COLUMN]
+        close = self.ensure_float_ohlcv(big_df)['close']
+        rolling = close.groupby(tok, sort=False).rolling(window=self.bb_period)
+        sma = rolling.mean().reset_index(level=0, drop=True)
+        std = rolling.std().reset_index(level=0, drop=True)
+        frame = pd.DataFrame({
+            self.TOKEN_COLUMN: tok,
+            'bb_lower': sma - (std * self.bb_std_dev),
+            'bb_middle': sma,
+            'bb_upper': sma + (std * self.bb_std_dev),
+            'last_price': close,
+        })
+        latest = self._last_row_per_token(frame, self.TOKEN_COLUMN)
+        counts = tok.value_counts()
+        short = counts[counts < self.bb_period]
+        if not short.empty:
+            latest['error'] = None
+            for t, n in short.items():
+                latest.loc[t, 'error'] = f'Not enough data for Bollinger Bands (need {self.bb_period}, got {n})'
+        return latest
+
     def generate_signal(self, analysis: Dict, **kwargs) -> Dict:
         """Generates trading signal from Bollinger Bands analysis."""
-        bb_lower = analysis.get('indicators', {}).get('bb_lower')
-        bb_upper = analysis.get('indicators', {}).get('bb_upper')
+        indicators = analysis.get('indicators') or {} # Looked up once
+        bb_lower = indicators.get('bb_lower')
+        bb_upper = indicators.get('bb_upper')
         last_price = analysis.get('last_price')
 
         signal = 'hold'
@@ -101,7 +125,7 @@ class MeanReversionStrategy(BaseStrategy):
         return {
             'signal': signal,
             'confidence': min(0.95, confidence), # Cap confidence
-            'target_price': analysis.get('indicators', {}).get('bb_middle') if signal != 'hold' else None, # Target middle band
+            'target_price': indicators.get('bb_middle') if signal != 'hold' else None, # Target middle band
             'stop_loss': (bb_lower * 0.98) if signal == 'buy' else (bb_upper * 1.02 if signal == 'sell' else None) # Example stop loss
         }
 
@@ -83,12 +83,38 @@ class MomentumStrategy(BaseStrategy):
         
         return analysis_results
 
+    def vectorized_analyze(self, big_df: pd.DataFrame) -> pd.DataFrame:
+        """RSI and MACD for every pair in one pass (groupby + rolling/ewm), latest row per pair."""
+        tok = big_df[self.TOKEN_COLUMN]
+        close = self.ensure_float_ohlcv(big_df)['close']
+        delta = close.groupby(tok, sort=False).diff()
+        gain = delta.where(delta > 0, 0).groupby(tok, sort=False).rolling(window=self.rsi_period).mean()
+        loss = (-delta.where(delta < 0, 0)).groupby(tok, sort=False).rolling(window=self.rsi_period).mean()
+        rs = gain.reset_index(level=0, drop=True) / loss.reset_index(level=0, drop=True)
+
+        grouped_close = close.groupby(tok, sort=False)
+        exp1 = grouped_close.ewm(span=self.macd_fast, adjust=False).mean().reset_index(level=0, drop=True)
+        exp2 = grouped_close.ewm(span=self.macd_slow, adjust=False).mean().reset_index(level=0, drop=True)
+        macd = exp1 - exp2
+        signal_line = macd.groupby(tok, sort=False).ewm(span=self.macd_signal, adjust=False).mean().reset_index(level=0, drop=True)
+
+        frame = pd.DataFrame({
+            self.TOKEN_COLUMN: tok,
+            'rsi': 100 - (100 / (1 + rs)),
+            'macd': macd,
+            'macd_signal': signal_line,
+            'macd_hist': macd - signal_line,
+            'last_price': close,
+        })
+        return self._last_row_per_token(frame, self.TOKEN_COLUMN)
+
     def generate_signal(self, analysis: dict, **kwargs) -> dict:
         """Generates trading signal from RSI and MACD analysis."""
-        rsi = analysis.get('indicators', {}).get('rsi')
-        macd = analysis.get('indicators', {}).get('macd')
-        macd_signal = analysis.get('indicators', {}).get('macd_signal')
-        # macd_hist = analysis.get('indicators', {}).get('macd_hist') # Histogram can also be used
+        indicators = analysis.get('indicators') or {} # Looked up once
+        rsi = indicators.get('rsi')
+        macd = indicators.get('macd')
+        macd_signal = indicators.get('macd_signal')
+        # macd_hist = indicators.get('macd_hist') # Histogram can also be used
         last_price = analysis.get('last_price')
 
         signal = 'hold'
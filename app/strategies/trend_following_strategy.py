@@ -6,6 +6,7 @@ except ImportError:
     HAS_TALIB = False
 # import pandas_ta as ta # Uncomment if using pandas_ta
 from app.strategy_framework import BaseStrategy
+from app.strategies import indicators
 from typing import Dict
 
 class TrendFollowingStrategy(BaseStrategy):
@@ -38,9 +39,10 @@ class TrendFollowingStrategy(BaseStrategy):
         if len(market_data) < min_data_length:
             return {'error': f'Not enough data (need {min_data_length}, got {len(market_data)})'}
 
-        close_prices = market_data['close'].astype(float)
-        high_prices = market_data['high'].astype(float)
-        low_prices = market_data['low'].astype(float)
+        market_data = self.ensure_float_ohlcv(market_data)
+        close_prices = market_data['close']
+        high_prices = market_data['high']
+        low_prices = market_data['low']
 
         # Moving Averages (using SMA for simplicity, could use EMA via talib.EMA or pandas_ta.ema)
         # Using pandas_ta:
@@ -48,8 +50,10 @@ class TrendFollowingStrategy(BaseStrategy):
         # market_data.ta.sma(length=self.long_ma_period, append=True)  # -> SMA_50
         # analysis_results['indicators']['short_ma'] = market_data[f'SMA_{self.short_ma_period}'].iloc[-1]
         # analysis_results['indicators']['long_ma'] = market_data[f'SMA_{self.long_ma_period}'].iloc[-1]
-        analysis_results['indicators']['short_ma'] = close_prices.rolling(window=self.short_ma_period).mean().iloc[-1]
-        analysis_results['indicators']['long_ma'] = close_prices.rolling(window=self.long_ma_period).mean().iloc[-1]
+        # Only the last value is needed: mean of the trailing window instead of a full rolling pass
+        close_np = close_prices.to_numpy()
+        analysis_results['indicators']['short_ma'] = close_np[-self.short_ma_period:].mean()
+        analysis_results['indicators']['long_ma'] = close_np[-self.long_ma_period:].mean()
 
         # ADX (Average Directional Index)
         # Using pandas_ta:
@@ -58,12 +62,18 @@ class TrendFollowingStrategy(BaseStrategy):
         # analysis_results['indicators']['plus_di'] = market_data[f'DMP_{self.adx_period}'].iloc[-1]
         # analysis_results['indicators']['minus_di'] = market_data[f'DMN_{self.adx_period}'].iloc[-1]
         try:
-            adx_values = talib.ADX(high_prices, low_prices, close_prices, timeperiod=self.adx_period)
-            plus_di_values = talib.PLUS_DI(high_prices, low_prices, close_prices, timeperiod=self.adx_period)
-            minus_di_values = talib.MINUS_DI(high_prices, low_prices, close_prices, timeperiod=self.adx_period)
-            analysis_results['indicators']['adx'] = adx_values.iloc[-1] if not pd.isna(adx_values.iloc[-1]) else None
-            analysis_results['indicators']['plus_di'] = plus_di_values.iloc[-1] if not pd.isna(plus_di_values.iloc[-1]) else None
-            analysis_results['indicators']['minus_di'] = minus_di_values.iloc[-1] if not pd.isna(minus_di_values.iloc[-1]) else None
+            if HAS_TALIB:
+                adx_values = talib.ADX(high_prices, low_prices, close_prices, timeperiod=self.adx_period).iloc[-1]
+                plus_di_values = talib.PLUS_DI(high_prices, low_prices, close_prices, timeperiod=self.adx_period).iloc[-1]
+                minus_di_values = talib.MINUS_DI(high_prices, low_prices, close_prices, timeperiod=self.adx_period).iloc[-1]
+            else:
+                # Fallback NumPy vectorisé si TA-Lib absent
+                adx_arr, plus_di_arr, minus_di_arr = indicators.adx(
+                    high_prices.to_numpy(), low_prices.to_numpy(), close_prices.to_numpy(), self.adx_period)
+                adx_values, plus_di_values, minus_di_values = adx_arr[-1], plus_di_arr[-1], minus_di_arr[-1]
+            analysis_results['indicators']['adx'] = adx_values if not pd.isna(adx_values) else None
+            analysis_results['indicators']['plus_di'] = plus_di_values if not pd.isna(plus_di_values) else None
+            analysis_results['indicators']['minus_di'] = minus_di_values if not pd.isna(minus_di_values) else None
         except Exception as e:
             # self.logger.error(f"Error calculating ADX with talib: {e}") # If logger available
             analysis_results['indicators']['adx'] = None
@@ -75,11 +85,12 @@ class TrendFollowingStrategy(BaseStrategy):
 
     def generate_signal(self, analysis: Dict, **kwargs) -> Dict:
         """Generates trading signal from MA crossover and ADX trend strength."""
-        short_ma = analysis.get('indicators', {}).get('short_ma')
-        long_ma = analysis.get('indicators', {}).get('long_ma')
-        adx = analysis.get('indicators', {}).get('adx')
-        plus_di = analysis.get('indicators', {}).get('plus_di')
-        minus_di = analysis.get('indicators', {}).get('minus_di')
+        indicators = analysis.get('indicators') or {} # Looked up once
+        short_ma = indicators.get('short_ma')
+        long_ma = indicators.get('long_ma')
+        adx = indicators.get('adx')
+        plus_di = indicators.get('plus_di')
+        minus_di = indicators.get('minus_di')
         last_price = analysis.get('last_price')
 
         signal = 'hold'
@@ -1,4 +1,5 @@
 import logging
+import heapq
 import time
 import numpy as np
 import pandas as pd
@@ -277,7 +278,7 @@ class StrategyEvaluator:
         
         # Tableau des 10 meilleurs trades
         if result.trades:
-            best_trades = sorted(result.trades, key=lambda t: t.get("profit_pct", 0), reverse=True)[:10]
+            best_trades = heapq.nlargest(10, result.trades, key=lambda t: t.get("profit_pct", 0))
             report += "### Top 10 des meilleurs trades\n\n"
             report += "| Date d'entrée | Date de sortie | P&L | P&L % | Raison de sortie |\n"
             report += "|--------------|--------------|-----|-------|------------------|\n"
@@ -294,7 +295,7 @@ class StrategyEvaluator:
             report += "\n"
             
             # Tableau des 10 pires trades
-            worst_trades = sorted(result.trades, key=lambda t: t.get("profit_pct", 0))[:10]
+            worst_trades = heapq.nsmallest(10, result.trades, key=lambda t: t.get("profit_pct", 0))
             report += "### Top 10 des pires trades\n\n"
             report += "| Date d'entrée | Date de sortie | P&L | P&L % | Raison de sortie |\n"
             report += "|--------------|--------------|-----|-------|------------------|\n"
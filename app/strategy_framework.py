@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import time
 import numpy as np
@@ -5,6 +6,9 @@ import pandas as pd
 from dataclasses import dataclass
 from enum import Enum
 from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from app.strategies import kernels
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -1262,16 +1266,22 @@ class BacktestEngine:
 class StrategyValidator:
     """Utilitaire pour valider et comparer différentes stratégies."""
     
-    def __init__(self, token_addresses: List[str], market_data_provider=None):
+    # Requêtes historiques simultanées au plus (préserve le pool de connexions du fournisseur)
+    MAX_CONCURRENT_REQUESTS = 8
+    
+    def __init__(self, token_addresses: List[str], market_data_provider=None,
+                 max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS):
         """
         Initialise le validateur de stratégies.
         
         Args:
             token_addresses: Liste d'adresses de tokens pour la validation
             market_data_provider: Fournisseur de données de marché
+            max_concurrent_requests: Nombre max de récupérations d'historique en vol
         """
         self.token_addresses = token_addresses
         self.market_data_provider = market_data_provider
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
         self.results = {}
         self.backtest_engine = BacktestEngine()
         
@@ -1291,27 +1301,26 @@ class StrategyValidator:
         """
         results = {}
         
+        # Toutes les séries historiques (token x timeframe) sont récupérées en parallèle :
+        # une latence réseau au lieu d'une par requête ; backtests et signaux restent séquentiels
+        requests = [(token_address, timeframe) for token_address in self.token_addresses
+                    for timeframe in timeframes if timeframe in strategy.timeframes]
+        price_frames = {}
+        if self.market_data_provider and requests:
+            limit = lookback_days * 24  # Approximation du nombre de périodes
+            columns_by_request = await self._fetch_histories(requests, limit)
+            for (token_address, timeframe), columns in columns_by_request.items():
+                # Colonnes NumPy -> DataFrame sans passer par une liste de dicts
+                if columns is not None and len(columns['timestamp']):
+                    df = pd.DataFrame(columns, copy=False)
+                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')  # Convertir en timestamp pandas
+                    df.set_index('timestamp', inplace=True)
+                    price_frames[(token_address, timeframe)] = df
+        
         for token_address in self.token_addresses:
             token_results = {}
-            
-            # Récupérer les données historiques pour chaque timeframe
-            price_data = {}
-            for timeframe in timeframes:
-                if timeframe in strategy.timeframes:
-                    try:
-                        # Obtenir les données historiques via le fournisseur
-                        if self.market_data_provider:
-                            data = await self.market_data_provider.get_historical_prices(
-                                token_address, timeframe, lookback_days * 24)  # Approximation du nombre de périodes
-                                
-                            # Convertir au format pandas si nécessaire
-                            if isinstance(data, list) and data:
-                                df = pd.DataFrame(data)
-                                df['timestamp'] = pd.to_datetime(df['timestamp'] * 1e9)  # Convertir en timestamp pandas
-                                df.set_index('timestamp', inplace=True)
-                                price_data[timeframe] = df
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la récupération des données pour {token_address} ({timeframe}): {e}")
+            price_data = {timeframe: price_frames[(token_address, timeframe)]
+                          for timeframe in timeframes if (token_address, timeframe) in price_frames}
             
             if price_data:
                 # Exécuter un backtest pour ce token
@@ -1344,6 +1353,43 @@ class StrategyValidator:
             'aggregated': aggregated
         }
         
+    async def _fetch_histories(self, requests: List[Tuple[str, str]], limit: int) -> Dict[Tuple[str, str], Optional[Dict[str, np.ndarray]]]:
+        """
+        Colonnes OHLCV par (token, timeframe). Un appel groupé par timeframe quand le fournisseur
+        expose get_historical_prices_batch, sinon un appel par requête (max_concurrent_requests en vol).
+        """
+        timeframes = list(dict.fromkeys(timeframe for _, timeframe in requests))
+        if hasattr(self.market_data_provider, 'get_historical_prices_batch'):
+            batches = await asyncio.gather(
+                *(self.market_data_provider.get_historical_prices_batch(
+                    [token for token, tf in requests if tf == timeframe], timeframe, limit)
+                  for timeframe in timeframes),
+                return_exceptions=True
+            )
+            columns_by_request = {}
+            for timeframe, batch in zip(timeframes, batches):
+                if isinstance(batch, Exception):
+                    logger.error(f"Erreur lors de la récupération groupée des données ({timeframe}): {batch}")
+                    continue
+                for token_address, columns in batch.items():
+                    columns_by_request[(token_address, timeframe)] = columns
+            return columns_by_request
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def fetch(token_address: str, timeframe: str):
+            async with semaphore:
+                return await self.market_data_provider.get_historical_prices(token_address, timeframe, limit, as_columns=True)
+        
+        responses = await asyncio.gather(*(fetch(*request) for request in requests), return_exceptions=True)
+        columns_by_request = {}
+        for (token_address, timeframe), response in zip(requests, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Erreur lors de la récupération des données pour {token_address} ({timeframe}): {response}")
+            elif response.get('success') and response.get('data') is not None:
+                columns_by_request[(token_address, timeframe)] = response['data']
+        return columns_by_request
+        
     def _aggregate_results(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
         Agrège les résultats de plusieurs tokens.
@@ -2117,6 +2163,129 @@ class BaseStrategy:
         """Returns strategy parameters."""
         raise NotImplementedError
 
+    # Colonne identifiant la paire dans un DataFrame multi-paires concaténé
+    TOKEN_COLUMN = 'tok'
+    OHLCV_FLOAT_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    @classmethod
+    def ensure_float_ohlcv(cls, market_data: pd.DataFrame) -> pd.DataFrame:
+        """Casts the OHLCV columns to float64 once, at the frame level.
+
+        Columns already in float64 (e.g. frames built from get_historical_prices(as_columns=True))
+        are left untouched, so the common case costs no copy; indicators then read the columns
+        directly instead of re-converting them on every call.
+        """
+        to_cast = {col: np.float64 for col in cls.OHLCV_FLOAT_COLUMNS
+                   if col in market_data.columns and market_data[col].dtype != np.float64}
+        return market_data.astype(to_cast) if to_cast else market_data
+
+    def vectorized_analyze(self, big_df: pd.DataFrame) -> pd.DataFrame:
+        """Analyzes several pairs at once.
+
+        `big_df` is the concatenation of every pair's market data with a TOKEN_COLUMN
+        column (and a unique index). Returns one row per token (indexed by token) with the
+        indicator columns plus 'last_price'.
+        Default implementation falls back to `analyze()` per group; strategies whose
+        indicators can be expressed with groupby/rolling/ewm should override it.
+        """
+        rows = {}
+        for tok, group in big_df.groupby(self.TOKEN_COLUMN, sort=False):
+            analysis = self.analyze(group.drop(columns=self.TOKEN_COLUMN))
+            row = dict(analysis.get('indicators', {}))
+            row['last_price'] = analysis.get('last_price')
+            if 'error' in analysis:
+                row['error'] = analysis['error']
+            rows[tok] = row
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def analyze_many(self, market_data_by_token: Dict[str, pd.DataFrame]) -> Dict[str, dict]:
+        """Runs `vectorized_analyze` over all pairs and returns `analyze()`-shaped dicts per token,
+        so the results can be fed to `generate_signal()` unchanged."""
+        if not market_data_by_token:
+            return {}
+        big_df = pd.concat(
+            [df.assign(**{self.TOKEN_COLUMN: tok}) for tok, df in market_data_by_token.items()],
+            ignore_index=True
+        )
+        latest = self.vectorized_analyze(self.ensure_float_ohlcv(big_df))
+        analyses = {}
+        for tok, row in latest.to_dict(orient='index').items():
+            if isinstance(row.get('error'), str):
+                analyses[tok] = {'error': row['error']}
+                continue
+            last_price = row.pop('last_price', None)
+            row.pop('error', None)
+            indicators = {k: (None if pd.isna(v) else v) for k, v in row.items()}
+            analyses[tok] = {'indicators': indicators, 'last_price': last_price}
+        return analyses
+
+    @staticmethod
+    def _last_row_per_token(frame: pd.DataFrame, token_column: str) -> pd.DataFrame:
+        """Keeps the latest row of each token group, indexed by token."""
+        return frame.groupby(token_column, sort=False).tail(1).set_index(token_column)
+
     def get_name(self) -> str:
         """Returns the name of the strategy."""
-        return self.__class__.__name__
\ No newline at end of file
+        return self.__class__.__name__
+
+# Stratégie du processus courant, installée par init_strategy_worker (initializer du pool CPU
+# de DexBot) : elle n'est sérialisée qu'une fois par processus, pas à chaque analyse.
+_WORKER_STRATEGY: Optional[BaseStrategy] = None
+
+_STRATEGY_SIGNAL_TYPES = {'buy': 'BUY', 'sell': 'SELL'}
+
+
+def init_strategy_worker(strategy: Optional[BaseStrategy]) -> None:
+    global _WORKER_STRATEGY
+    _WORKER_STRATEGY = strategy
+    # Chaque processus du pool a ses propres fonctions JIT : compilées ici, pas à la première analyse
+    kernels.warm_up()
+
+
+def _normalized_signal(strategy: BaseStrategy, analysis: dict) -> Dict[str, Any]:
+    """generate_signal() d'une analyse, normalisé pour SignalSourceInput : signal BUY / SELL / NEUTRAL,
+    confidence, indicators, reasoning."""
+    if 'error' in analysis:
+        return {'signal': 'NEUTRAL', 'confidence': 0.0, 'indicators': {}, 'reasoning': str(analysis['error'])[:200]}
+    signal = strategy.generate_signal(analysis)
+    indicators = {k: (None if v is None or pd.isna(v) else float(v))
+                  for k, v in analysis.get('indicators', {}).items()}
+    signal_type = _STRATEGY_SIGNAL_TYPES.get(str(signal.get('signal', '')).lower(), 'NEUTRAL')
+    reasoning = signal.get('reasoning') or signal.get('reason') or f"{strategy.get_name()}: {signal_type}"
+    return {
+        'signal': signal_type,
+        'confidence': float(signal.get('confidence') or 0.0),
+        'indicators': indicators,
+        'reasoning': str(reasoning)[:200],
+    }
+
+
+def strategy_signal(strategy: BaseStrategy, ohlcv_columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """analyze() + generate_signal() sur les colonnes OHLCV d'une paire (tableaux NumPy, peu coûteux
+    à transmettre à un processus)."""
+    analysis = strategy.analyze(BaseStrategy.ensure_float_ohlcv(pd.DataFrame(ohlcv_columns)))
+    return _normalized_signal(strategy, analysis)
+
+
+def strategy_signals(strategy: BaseStrategy,
+                     ohlcv_by_token: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Dict[str, Any]]:
+    """Même résultat que strategy_signal pour plusieurs paires, indicateurs calculés en une passe
+    vectorisée sur toutes les paires (analyze_many)."""
+    analyses = strategy.analyze_many({tok: pd.DataFrame(columns) for tok, columns in ohlcv_by_token.items()})
+    return {tok: _normalized_signal(strategy, analysis) for tok, analysis in analyses.items()}
+
+
+def _worker_strategy() -> BaseStrategy:
+    if _WORKER_STRATEGY is None:
+        raise RuntimeError("strategy worker not initialized")
+    return _WORKER_STRATEGY
+
+
+def strategy_signal_in_worker(ohlcv_columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Exécuté dans un processus du pool CPU (voir init_strategy_worker)."""
+    return strategy_signal(_worker_strategy(), ohlcv_columns)
+
+
+def strategy_signals_in_worker(ohlcv_by_token: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Dict[str, Any]]:
+    """Exécuté dans un processus du pool CPU (voir init_strategy_worker)."""
+    return strategy_signals(_worker_strategy(), ohlcv_by_token)
@@ -43,6 +43,7 @@ class TradeExecutor:
         Returns True if trade was successfully submitted and recorded, False otherwise.
         """
         trade_id_for_logging = f"agent_order_{int(time.time()*1000)}" # Create a unique ID for this attempt
+        reserved_cash_usd = 0.0 # Released on every exit path (see reserve_cash)
         try:
             decision = agent_order.get('decision')
             token_pair_str = agent_order.get('token_pair') # e.g., "SOL/USDC"
@@ -52,14 +53,16 @@ class TradeExecutor:
             agent_stop_loss_price = agent_order.get('stop_loss_price')
             agent_take_profit_price = agent_order.get('take_profit_price')
             agent_reasoning = agent_order.get('reasoning', "No reasoning provided.")
+            config = get_config() # Looked up once for the whole order
+            trading_config = config.trading
             # Use slippage from agent_order if provided, otherwise from Config
-            agent_slippage_bps = agent_order.get('slippage_bps', self.get_config().jupiter.default_slippage_bps)
+            agent_slippage_bps = agent_order.get('slippage_bps', config.jupiter.default_slippage_bps)
 
             if decision == 'HOLD' or not decision:
                 logger.info(f"[{trade_id_for_logging}] Agent decision is 'HOLD' or no decision. No trade executed for {token_pair_str}. Reasoning: {agent_reasoning}")
                 return True # Not an error, task completed successfully (by not trading)
 
-            if not all([token_pair_str, amount_usd is not None, amount_usd > 0]):
+            if not (token_pair_str and amount_usd is not None and amount_usd > 0):
                 logger.warning(f"[{trade_id_for_logging}] Agent order missing required fields (token_pair, amount_usd > 0): {agent_order}")
                 return False
 
@@ -86,17 +89,18 @@ class TradeExecutor:
             
             target_token_symbol: Optional[str] = None
             other_token_symbol: Optional[str] = None
+            base_asset_symbol = trading_config.base_asset_symbol
 
-            if token_symbol_0 == self.get_config().trading.base_asset_SYMBOL: # e.g. USDC/SOL
+            if token_symbol_0 == base_asset_symbol: # e.g. USDC/SOL
                 target_token_symbol = token_symbol_1 # e.g. SOL
                 other_token_symbol = token_symbol_0  # e.g. USDC
-            elif token_symbol_1 == self.get_config().trading.base_asset_SYMBOL: # e.g. SOL/USDC
+            elif token_symbol_1 == base_asset_symbol: # e.g. SOL/USDC
                 target_token_symbol = token_symbol_0 # e.g. SOL
                 other_token_symbol = token_symbol_1  # e.g. USDC
             else:
                 # Fallback: if neither is BASE_ASSET_SYMBOL, maybe agent_order.pair should be the target token's mint?
                 # For now, we require one of them to be the base asset for clarity.
-                logger.error(f"[{trade_id_for_logging}] Could not determine target token from pair '{token_pair_str}'. One token must be BASE_ASSET_SYMBOL '{self.get_config().trading.base_asset_SYMBOL}'.")
+                logger.error(f"[{trade_id_for_logging}] Could not determine target token from pair '{token_pair_str}'. One token must be BASE_ASSET_SYMBOL '{base_asset_symbol}'.")
                 return False
 
             # Get mint addresses for target_token_symbol and other_token_symbol (which is base_asset_symbol)
@@ -112,7 +116,7 @@ class TradeExecutor:
             target_token_mint = target_token_info_res['data']['mint']
             target_token_decimals = target_token_info_res['data']['decimals']
             
-            base_asset_mint = self.get_config().trading.base_asset # e.g., USDC mint
+            base_asset_mint = trading_config.base_asset # e.g., USDC mint
 
             input_token_mint: Optional[str] = None
             output_token_mint: Optional[str] = None
@@ -127,7 +131,7 @@ class TradeExecutor:
                 logger.warning(f"[{trade_id_for_logging}] Invalid decision '{decision}' in agent order. Trade ignored.")
                 return False
 
-            if not all([input_token_mint, output_token_mint, amount_usd > 0]):
+            if not (input_token_mint and output_token_mint and amount_usd > 0):
                 logger.error(f"[{trade_id_for_logging}] Failed to determine valid params for swap. Mints: {input_token_mint}->{output_token_mint}, AmountUSD: {amount_usd}. Order: {agent_order}")
                 return False
             
@@ -166,11 +170,13 @@ class TradeExecutor:
             if final_trade_amount_usd < amount_usd:
                  logger.info(f"[{trade_id_for_logging}] RiskManager adjusted trade size for {target_token_symbol} from ${amount_usd:.2f} to ${final_trade_amount_usd:.2f}.")
             
-            # Ensure final_trade_amount_usd doesn't exceed available cash for BUYs
-            available_cash_usd = self.portfolio_manager.get_available_cash_for_trading()
-            if decision == 'BUY' and final_trade_amount_usd > available_cash_usd:
+            # Ensure final_trade_amount_usd doesn't exceed available cash for BUYs. The amount is reserved
+            # until the trade is recorded, so that concurrent orders already see it as spent.
+            if decision == 'BUY' and not self.portfolio_manager.reserve_cash(final_trade_amount_usd):
+                available_cash_usd = self.portfolio_manager.get_available_cash_for_trading()
                 logger.warning(f"[{trade_id_for_logging}] Insufficient available cash (${available_cash_usd:.2f}) for BUY of {target_token_symbol} at ${final_trade_amount_usd:.2f}. Trade aborted.")
                 return False
+            reserved_cash_usd = final_trade_amount_usd if decision == 'BUY' else 0.0
             
             if decision == 'SELL':
                 # For SELLs, check if portfolio holds enough of input_token_mint (target_token_mint)
@@ -218,12 +224,14 @@ class TradeExecutor:
                 amount_in_lamports_from_quote = quote_response_data.route.market_infos[0].in_amount if quote_response_data and hasattr(quote_response_data, 'route') and quote_response_data.route.market_infos else swap_details.get('amount_lamports_swapped')
                 amount_out_lamports_from_quote = quote_response_data.out_amount if hasattr(quote_response_data, 'out_amount') else 0
 
-                # Get decimals for input and output tokens to convert lamports to float for recording
-                input_token_info = await self.market_data_provider.get_token_info(input_token_mint)
-                output_token_info = await self.market_data_provider.get_token_info(output_token_mint)
-
-                input_decimals = input_token_info['data']['decimals'] if input_token_info.get('success') else 0
-                output_decimals = output_token_info['data']['decimals'] if output_token_info.get('success') else 0
+                # Get decimals for input and output tokens to convert lamports to float for recording.
+                # The target token's decimals came with its mint above: only the base asset is looked up.
+                base_asset_info = await self.market_data_provider.get_token_info(base_asset_mint)
+                base_asset_decimals = base_asset_info['data']['decimals'] if base_asset_info.get('success') else 0
+                if decision == 'BUY':
+                    input_decimals, output_decimals = base_asset_decimals, target_token_decimals
+                else:
+                    input_decimals, output_decimals = target_token_decimals, base_asset_decimals
                 
                 amount_in_tokens_float_actual = float(amount_in_lamports_from_quote) / (10**input_decimals) if input_decimals else 0
                 amount_out_tokens_float_actual = float(amount_out_lamports_from_quote) / (10**output_decimals) if output_decimals else 0
@@ -241,6 +249,9 @@ class TradeExecutor:
                 # amount_in_tokens, amount_out_tokens, price_usd (of output token), amount_in_usd (value of input),
                 # side, status, fee_usd, protocol, transaction_signature, jupiter_quote_response, ...
                 
+                # Reservation swapped for the actual debit, without an await in between
+                self.portfolio_manager.release_cash(reserved_cash_usd)
+                reserved_cash_usd = 0.0
                 self.portfolio_manager.record_executed_trade(
                     trade_id=tx_signature, # Use signature as trade_id
                     pair_address=token_pair_str, # e.g., "SOL/USDC"
@@ -297,6 +308,8 @@ class TradeExecutor:
         except Exception as e:
             logger.critical(f"[{trade_id_for_logging}] Unexpected critical error during agent order execution for {agent_order.get('token_pair')}: {e}", exc_info=True)
             return False
+        finally:
+            self.portfolio_manager.release_cash(reserved_cash_usd)
 
     async def execute_trade_signal(self, pair_data: Dict, signal_info: Dict) -> bool:
         """
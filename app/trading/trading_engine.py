@@ -1,5 +1,6 @@
 import logging
 import time
+from typing import Any, Dict, Optional
 from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction
 from solders.keypair import Keypair
@@ -46,6 +47,11 @@ class TradingEngine:
         self.last_transaction_signature = None
         self.transaction_history = []
         self._api_session = None
+        # False quand la session est fournie par l'appelant (attach_http_session) : elle n'est pas fermée ici
+        self._owns_api_session = True
+        # Nombre d'exécutions en cours dans le contexte `async with` (swaps concurrents) :
+        # les ressources ne sont libérées qu'à la sortie de la dernière
+        self._context_depth = 0
         
         # Initialize MarketDataProvider if not already done by __aenter__ strategy
         # For now, assume it will be available when needed or passed in.
@@ -288,16 +294,24 @@ class TradingEngine:
         # raise ValueError(f"{final_error_summary}\n{detailed_errors}")
         raise ValueError(final_error_summary)
             
+    def attach_http_session(self, session: aiohttp.ClientSession) -> None:
+        """Utilise une session fournie par l'appelant (ex: DexBot), qui reste responsable de sa fermeture."""
+        self._api_session = session
+        self._owns_api_session = False
+        if self.jupiter_client and hasattr(self.jupiter_client, 'attach_http_session'):
+            self.jupiter_client.attach_http_session(session)
+
     async def __aenter__(self):
         """Initialise les ressources asynchrones."""
-        self._api_session = aiohttp.ClientSession() # For any direct HTTP calls if still needed (e.g. fallback Dexscreener)
+        self._context_depth += 1
+        if self._api_session is None or self._api_session.closed:
+            self._api_session = aiohttp.ClientSession() # For any direct HTTP calls if still needed (e.g. fallback Dexscreener)
+            self._owns_api_session = True
         # Initialize MarketDataProvider here if it uses the session
         if not self.market_data_provider:
             self.market_data_provider = MarketDataProvider() # It will init its own session or we can pass one
-            # If MarketDataProvider needs the session from TradingEngine:
-            # self.market_data_provider.session = self._api_session 
-            # Ensure MarketDataProvider also handles its session in its __aenter__/__aexit__ if shared.
-            # For now, MarketDataProvider manages its own session internally.
+            if not self._owns_api_session:
+                self.market_data_provider.attach_http_session(self._api_session)
         
         # Ensure JupiterApiClient's async_client is ready (it is initialized in __init__)
         # If JupiterApiClient also needed an __aenter__ for its client, call it here.
@@ -307,7 +321,10 @@ class TradingEngine:
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Libère les ressources asynchrones."""
-        if self._api_session and not self._api_session.closed:
+        self._context_depth -= 1
+        if self._context_depth > 0:
+            return # Un autre swap utilise encore le client
+        if self._api_session and self._owns_api_session and not self._api_session.closed:
             await self._api_session.close()
         if self.market_data_provider and hasattr(self.market_data_provider, '__aexit__'):
             await self.market_data_provider.__aexit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,72 @@
+"""
+Session HTTP aiohttp poolée, partageable entre les composants du bot
+(MarketDataProvider, MarketDataCache, ...) pour réutiliser les connexions keep-alive,
+et décodage des réponses JSON.
+"""
+
+import json
+from typing import Any, Dict, Optional, Union
+
+import aiohttp
+
+from app.config import get_config
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+DEFAULT_POOL_LIMIT = 100
+DEFAULT_POOL_LIMIT_PER_HOST = 20
+DEFAULT_DNS_CACHE_TTL_SECONDS = 300
+DEFAULT_KEEPALIVE_TIMEOUT_SECONDS = 60
+
+
+def create_pooled_session(limit: int = DEFAULT_POOL_LIMIT,
+                          limit_per_host: int = DEFAULT_POOL_LIMIT_PER_HOST,
+                          dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL_SECONDS,
+                          keepalive_timeout: int = DEFAULT_KEEPALIVE_TIMEOUT_SECONDS,
+                          total_timeout: Optional[float] = None,
+                          headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+    """Crée une ClientSession avec un connecteur poolé (keep-alive, cache DNS) et les corps `json=`
+    sérialisés par dumps_json. À appeler depuis une boucle active."""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        keepalive_timeout=keepalive_timeout
+    )
+    timeout = aiohttp.ClientTimeout(total=total_timeout) if total_timeout else None
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers, json_serialize=dumps_json)
+
+
+def create_pooled_session_from_config(total_timeout: Optional[float] = None,
+                                     headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientSession:
+    """create_pooled_session dimensionnée par la section `api` de la configuration (HTTP_POOL_*)."""
+    api_config = get_config().api
+    return create_pooled_session(
+        limit=api_config.http_pool_limit,
+        limit_per_host=api_config.http_pool_limit_per_host,
+        dns_cache_ttl=api_config.http_dns_cache_ttl_seconds,
+        keepalive_timeout=api_config.http_keepalive_timeout_seconds,
+        total_timeout=total_timeout,
+        headers=headers
+    )
+
+
+def dumps_json(value: Any) -> str:
+    """Sérialise un corps de requête JSON, via orjson si disponible."""
+    if HAS_ORJSON:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+def loads_json(raw: Union[bytes, str]) -> Any:
+    """Décode une réponse JSON brute, via orjson si disponible (~2x plus rapide que json).
+
+    Lève json.JSONDecodeError (orjson.JSONDecodeError en hérite).
+    """
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
@@ -0,0 +1,50 @@
+"""
+Regroupement des requêtes asynchrones identiques en cours : les appels simultanés pour la
+même clé attendent une seule tâche (un seul appel réseau / une seule lecture DB).
+
+Utilisé par MarketDataProvider (prix, historiques), DexBot (résolution des mints) et
+PortfolioManager (snapshot des positions).
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class InFlightRequests:
+    """Tâches en cours par clé.
+
+    Par défaut une tâche est oubliée dès qu'elle se termine (le cache éventuel est celui de
+    l'appelant). Avec `keep_results=True`, un résultat réussi reste partagé jusqu'à
+    `discard()` / `clear()` ; un échec ou une annulation n'est jamais conservé.
+    """
+
+    def __init__(self, keep_results: bool = False):
+        self._keep_results = keep_results
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Résultat de `factory()` pour `key`, lancée seulement si aucune tâche n'est en cours."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done, k=key: self._on_done(k, done))
+        # shield: un appelant annulé n'annule pas la tâche partagée avec les autres
+        return await asyncio.shield(task)
+
+    def discard(self, key: Hashable) -> None:
+        self._tasks.pop(key, None)
+
+    def clear(self) -> None:
+        self._tasks.clear()
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is not task: # Déjà remplacée après un discard()/clear()
+            return
+        if not self._keep_results or task.cancelled() or task.exception() is not None:
+            del self._tasks[key]
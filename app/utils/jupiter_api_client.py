@@ -26,6 +26,7 @@ from app.utils.exceptions import (
     JupiterAPIError, SolanaTransactionError, TransactionExpiredError, 
     TransactionBroadcastError, TransactionConfirmationError
 )
+from app.utils.http import dumps_json, loads_json
 
 # Logger for this module
 logger = logging.getLogger(__name__)
@@ -64,8 +65,9 @@ class JupiterApiClient:
         self.swap_url = f"{self.base_url}/v6/swap"
         self.price_url = f"{self.base_url}/price/v2"
         
-        # HTTP session
+        # HTTP session (False for _owns_session when provided by the caller through attach_http_session)
         self.http_session = None
+        self._owns_session = True
         self.http_headers = {
             'Accept': 'application/json',
             'Content-Type': 'application/json',
@@ -80,10 +82,17 @@ class JupiterApiClient:
             timeout = aiohttp.ClientTimeout(total=30)
             self.http_session = aiohttp.ClientSession(
                 timeout=timeout,
-                headers=self.http_headers
+                headers=self.http_headers,
+                json_serialize=dumps_json
             )
+            self._owns_session = True
         return self.http_session
 
+    def attach_http_session(self, session: aiohttp.ClientSession) -> None:
+        """Use a caller-provided pooled session (e.g. DexBot's); the caller remains responsible for closing it."""
+        self.http_session = session
+        self._owns_session = False
+
     async def _make_http_request(
         self, 
         method: str, 
@@ -120,7 +129,8 @@ class JupiterApiClient:
                         method=method,
                         url=url,
                         params=params,
-                        json=json_data
+                        json=json_data,
+                        headers=self.http_headers # Also set when the session is shared
                     ) as response:
                         
                         if response.status >= 400:
@@ -135,7 +145,7 @@ class JupiterApiClient:
                                 raise JupiterAPIError(f"HTTP {response.status}: {error_text}")
                         
                         try:
-                            result = await response.json()
+                            result = loads_json(await response.read())
                             logger.debug(f"Successful response from {url}")
                             return result
                         except json.JSONDecodeError as e:
@@ -421,7 +431,7 @@ class JupiterApiClient:
         """
         logger.info("Closing Jupiter API client")
         
-        if self.http_session and not self.http_session.closed:
+        if self.http_session and self._owns_session and not self.http_session.closed:
             await self.http_session.close()
             
         if self.async_client:
@@ -0,0 +1,85 @@
+"""
+Réductions numériques scalaires (dernière valeur d'un indicateur, drawdown), compilées
+avec Numba lorsqu'il est disponible (même repli Python pur que `app.strategies.kernels`).
+
+Utilisées pour le résumé OHLCV du prompt de l'AIAgent et par PerformanceMonitor : une
+seule boucle sur les données, sans allocation des séries complètes de `indicators`.
+Mêmes conventions que `indicators` (lissages de Wilder initialisés sur la première
+valeur) ; NaN tant que l'historique est insuffisant.
+"""
+
+import numpy as np
+
+from app.strategies.kernels import HAS_NUMBA, njit
+
+
+@njit(cache=True, fastmath=True)
+def sma(closes: np.ndarray, period: int) -> float:
+    """Moyenne des `period` dernières valeurs."""
+    n = closes.shape[0]
+    if period <= 0 or n < period:
+        return np.nan
+    total = 0.0
+    for i in range(n - period, n):
+        total += closes[i]
+    return total / period
+
+
+@njit(cache=True, fastmath=True)
+def rsi(closes: np.ndarray, period: int) -> float:
+    """RSI de Wilder à la dernière bougie (identique au dernier point de `indicators.rsi`)."""
+    n = closes.shape[0]
+    if n <= period:
+        return np.nan
+    alpha = 1.0 / period
+    delta = closes[1] - closes[0]
+    avg_gain = max(delta, 0.0)
+    avg_loss = max(-delta, 0.0)
+    for i in range(2, n):
+        delta = closes[i] - closes[i - 1]
+        avg_gain += alpha * (max(delta, 0.0) - avg_gain)
+        avg_loss += alpha * (max(-delta, 0.0) - avg_loss)
+    if avg_loss == 0.0:
+        return 100.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@njit(cache=True, fastmath=True)
+def atr(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int) -> float:
+    """ATR de Wilder à la dernière bougie (identique au dernier point de `indicators.atr`)."""
+    n = closes.shape[0]
+    if n <= period:
+        return np.nan
+    alpha = 1.0 / period
+    value = highs[0] - lows[0]
+    for i in range(1, n):
+        prev_close = closes[i - 1]
+        true_range = max(highs[i] - lows[i], abs(highs[i] - prev_close), abs(lows[i] - prev_close))
+        value += alpha * (true_range - value)
+    return value
+
+
+@njit(cache=True, fastmath=True)
+def drawdown(equity_curve: np.ndarray) -> float:
+    """Drawdown maximal (fraction 0..1 du plus haut atteint) d'une courbe de valeurs."""
+    peak = 0.0
+    worst = 0.0
+    for i in range(equity_curve.shape[0]):
+        value = equity_curve[i]
+        if value > peak:
+            peak = value
+        elif peak > 0.0:
+            dd = (peak - value) / peak
+            if dd > worst:
+                worst = dd
+    return worst
+
+
+def warm_up() -> None:
+    """Force la compilation JIT (ou le chargement du cache) hors du chemin critique."""
+    if HAS_NUMBA:
+        dummy = np.linspace(1.0, 2.0, 32)
+        sma(dummy, 20)
+        rsi(dummy, 14)
+        atr(dummy + 0.1, dummy - 0.1, dummy, 14)
+        drawdown(dummy)
@@ -0,0 +1,25 @@
+import asyncio
+import unittest
+
+from app.cache import RedisCache
+
+
+class TestRedisCacheLocalFallback(unittest.TestCase):
+
+    def test_set_then_get_without_redis(self):
+        cache = RedisCache(prefix="test", default_ttl=15, enabled=False)
+
+        async def scenario():
+            self.assertIsNone(await cache.get("missing"))
+            await cache.set("pairs", [{"pairAddress": "abc"}])
+            return await cache.get("pairs")
+
+        self.assertEqual(asyncio.run(scenario()), [{"pairAddress": "abc"}])
+
+    def test_close_is_noop_without_redis(self):
+        cache = RedisCache(prefix="test", default_ttl=15, enabled=False)
+        asyncio.run(cache.close())
+
+
+if __name__ == '__main__':
+    unittest.main()
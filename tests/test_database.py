@@ -2,7 +2,10 @@ import unittest
 import sqlite3
 import json
 import os
+import asyncio
+import tempfile
 from app.database import EnhancedDatabase
+from app.async_database import AsyncDatabasePool
 from app.config import get_config # For DB_PATH, though we'll override
 
 # Sample data for new fields
@@ -107,5 +110,127 @@ class TestEnhancedDatabase(unittest.TestCase):
         else:
             self.assertEqual(retrieved_trade['slippage_bps'], 50) # Default if not in config
 
+
+class TestActiveExposure(unittest.TestCase):
+
+    def setUp(self):
+        self.db = EnhancedDatabase(":memory:")
+        with self.db.conn:
+            self.db.conn.executemany(
+                "INSERT INTO trades (pair_address, amount, entry_price, status, side) VALUES (?, ?, ?, ?, 'BUY')",
+                [("SOL/USDC", 100.0, 150.0, "open"),
+                 ("JUP/USDC", 50.0, 1.2, "open"),
+                 ("BONK/USDC", 25.0, 0.00002, "closed")]
+            )
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_get_active_exposure_usd_sums_open_trades_only(self):
+        self.assertAlmostEqual(self.db.get_active_exposure_usd(), 150.0)
+
+    def test_close_trade_returns_amount_and_updates_exposure(self):
+        trade_id = self.db.conn.execute(
+            "SELECT id FROM trades WHERE pair_address = 'SOL/USDC'").fetchone()[0]
+        self.assertAlmostEqual(self.db.close_trade(trade_id), 100.0)
+        self.assertAlmostEqual(self.db.get_active_exposure_usd(), 50.0)
+        # Already closed: nothing to release
+        self.assertIsNone(self.db.close_trade(trade_id))
+
+
+class TestBlacklistCache(unittest.TestCase):
+
+    def setUp(self):
+        self.db = EnhancedDatabase(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_add_blacklist_updates_cached_negative_result(self):
+        self.assertFalse(self.db.is_blacklisted("TokenA"))
+        self.db.add_blacklist("TokenA", "rugpull", {"score": 9})
+        self.assertTrue(self.db.is_blacklisted("TokenA"))
+
+    def test_snapshot_sees_rows_written_elsewhere_after_refresh(self):
+        self.assertFalse(self.db.is_blacklisted("TokenB"))
+        with self.db.conn:
+            self.db.conn.execute("INSERT INTO blacklist (address, reason, metadata) VALUES ('TokenB', 'scam', '{}')")
+        self.assertFalse(self.db.is_blacklisted("TokenB")) # Instantané encore frais
+        self.db._blacklist_loaded_at = float('-inf')
+        self.assertTrue(self.db.is_blacklisted("TokenB"))
+        self.assertEqual(self.db.get_blacklist_set(), {"TokenB"})
+
+class TestSharedDatabase(unittest.TestCase):
+
+    def test_get_shared_reuses_instance_until_closed(self):
+        db1 = EnhancedDatabase.get_shared(":memory:")
+        db2 = EnhancedDatabase.get_shared(":memory:")
+        self.assertIs(db1, db2)
+        db1.close()
+        db3 = EnhancedDatabase.get_shared(":memory:")
+        self.assertIsNot(db1, db3)
+        self.assertIsNotNone(db3.conn)
+        db3.close()
+
+class TestRecordTradesBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.db = EnhancedDatabase(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_bulk_insert_skips_invalid_entries(self):
+        trades = [
+            {"pair": "SOL/USDC", "amount": 10.0, "entry_price": 150.0, "slippage_bps": 30, "side": "BUY"},
+            {"pair": "JUP/USDC", "amount": 5.0, "entry_price": 1.1, "slippage_bps": None, "side": "BUY"},
+            {"amount": 1.0},  # Missing pair: skipped
+        ]
+        self.assertEqual(self.db.record_trades_bulk(trades), 2)
+        rows = self.db.conn.execute("SELECT pair_address, slippage_bps FROM trades ORDER BY id").fetchall()
+        self.assertEqual([r[0] for r in rows], ["SOL/USDC", "JUP/USDC"])
+        self.assertEqual(rows[0][1], 30)
+        self.assertIsNotNone(rows[1][1])  # Falls back to the configured default
+        self.assertAlmostEqual(self.db.get_active_exposure_usd(), 15.0)
+        self.assertEqual(self.db.get_active_trade_stats(), (2, 15.0))
+        self.assertEqual([t["pair_address"] for t in self.db.iter_active_trades(chunk_size=1)], ["SOL/USDC", "JUP/USDC"])
+
+    def test_bulk_insert_empty_batch(self):
+        self.assertEqual(self.db.record_trades_bulk([]), 0)
+
+
+class TestAsyncDatabasePool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+        EnhancedDatabase(self.db_path).close()  # Creates the schema
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_bulk_insert_then_read_active_trades(self):
+        async def scenario():
+            pool = await AsyncDatabasePool.create(self.db_path, min_size=1, max_size=2, command_timeout=5)
+            try:
+                inserted = await pool.record_trades_bulk([
+                    {"pair": "SOL/USDC", "amount": 10.0, "entry_price": 150.0, "side": "BUY"},
+                    {"amount": 1.0},  # Missing pair: skipped
+                ])
+                trades, blacklisted, stats = await asyncio.gather(
+                    pool.get_active_trades(), pool.is_blacklisted("So1"), pool.get_active_trade_stats()
+                )
+                streamed = [t["pair_address"] async for t in pool.iter_active_trades()]
+                self.assertEqual(stats, (1, 10.0))
+                self.assertEqual(streamed, ["SOL/USDC"])
+                return inserted, trades, blacklisted
+            finally:
+                await pool.close()
+
+        inserted, trades, blacklisted = asyncio.run(scenario())
+        self.assertEqual(inserted, 1)
+        self.assertEqual([t["pair_address"] for t in trades], ["SOL/USDC"])
+        self.assertFalse(blacklisted)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
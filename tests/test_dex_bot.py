@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.dex_bot import DexBot
+from app.strategies.features import FeatureCache
+
+TARGET_MINT = "So11111111111111111111111111111111111111112"
+BASE_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+class TestGatherMarketData(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        # Only the attributes read by _gather_market_data; __init__ wires the whole bot
+        self.bot = DexBot.__new__(DexBot)
+        self.bot._io_semaphore = asyncio.Semaphore(4)
+        self.bot.feature_cache = FeatureCache()
+        self.bot.market_data_provider = MagicMock()
+        self.bot.market_data_provider.get_token_price = AsyncMock(return_value={'success': True, 'data': {'price': 150.0}})
+
+    async def test_failed_bundle_keeps_spot_price(self):
+        self.bot.market_data_provider.get_pair_bundle = AsyncMock(side_effect=RuntimeError("DexScreener down"))
+
+        market_data_input, ohlcv_columns = await self.bot._gather_market_data(TARGET_MINT, BASE_MINT, "SOL/USDC")
+
+        self.assertIsNotNone(market_data_input)
+        self.assertEqual(market_data_input.current_price, 150.0)
+        self.assertEqual(market_data_input.recent_ohlcv_1h, [])
+        self.assertIsNone(market_data_input.liquidity_depth_usd)
+        self.assertEqual(market_data_input.volume_24h_usd, 0.0)
+        self.assertIsNone(ohlcv_columns)
+
+    async def test_failed_price_skips_pair(self):
+        self.bot.market_data_provider.get_token_price = AsyncMock(side_effect=RuntimeError("timeout"))
+        self.bot.market_data_provider.get_pair_bundle = AsyncMock(return_value={})
+
+        market_data_input, _ = await self.bot._gather_market_data(TARGET_MINT, BASE_MINT, "SOL/USDC")
+
+        self.assertIsNone(market_data_input)
+
+    async def test_unknown_liquidity_passes_validation(self):
+        metrics = {'liquidity_usd': None, 'volume_h24': 1000.0}
+        self.bot.market_data_provider.get_pair_bundle = AsyncMock(return_value={TARGET_MINT: {'metrics': metrics, 'ohlcv': None}})
+
+        with self.assertNoLogs('app.dex_bot', level='ERROR'):
+            market_data_input, _ = await self.bot._gather_market_data(TARGET_MINT, BASE_MINT, "SOL/USDC")
+
+        self.assertIsNotNone(market_data_input)
+        self.assertIsNone(market_data_input.liquidity_depth_usd)
+        self.assertEqual(market_data_input.volume_24h_usd, 1000.0)
+
+    async def test_invalid_market_data_logs_validation_error(self):
+        self.bot.market_data_provider.get_token_price = AsyncMock(return_value={'success': True, 'data': {'price': 0.0}})
+        self.bot.market_data_provider.get_pair_bundle = AsyncMock(return_value={})
+
+        with self.assertLogs('app.dex_bot', level='ERROR') as logs:
+            market_data_input, _ = await self.bot._gather_market_data(TARGET_MINT, BASE_MINT, "SOL/USDC")
+
+        self.assertIsNone(market_data_input)
+        self.assertIn("rejected by MarketDataInput validation", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from app.strategies.features import FeatureCache
+
+
+def _columns(close, start, stop):
+    ts = np.arange(len(close), dtype=np.int64) * 3600
+    return {
+        'timestamp': ts[start:stop],
+        'high': close[start:stop] + 1.0,
+        'low': close[start:stop] - 1.0,
+        'close': close[start:stop],
+    }
+
+
+class TestFeatureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.close = 100.0 + np.cumsum(np.random.default_rng(0).normal(size=60))
+
+    def test_incremental_update_matches_full_computation(self):
+        cache = FeatureCache()
+        cache.get("pair", _columns(self.close, 0, 40))
+        incremental = cache.get("pair", _columns(self.close, 20, 60))
+        full = FeatureCache().get("pair", _columns(self.close, 0, 60))
+
+        self.assertEqual(incremental['trend'], full['trend'])
+        for key in ('rsi', 'ema_fast', 'ema_slow', 'atr', 'support', 'resistance'):
+            self.assertAlmostEqual(incremental[key], full[key], places=9)
+
+    def test_same_last_candle_returns_cached_features(self):
+        cache = FeatureCache()
+        first = cache.get("pair", _columns(self.close, 0, 40))
+        self.assertIs(cache.get("pair", _columns(self.close, 10, 40)), first)
+
+    def test_empty_columns(self):
+        self.assertIsNone(FeatureCache().get("pair", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+
+from app.utils.inflight import InFlightRequests
+
+
+class TestInFlightRequests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_one_task(self):
+        inflight = InFlightRequests()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return 42
+
+        results = await asyncio.gather(*(inflight.run("SOL", fetch) for _ in range(3)))
+
+        self.assertEqual(results, [42, 42, 42])
+        self.assertEqual(len(calls), 1)
+        self.assertNotIn("SOL", inflight)
+
+    async def test_keep_results_drops_failures_only(self):
+        inflight = InFlightRequests(keep_results=True)
+
+        async def fail():
+            raise RuntimeError("db locked")
+
+        async def load():
+            return [1, 2]
+
+        with self.assertRaises(RuntimeError):
+            await inflight.run(50, fail)
+        self.assertNotIn(50, inflight)
+        self.assertEqual(await inflight.run(50, load), [1, 2])
+        self.assertIn(50, inflight)
+        inflight.clear()
+        self.assertNotIn(50, inflight)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import math
+import unittest
+
+import numpy as np
+
+from app.strategies import indicators
+from app.utils import metrics_kernels
+
+
+class TestMetricsKernels(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.close = 100.0 + np.cumsum(rng.normal(size=60))
+        self.high = self.close + rng.random(60)
+        self.low = self.close - rng.random(60)
+
+    def test_last_values_match_indicator_series(self):
+        self.assertAlmostEqual(metrics_kernels.sma(self.close, 20), indicators.sma(self.close, 20)[-1], places=9)
+        self.assertAlmostEqual(metrics_kernels.rsi(self.close, 14), indicators.rsi(self.close, 14)[-1], places=9)
+        self.assertAlmostEqual(metrics_kernels.atr(self.high, self.low, self.close, 14),
+                               indicators.atr(self.high, self.low, self.close, 14)[-1], places=9)
+
+    def test_short_history_is_nan(self):
+        self.assertTrue(math.isnan(metrics_kernels.sma(self.close[:10], 20)))
+        self.assertTrue(math.isnan(metrics_kernels.rsi(self.close[:14], 14)))
+
+    def test_drawdown(self):
+        self.assertAlmostEqual(metrics_kernels.drawdown(np.array([1.0, 2.0, 1.5, 3.0, 1.0])), 2.0 / 3.0)
+        self.assertEqual(metrics_kernels.drawdown(np.array([1.0, 2.0, 3.0])), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
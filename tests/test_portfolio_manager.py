@@ -0,0 +1,70 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from app.database import EnhancedDatabase
+from app.portfolio_manager import PortfolioManager
+
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+
+class TestActiveTradeStats(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.db = EnhancedDatabase(self.db_path)
+        self.portfolio = PortfolioManager(MagicMock(), db=self.db)
+        self.portfolio.base_currency = USDC_MINT
+
+    def tearDown(self):
+        self.db.conn.close()
+        os.remove(self.db_path)
+
+    def _buy(self, trade_id, tokens, price):
+        self.assertTrue(self.portfolio.record_executed_trade(
+            trade_id=trade_id, pair_address="SOL/USDC", input_token_mint=USDC_MINT, output_token_mint=SOL_MINT,
+            amount_in_tokens=tokens * price, amount_out_tokens=tokens, price_usd=price, amount_in_usd=tokens * price,
+            side="BUY", status="FILLED"
+        ))
+
+    def _sell(self, trade_id, tokens, proceeds_usd):
+        self.assertTrue(self.portfolio.record_executed_trade(
+            trade_id=trade_id, pair_address="SOL/USDC", input_token_mint=SOL_MINT, output_token_mint=USDC_MINT,
+            amount_in_tokens=tokens, amount_out_tokens=proceeds_usd, price_usd=proceeds_usd / tokens,
+            amount_in_usd=proceeds_usd, side="SELL", status="FILLED"
+        ))
+
+    def _value(self):
+        return asyncio.run(self.portfolio.get_total_portfolio_value())
+
+    def test_sell_moves_value_by_pnl_only(self):
+        self._buy("t1", 1.0, 150.0)
+        value_before = self._value()
+
+        self._sell("t2", 1.0, 160.0)
+
+        self.assertAlmostEqual(self._value(), value_before + 10.0)
+        self.assertEqual(asyncio.run(self.portfolio.get_active_trade_stats()), (0, 0.0))
+        self.assertAlmostEqual(asyncio.run(self.portfolio.get_realized_pnl_last_24h()), 10.0)
+
+    def test_partial_sell_then_reconcile_keeps_counters(self):
+        self._buy("t1", 1.0, 150.0)
+        value_before = self._value()
+
+        self._sell("t2", 0.5, 80.0)
+        count, exposure = asyncio.run(self.portfolio.get_active_trade_stats())
+        reconciled = asyncio.run(self.portfolio.reconcile_active_trade_stats())
+
+        self.assertAlmostEqual(self._value(), value_before + 5.0)
+        self.assertEqual(count, 1)
+        self.assertAlmostEqual(exposure, 75.0)
+        self.assertEqual(reconciled[0], count)
+        self.assertAlmostEqual(reconciled[1], exposure)
+
+
+if __name__ == '__main__':
+    unittest.main()
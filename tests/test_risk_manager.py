@@ -0,0 +1,29 @@
+import unittest
+from unittest.mock import patch
+
+from app.risk_manager import RiskManager
+
+
+class TestPositionSize(unittest.TestCase):
+
+    def setUp(self):
+        self.risk_manager = RiskManager()
+        self.risk_manager.portfolio_value = 10000.0
+
+    def _size(self, metrics, volatility=None):
+        with patch.object(self.risk_manager, '_get_token_performance_metrics', return_value=metrics), \
+             patch.object(self.risk_manager, '_get_token_volatility', return_value=volatility):
+            return self.risk_manager.calculate_position_size('mint', 'TOK', 1.0)
+
+    def test_positive_kelly(self):
+        self.assertAlmostEqual(self._size((0.55, 0.1, 0.1)), 500.0)
+
+    def test_negative_kelly_is_not_traded(self):
+        self.assertEqual(self._size((0.2, 0.05, 0.1)), 0.0)
+
+    def test_no_metrics_uses_volatility(self):
+        self.assertAlmostEqual(self._size((None, None, None), volatility=0.5), 300.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from app.strategies.momentum_strategy import MomentumStrategy
+from app.strategy_framework import strategy_signal, strategy_signals
+
+
+def _columns(close):
+    return {
+        'timestamp': np.arange(len(close), dtype=np.int64) * 3600,
+        'open': close,
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close,
+        'volume': np.ones(len(close)),
+    }
+
+
+class TestStrategySignals(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.ohlcv_by_token = {tok: _columns(100.0 + np.cumsum(rng.normal(size=48))) for tok in ('a', 'b', 'c')}
+        self.strategy = MomentumStrategy()
+
+    def test_batch_matches_per_pair(self):
+        batch = strategy_signals(self.strategy, self.ohlcv_by_token)
+        for tok, columns in self.ohlcv_by_token.items():
+            single = strategy_signal(self.strategy, columns)
+            self.assertEqual(batch[tok]['signal'], single['signal'])
+            self.assertAlmostEqual(batch[tok]['confidence'], single['confidence'])
+            for name, value in single['indicators'].items():
+                self.assertAlmostEqual(batch[tok]['indicators'][name], value, places=9)
+
+    def test_signal_is_normalized(self):
+        output = strategy_signal(self.strategy, self.ohlcv_by_token['a'])
+        self.assertIn(output['signal'], ('BUY', 'SELL', 'NEUTRAL'))
+        self.assertTrue(output['reasoning'])
+
+
+if __name__ == '__main__':
+    unittest.main()